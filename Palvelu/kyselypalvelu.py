@@ -0,0 +1,358 @@
+# Copyright (c) 2025 Jonna Kangas
+
+# Ohjelmoinnin perusteet -opintojakso
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# See <https://www.gnu.org/licenses/>.
+
+"""
+Paikallinen HTTP/JSON-kyselypalvelu energia- ja varausraporteille.
+
+Toiminta:
+    - Data (Viikko6/2025.csv ja Viikko7/varaukset.txt) luetaan kerran
+      käynnistyksessä samoilla lukufunktioilla kuin raporttiohjelmissa.
+    - Kiinteät raportit (vuosi, kuukaudet 1–12 ja varausten koosteet)
+      lasketaan valmiiksi välimuistiin ennen kuin palvelu alkaa vastata.
+    - Lähdetiedostojen muuttuessa data ja välimuisti rakennetaan taustalla
+      uudelleen ja vaihdetaan käyttöön tilannekuvana (yhteiset/uudelleenlataus.py).
+      Kesken olevat kyselyt käyttävät loppuun vanhaa tilannekuvaa.
+    - Pyynnöt käsitellään asyncio-palvelimella samanaikaisesti; raportit
+      lasketaan säiealtaassa, jotta tapahtumasilmukka ei pysähdy.
+    - Vastaukset talletetaan LRU-välimuistiin. Samanaikaiset samat pyynnöt
+      odottavat samaa laskentaa, joten raportti lasketaan vain kerran.
+    - /metrics palauttaa tilannekuvan sukupolven ja latauksen keston sekä
+      reiteittäin pyyntömäärät, välimuistin osumat ja vasteajan p50/p99
+      viimeisimmistä pyynnöistä.
+
+Reitit (GET):
+    /energia/vuosi
+    /energia/kuukausi?kuukausi=1..12
+    /energia/aikavali?alku=pv.kk.vvvv&loppu=pv.kk.vvvv
+    /varaukset/<raportti>   (ks. VARAUSRAPORTIT)
+    /metrics
+
+Käyttö:
+    python kyselypalvelu.py [--osoite 127.0.0.1] [--portti 8080] [--tarkistusvali 1.0]
+    curl 'http://127.0.0.1:8080/energia/kuukausi?kuukausi=3'
+"""
+
+import asyncio
+import json
+import os
+import sys
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from time import perf_counter
+from typing import Callable
+from urllib.parse import parse_qs, urlsplit
+
+# Repositorion juuri (yhteiset/) sekä raporttiohjelmien hakemistot, joiden
+# moduulit tuovat omat apumoduulinsa (tilastot, saatavuus, ...) suoraan
+JUURI = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path[:0] = [JUURI, os.path.join(JUURI, "Viikko6"), os.path.join(JUURI, "Viikko7")]
+
+from lue_varaukset import (Varauslista, lue_varaustiedosto, pitkat_varaukset_rivit, vahvistetut_varaukset_rivit,
+                           varaukset_kohteittain_rivit, varauskoosteet_rivit, varausten_kokonaistulot_rivit,
+                           varausten_lkm_rivit, varausten_vahvistusstatus_rivit)
+from viikko6tehtava import lataa_tietokanta, luo_aikavalin_raportti, luo_kuukausiraportti, luo_vuosiraportti
+from yhteiset.aikasarja import Aikasarja
+from yhteiset.uudelleenlataus import Latausvahti
+
+ENERGIATIEDOSTO = os.path.join(JUURI, "Viikko6", "2025.csv")
+VARAUSTIEDOSTO = os.path.join(JUURI, "Viikko7", "varaukset.txt")
+
+OLETUSOSOITE = "127.0.0.1"
+OLETUSPORTTI = 8080
+
+# Lähdetiedostojen muutosten tarkistusväli sekunteina (uudelleenlataus)
+TARKISTUSVALI = 1.0
+
+# Välimuistin enimmäiskoko (vastauksia); vanhin käyttämätön poistetaan ensin
+VALIMUISTIN_KOKO = 256
+
+# Vasteaikoja talletetaan reittiä kohden enintään näin monta (uusimmat)
+MITTAUSIKKUNA = 10_000
+
+# /varaukset/<nimi> -> raporttirivit tuottava funktio (Viikko7/lue_varaukset.py)
+VARAUSRAPORTIT: dict[str, Callable[[Varauslista], object]] = {
+    "vahvistetut": vahvistetut_varaukset_rivit,
+    "pitkat": pitkat_varaukset_rivit,
+    "vahvistusstatus": varausten_vahvistusstatus_rivit,
+    "lkm": varausten_lkm_rivit,
+    "kokonaistulot": varausten_kokonaistulot_rivit,
+    "kohteittain": varaukset_kohteittain_rivit,
+    "koosteet": varauskoosteet_rivit,
+}
+
+TILAT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class Pyyntovirhe(Exception):
+    """Pyyntöön vastataan virhekoodilla (esim. 400 tai 404) ja viestillä."""
+
+    def __init__(self, tila: int, viesti: str) -> None:
+        super().__init__(viesti)
+        self.tila = tila
+
+
+class Vasteajat:
+    """
+    Yhden reitin pyyntömäärät ja viimeisimpien pyyntöjen vasteajat.
+
+    Attribuutit:
+        pyynnot (int): Kaikkien pyyntöjen määrä.
+        osumat (int): Välimuistista vastattujen pyyntöjen määrä.
+        ajat (deque[float]): Enintään MITTAUSIKKUNA viimeisintä vasteaikaa sekunteina.
+    """
+
+    def __init__(self) -> None:
+        self.pyynnot: int = 0
+        self.osumat: int = 0
+        self.ajat: deque[float] = deque(maxlen=MITTAUSIKKUNA)
+
+    def paivita(self, kesto: float, osuma: bool) -> None:
+        """Kirjaa yhden pyynnön vasteajan."""
+        self.pyynnot += 1
+        self.osumat += osuma
+        self.ajat.append(kesto)
+
+    def sanakirjana(self) -> dict:
+        jarjestetyt = sorted(self.ajat)
+        return {
+            "pyynnot": self.pyynnot,
+            "valimuistiosumat": self.osumat,
+            "p50_ms": round(1000 * _prosenttipiste(jarjestetyt, 50), 3),
+            "p99_ms": round(1000 * _prosenttipiste(jarjestetyt, 99), 3),
+        }
+
+
+def _prosenttipiste(jarjestetyt: list[float], p: float) -> float:
+    """Lähimmän järjestysluvun prosenttipiste järjestetystä listasta (tyhjälle 0)."""
+    if not jarjestetyt:
+        return 0.0
+    return jarjestetyt[max(0, -(-len(jarjestetyt) * p // 100) - 1)]
+
+
+def _parametri(kysely: dict[str, list[str]], nimi: str) -> str:
+    try:
+        return kysely[nimi][0]
+    except KeyError:
+        raise Pyyntovirhe(400, f"Puuttuva parametri: {nimi}") from None
+
+
+class Aineisto:
+    """
+    Yhden tilannekuvan data ja sen oma vastausvälimuisti.
+
+    Välimuisti kuuluu tilannekuvaan, joten uudelleenlatauksen jälkeen vanhoja
+    vastauksia ei voi saada, eikä välimuistia tarvitse erikseen tyhjentää.
+
+    Attribuutit:
+        energia (Aikasarja): Luettu ja korjattu tuntidata.
+        varaukset (Varauslista): Luetut varaukset.
+        valimuisti (OrderedDict[tuple, Future]): Välimuistiavain -> laskennan tulos (LRU).
+    """
+
+    def __init__(self, energia: Aikasarja, varaukset: Varauslista) -> None:
+        self.energia = energia
+        self.varaukset = varaukset
+        self.valimuisti: OrderedDict[tuple, Future] = OrderedDict()
+
+    def laskija(self, reitti: str, kysely: dict[str, list[str]]) -> tuple[tuple, Callable[[], dict]]:
+        """
+        Palauttaa reitin välimuistiavaimen ja funktion, joka laskee vastauksen.
+
+        Poikkeukset:
+            Pyyntovirhe: tuntematon reitti (404) tai puuttuva parametri (400).
+        """
+        if reitti == "/energia/vuosi":
+            return (reitti,), lambda: {"raportti": luo_vuosiraportti(self.energia)}
+        if reitti == "/energia/kuukausi":
+            kuukausi = _parametri(kysely, "kuukausi")
+            return (reitti, kuukausi), lambda: {"raportti": luo_kuukausiraportti(kuukausi, self.energia)}
+        if reitti == "/energia/aikavali":
+            alku, loppu = _parametri(kysely, "alku"), _parametri(kysely, "loppu")
+            return (reitti, alku, loppu), lambda: {"raportti": luo_aikavalin_raportti(alku, loppu, self.energia)}
+        if reitti.startswith("/varaukset/") and reitti[len("/varaukset/"):] in VARAUSRAPORTIT:
+            raportti = VARAUSRAPORTIT[reitti[len("/varaukset/"):]]
+            return (reitti,), lambda: {"rivit": list(raportti(self.varaukset))}
+        raise Pyyntovirhe(404, f"Tuntematon reitti: {reitti}")
+
+    def esilammita(self) -> None:
+        """Laskee kiinteät raportit välimuistiin ennen tilannekuvan julkaisua."""
+        pyynnot = [("/energia/vuosi", {})]
+        pyynnot += [("/energia/kuukausi", {"kuukausi": [str(kuukausi)]}) for kuukausi in range(1, 13)]
+        pyynnot += [(f"/varaukset/{nimi}", {}) for nimi in VARAUSRAPORTIT]
+        for reitti, kysely in pyynnot:
+            avain, laske = self.laskija(reitti, kysely)
+            try:
+                tulos = laske()
+            except (ValueError, ZeroDivisionError):
+                continue  # esim. kuukausi, jolta ei ole dataa; virhe näkyy pyydettäessä
+            valmis = Future()
+            valmis.set_result(tulos)
+            self.valimuisti[avain] = valmis
+
+
+def rakenna_aineisto(energiatiedosto: str = ENERGIATIEDOSTO, varaustiedosto: str = VARAUSTIEDOSTO) -> Aineisto:
+    """Lukee energia- ja varausdatan raporttiohjelmien lukufunktioilla ja lämmittää välimuistin."""
+    aineisto = Aineisto(lataa_tietokanta(energiatiedosto, None), lue_varaustiedosto(varaustiedosto))
+    aineisto.esilammita()
+    return aineisto
+
+
+class Kyselypalvelu:
+    """
+    Pyyntöjen käsittely ja mittaukset latausvahdin julkaisemalle datalle.
+
+    Parametrit:
+        vahti (Latausvahti): Vahti, jonka nykyinen tilannekuva sisältää Aineiston.
+    """
+
+    def __init__(self, vahti: Latausvahti) -> None:
+        self.vahti = vahti
+        self.allas = ThreadPoolExecutor(thread_name_prefix="raportti")
+        self.vasteajat: dict[str, Vasteajat] = {}
+
+    async def vastaus(self, reitti: str, kysely: dict[str, list[str]]) -> tuple[dict, bool]:
+        """
+        Palauttaa (vastaus, välimuistiosuma). Puuttuva vastaus lasketaan säiealtaassa.
+
+        Tilannekuva luetaan kerran pyynnön alussa, joten koko pyyntö käyttää samaa
+        dataa, vaikka uusi tilannekuva julkaistaisiin laskennan aikana.
+
+        Poikkeukset:
+            Pyyntovirhe: ks. Aineisto.laskija(); virheellinen syöte (ValueError) tai tyhjä jakso -> 400.
+            Exception: raportin muut virheet sellaisenaan.
+        """
+        aineisto: Aineisto = self.vahti.nykyinen.data
+        valimuisti = aineisto.valimuisti
+        avain, laske = aineisto.laskija(reitti, kysely)
+        tulos = valimuisti.get(avain)
+        osuma = tulos is not None
+        if osuma:
+            valimuisti.move_to_end(avain)
+        else:
+            tulos = self.allas.submit(laske)
+            valimuisti[avain] = tulos
+            if len(valimuisti) > VALIMUISTIN_KOKO:
+                valimuisti.popitem(last=False)
+        try:
+            return await asyncio.shield(asyncio.wrap_future(tulos)), osuma
+        except Exception as e:
+            # Epäonnistuneita laskentoja ei jätetä välimuistiin
+            if valimuisti.get(avain) is tulos:
+                del valimuisti[avain]
+            if isinstance(e, ZeroDivisionError):
+                raise Pyyntovirhe(400, "Jaksolla ei ole mittauksia") from None
+            if isinstance(e, ValueError):
+                raise Pyyntovirhe(400, str(e)) from None
+            raise
+
+    def mittaukset(self) -> dict:
+        """/metrics-vastaus: tilannekuvan tiedot, reittikohtaiset vasteajat ja välimuistin koko."""
+        return {
+            **self.vahti.tiedot(),
+            "valimuistin_koko": len(self.vahti.nykyinen.data.valimuisti),
+            "reitit": {reitti: ajat.sanakirjana() for reitti, ajat in sorted(self.vasteajat.items())},
+        }
+
+    async def kasittele(self, menetelma: str, kohde: str) -> tuple[int, dict]:
+        """Käsittelee yhden pyynnön ja kirjaa sen vasteajan. Palauttaa (tila, JSON-runko)."""
+        alku = perf_counter()
+        osat = urlsplit(kohde)
+        reitti = osat.path.rstrip("/") or "/"
+        osuma = False
+        try:
+            if menetelma != "GET":
+                raise Pyyntovirhe(405, f"Vain GET on tuettu: {menetelma}")
+            if reitti == "/metrics":
+                tila, runko = 200, self.mittaukset()
+            else:
+                runko, osuma = await self.vastaus(reitti, parse_qs(osat.query))
+                tila = 200
+        except Pyyntovirhe as e:
+            tila, runko = e.tila, {"virhe": str(e)}
+        except Exception as e:  # raportin odottamaton virhe ei kaada palvelua
+            tila, runko = 500, {"virhe": f"{type(e).__name__}: {e}"}
+        if tila != 404:
+            self.vasteajat.setdefault(reitti, Vasteajat()).paivita(perf_counter() - alku, osuma)
+        return tila, runko
+
+    async def yhteys(self, lukija: asyncio.StreamReader, kirjoittaja: asyncio.StreamWriter) -> None:
+        """Palvelee yhden TCP-yhteyden pyynnöt (HTTP/1.1, pysyvät yhteydet)."""
+        try:
+            while True:
+                pyyntorivi = await lukija.readline()
+                if not pyyntorivi.strip():
+                    break
+                menetelma, kohde, versio = pyyntorivi.decode("latin-1").split()
+                otsakkeet = {}
+                while (rivi := await lukija.readline()) not in (b"\r\n", b"\n", b""):
+                    nimi, _, arvo = rivi.decode("latin-1").partition(":")
+                    otsakkeet[nimi.strip().lower()] = arvo.strip()
+                # Rungollisia pyyntöjä ei tueta, mutta runko luetaan pois yhteyden jatkamiseksi
+                await lukija.readexactly(int(otsakkeet.get("content-length", 0)))
+
+                tila, runko = await self.kasittele(menetelma, kohde)
+                data = json.dumps(runko, ensure_ascii=False).encode("utf-8")
+                sulje = otsakkeet.get("connection", "").lower() == "close" or versio == "HTTP/1.0"
+                kirjoittaja.write(
+                    f"HTTP/1.1 {tila} {TILAT[tila]}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'close' if sulje else 'keep-alive'}\r\n\r\n".encode("latin-1") + data
+                )
+                await kirjoittaja.drain()
+                if sulje:
+                    break
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass  # katkennut tai virheellinen yhteys suljetaan
+        finally:
+            kirjoittaja.close()
+
+
+async def palvele(osoite: str, portti: int, tarkistusvali: float) -> None:
+    """Lataa datan, käynnistää latausvahdin ja palvelee pyyntöjä, kunnes ohjelma keskeytetään."""
+    vahti = Latausvahti([ENERGIATIEDOSTO, VARAUSTIEDOSTO], rakenna_aineisto)
+    while vahti.lataa() is None:  # tiedosto muuttui kesken ensimmäisen latauksen
+        pass
+    if tarkistusvali > 0:
+        vahti.kaynnista(tarkistusvali, lambda viesti: print(viesti, flush=True))
+    palvelu = Kyselypalvelu(vahti)
+    palvelin = await asyncio.start_server(palvelu.yhteys, osoite, portti)
+    aineisto = vahti.nykyinen.data
+    print(f"Palvelu käynnissä: http://{osoite}:{portti}/ "
+          f"({len(aineisto.energia)} tuntiriviä, {len(aineisto.varaukset)} varausta, "
+          f"latausaika {1000 * vahti.nykyinen.kesto:.1f} ms)", flush=True)
+    try:
+        async with palvelin:
+            await palvelin.serve_forever()
+    finally:
+        vahti.pysayta()
+        palvelu.allas.shutdown(wait=False, cancel_futures=True)
+
+
+def main() -> None:
+    """Pääohjelma: lukee osoitteen ja portin komentoriviltä ja käynnistää palvelun."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Energia- ja varausraporttien HTTP/JSON-kyselypalvelu.")
+    parser.add_argument("--osoite", default=OLETUSOSOITE, help=f"Kuunneltava osoite (oletus: {OLETUSOSOITE})")
+    parser.add_argument("--portti", type=int, default=OLETUSPORTTI, help=f"Kuunneltava portti (oletus: {OLETUSPORTTI})")
+    parser.add_argument("--tarkistusvali", type=float, default=TARKISTUSVALI,
+                        help=f"Lähdetiedostojen muutosten tarkistusväli sekunteina, 0 = ei uudelleenlatausta "
+                             f"(oletus: {TARKISTUSVALI})")
+    args = parser.parse_args()
+    try:
+        asyncio.run(palvele(args.osoite, args.portti, args.tarkistusvali))
+    except KeyboardInterrupt:
+        print("Palvelu pysäytetty.")
+
+
+if __name__ == "__main__":
+    main()
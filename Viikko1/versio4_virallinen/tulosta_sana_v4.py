@@ -8,61 +8,309 @@ ja tulostaa sen konsoliin.
 
 Käyttö:
     python tulosta_sana_v4.py --tiedosto sana.txt
+    python tulosta_sana_v4.py polku1 polku2 hakemisto/ ...   (massatila)
+    find . -name '*.txt' | python tulosta_sana_v4.py -       (polut syötteestä)
+
+Massatila:
+    Useat tiedostot, hakemistot (läpikäydään rekursiivisesti) ja "-"
+    (rivinvaihdoin eroteltu polkulista syötteestä) tarkistetaan yhdessä
+    prosessissa säiealtaassa. Tulokset tulostetaan syöttöjärjestyksessä
+    heti kun ne valmistuvat:
+        polku<TAB>sana                onnistui
+        polku<TAB>!<paluuarvo> viesti  virhe (1 tai 2, ks. paluuarvot)
+    "!" ei voi esiintyä sanassa, joten rivit on helppo erottaa. Lopuksi
+    virhetulosteeseen kirjoitetaan yhteenveto paluuarvoittain.
 
 Paluuarvot:
     0  onnistui
     1  tiedostoa ei löytynyt tai virhe argumenteissa
-    2  tiedoston sisältö virheellinen
+    2  tiedoston sisältö virheellinen (myös: tiedosto yli --enimmaiskoko tavua)
+    Massatilassa paluuarvo on suurin tiedostokohtainen paluuarvo.
+
+Käynnistysaika:
+    Ohjelmaa ajetaan eräajoissa tuhansia kertoja, joten tuontien kustannus
+    ratkaisee. Moduulin tasolla tuodaan vain sys ja os (jotka tulkki on jo
+    ladannut). argparse (~12 ms tuonteineen) tuodaan vasta, kun argumentit
+    eivät ole yksinkertaisia (esim. --help tai virheellinen lippu); re ja
+    pathlib (~6 ms kumpikin) eivät ole käytössä lainkaan. concurrent.futures
+    tuodaan vain massatilassa.
+
+    Tuontibudjetti: `python -X importtime tulosta_sana_v4.py -t sana.txt`
+    ei saa näyttää site-moduulin jälkeen muita tuonteja kuin __future__
+    (alle 1 ms). Ennen muutosta tuonnit veivät noin 13 ms. Budjetti
+    tarkistetaan testissä tests/test_tuontibudjetti.py.
 """
 
 from __future__ import annotations
-import argparse
-import re
+import codecs
+import os
 import sys
-from pathlib import Path
+
+# typing-moduulia ei tuoda (tuontibudjetti); tyyppitarkistimet tunnistavat
+# TYPE_CHECKING-nimen, joten alla olevat tuonnit tehdään vain tarkistettaessa
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+OLETUSTIEDOSTO = "sana.txt"
+
+# Massatilan polkulista luetaan syötteestä, kun polku on "-"
+SYOTE = "-"
+
+# Massatilan säikeet (sama kuin ThreadPoolExecutorin oletus)
+OLETUSSAIKEET = min(32, (os.cpu_count() or 1) + 4)
+
+# Keskeneräisiä tarkistuksia säiettä kohden; rajaa muistinkäytön suurissa hakemistopuissa
+JONO_SAIETTA_KOHDEN = 4
+
+# Suurin luettava tiedoston koko tavuina; isommat hylätään lukematta loppuun
+ENIMMAISKOKO = 64 * 1024
+
+# Lukulohkon koko tavuina
+LOHKO = 4096
+
+VIRHEELLINEN_SISALTO = "Tiedoston tulee sisältää vain yksi sana ilman välilyöntejä tai erikoismerkkejä."
+
+# Sanan sallitut erikoismerkit kirjainten ja numeroiden lisäksi
+SALLITUT_ERIKOISMERKIT = str.maketrans("_-", "aa")
+
+
+class Argumentit:
+    """
+    Jäsennetyt komentoriviargumentit.
+
+    Attribuutit:
+        tiedosto (str): Yhden tiedoston tilan polku.
+        polut (list[str]): Massatilan polut, hakemistot ja "-"; tyhjä yhden tiedoston tilassa.
+        saikeet (int | None): Massatilan säikeiden määrä (None: OLETUSSAIKEET).
+        enimmaiskoko (int): Suurin hyväksytty tiedoston koko tavuina.
+    """
+
+    def __init__(self, tiedosto: str = OLETUSTIEDOSTO, polut: list[str] | None = None,
+                 saikeet: int | None = None, enimmaiskoko: int = ENIMMAISKOKO) -> None:
+        self.tiedosto = tiedosto
+        self.polut = polut or []
+        self.saikeet = saikeet
+        self.enimmaiskoko = enimmaiskoko
 
 
-def lue_argumentit() -> argparse.Namespace:
-    """Lukee komentorivin argumentit."""
+def _lue_argumentit_argparse(argv: list[str] | None = None) -> Argumentit:
+    """Täysi argumenttien käsittely (ohje, virheilmoitukset) argparse-moduulilla."""
+    import argparse
+
     parser = argparse.ArgumentParser(
         description="Lue tiedostosta yksi sana ja tulosta se."
     )
     parser.add_argument(
         "-t",
         "--tiedosto",
-        type=Path,
-        default=Path("sana.txt"),
+        default=OLETUSTIEDOSTO,
         help="Tiedoston polku (oletus: sana.txt)",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "polut",
+        nargs="*",
+        help="Massatila: tiedostot ja hakemistot; - lukee polut syötteestä rivi kerrallaan",
+    )
+    parser.add_argument(
+        "-s",
+        "--saikeet",
+        type=int,
+        default=None,
+        help="Massatilan säikeiden määrä (oletus: prosessorien määrä + 4, enintään 32)",
+    )
+    parser.add_argument(
+        "-k",
+        "--enimmaiskoko",
+        type=int,
+        default=ENIMMAISKOKO,
+        help=f"Suurin hyväksytty tiedoston koko tavuina (oletus: {ENIMMAISKOKO})",
+    )
+    args = parser.parse_args(argv)
+    if args.saikeet is not None and args.saikeet < 1:
+        parser.error("säikeitä on oltava vähintään 1")
+    if args.enimmaiskoko < 1:
+        parser.error("enimmäiskoon on oltava vähintään 1 tavu")
+    return Argumentit(args.tiedosto, args.polut, args.saikeet, args.enimmaiskoko)
+
+
+def lue_argumentit(argv: list[str] | None = None) -> Argumentit:
+    """
+    Lukee komentorivin argumentit.
+
+    Yksinkertaiset muodot (ei argumentteja, "-t polku", "--tiedosto polku",
+    "--tiedosto=polku" ja pelkät massatilan polut) käsitellään suoraan. Muut
+    muodot käsittelee argparse, joka tulostaa ohjeen tai virheilmoituksen.
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    if not argv:
+        return Argumentit()
+    if len(argv) == 2 and argv[0] in ("-t", "--tiedosto") and not argv[1].startswith("-"):
+        return Argumentit(argv[1])
+    if len(argv) == 1 and argv[0].startswith("--tiedosto=") and len(argv[0]) > len("--tiedosto="):
+        return Argumentit(argv[0][len("--tiedosto="):])
+    if all(arg == SYOTE or not arg.startswith("-") for arg in argv):
+        return Argumentit(polut=argv)
+    return _lue_argumentit_argparse(argv)
+
+
+def on_yksi_sana(teksti: str) -> bool:
+    """
+    Palauttaa True, jos teksti koostuu pelkistä kirjaimista, numeroista,
+    alaviivoista ja väliviivoista (sama kuin säännöllinen lauseke ^[\\w-]+$).
+    """
+    return teksti.translate(SALLITUT_ERIKOISMERKIT).isalnum()
 
 
-def lue_yksi_sana(polku: Path) -> str:
+def lue_yksi_sana(polku: str | os.PathLike, enimmaiskoko: int = ENIMMAISKOKO) -> str:
     """
     Lukee tiedoston ja tarkistaa, että siinä on vain yksi sana.
 
     Sallitut merkit: kirjaimet, numerot, alaviiva, väliviiva.
-    Tiedoston lopussa saa olla rivinvaihto.
+    Tiedoston alussa ja lopussa saa olla tyhjää (esim. rivinvaihto).
+
+    Tiedosto luetaan LOHKO tavun paloina ja puretaan UTF-8:ksi vähitellen.
+    Lukeminen lopetetaan heti, kun vastaan tulee kielletty merkki, sanan
+    jälkeinen uusi sana tai enimmaiskoko ylittyy, joten aika ja muisti eivät
+    riipu virheellisen tiedoston koosta.
+
+    Poikkeukset:
+        FileNotFoundError: jos tiedostoa ei ole.
+        ValueError: jos sisältö ei ole yksi sana, ei ole UTF-8:aa tai tiedosto
+            on suurempi kuin enimmaiskoko tavua.
     """
-    if not polku.exists():
+    if not os.path.exists(polku):
         raise FileNotFoundError(f"Tiedostoa ei löydy: {polku}")
 
-    teksti = polku.read_text(encoding="utf-8").strip()
-    kaava = re.compile(r"^[\w-]+$", flags=re.UNICODE)
+    with open(polku, "rb", buffering=0) as f:
+        # Tavallisen tiedoston koko nähdään lukematta; putket ym. rajataan lukiessa
+        if os.fstat(f.fileno()).st_size > enimmaiskoko:
+            raise ValueError(_liian_suuri(enimmaiskoko))
+
+        purkaja = codecs.getincrementaldecoder("utf-8")()
+        osat: list[str] = []
+        sana_paattyi = False
+        luettu = 0
+        while True:
+            lohko = f.read(min(LOHKO, enimmaiskoko - luettu + 1))
+            luettu += len(lohko)
+            if luettu > enimmaiskoko:
+                raise ValueError(_liian_suuri(enimmaiskoko))
+            teksti = purkaja.decode(lohko, final=not lohko)
+            alku = teksti if osat else teksti.lstrip()
+            sisalto = alku.rstrip()
+            if sisalto:
+                if sana_paattyi or not on_yksi_sana(sisalto):
+                    raise ValueError(VIRHEELLINEN_SISALTO)
+                osat.append(sisalto)
+            if osat and len(sisalto) < len(alku):
+                sana_paattyi = True
+            if not lohko:
+                break
+
+    if not osat:
+        raise ValueError(VIRHEELLINEN_SISALTO)
+
+    return "".join(osat)
+
+
+def _liian_suuri(enimmaiskoko: int) -> str:
+    return f"Tiedosto on liian suuri yhdeksi sanaksi (yli {enimmaiskoko} tavua)."
+
+
+def tarkista(polku: str, enimmaiskoko: int = ENIMMAISKOKO) -> tuple[str, int, str]:
+    """
+    Tarkistaa yhden tiedoston ja palauttaa (polku, paluuarvo, sana tai virheviesti).
+
+    Paluuarvot ovat samat kuin yhden tiedoston tilassa; muut käyttöjärjestelmän
+    virheet (esim. lukuoikeus puuttuu) tulkitaan paluuarvoksi 1.
+    """
+    try:
+        return polku, 0, lue_yksi_sana(polku, enimmaiskoko)
+    except ValueError as e:  # myös UnicodeDecodeError
+        return polku, 2, str(e)
+    except OSError as e:  # FileNotFoundError, PermissionError, IsADirectoryError
+        return polku, 1, str(e)
+
 
-    if not teksti or not kaava.match(teksti):
-        raise ValueError(
-            "Tiedoston tulee sisältää vain yksi sana ilman välilyöntejä tai erikoismerkkejä."
-        )
+def laajenna_polut(polut: Iterable[str]) -> Iterator[str]:
+    """
+    Tuottaa tarkistettavat tiedostopolut.
+
+    Hakemistot käydään läpi rekursiivisesti aakkosjärjestyksessä, ja "-" lukee
+    polut syötteestä (tyhjät rivit ohitetaan). Muut polut tuotetaan sellaisinaan,
+    joten puuttuva tiedosto näkyy tuloksissa paluuarvolla 1.
+    """
+    for polku in polut:
+        if polku == SYOTE:
+            yield from laajenna_polut(rivi.rstrip("\r\n") for rivi in sys.stdin if rivi.strip())
+        elif os.path.isdir(polku):
+            for juuri, hakemistot, tiedostot in os.walk(polku):
+                hakemistot.sort()
+                for nimi in sorted(tiedostot):
+                    yield os.path.join(juuri, nimi)
+        else:
+            yield polku
+
+
+def tarkista_monta(polut: Iterable[str], saikeet: int | None = None,
+                   enimmaiskoko: int = ENIMMAISKOKO) -> Iterator[tuple[str, int, str]]:
+    """
+    Tarkistaa tiedostot säiealtaassa (oletuksena OLETUSSAIKEET säiettä) ja
+    tuottaa tarkista()-tulokset syöttöjärjestyksessä.
+
+    Keskeneräisiä tarkistuksia on kerrallaan enintään JONO_SAIETTA_KOHDEN * säikeet,
+    joten polkulista voi olla mielivaltaisen pitkä ja tulokset virtaavat heti.
+    """
+    from collections import deque
+    from concurrent.futures import ThreadPoolExecutor
 
-    return teksti
+    saikeet = saikeet or OLETUSSAIKEET
+    with ThreadPoolExecutor(max_workers=saikeet) as allas:
+        jono = deque()
+        raja = JONO_SAIETTA_KOHDEN * saikeet
+        for polku in polut:
+            jono.append(allas.submit(tarkista, polku, enimmaiskoko))
+            if len(jono) >= raja:
+                yield jono.popleft().result()
+        while jono:
+            yield jono.popleft().result()
+
+
+def massatarkistus(polut: list[str], saikeet: int | None = None, enimmaiskoko: int = ENIMMAISKOKO) -> int:
+    """
+    Massatilan päätoiminto: tulostaa tulokset riveittäin ja yhteenvedon.
+
+    Palauttaa:
+        int: Suurin tiedostokohtainen paluuarvo (0, jos kaikki onnistuivat).
+    """
+    maarat = [0, 0, 0]  # paluuarvo -> tiedostojen määrä
+    tuloste = sys.stdout
+    for polku, paluuarvo, teksti in tarkista_monta(laajenna_polut(polut), saikeet, enimmaiskoko):
+        maarat[paluuarvo] += 1
+        if paluuarvo:
+            tuloste.write(f"{polku}\t!{paluuarvo} {teksti}\n")
+        else:
+            tuloste.write(f"{polku}\t{teksti}\n")
+    tuloste.flush()
+
+    print(
+        f"Tarkistettu {sum(maarat)} tiedostoa: 0 (onnistui) {maarat[0]}, "
+        f"1 (ei löytynyt) {maarat[1]}, 2 (virheellinen) {maarat[2]}",
+        file=sys.stderr,
+    )
+    return 2 if maarat[2] else 1 if maarat[1] else 0
 
 
 def main() -> int:
     """Ohjelman päätoiminto."""
-    args = lue_argumentit()
+    argumentit = lue_argumentit()
+    if argumentit.polut:
+        return massatarkistus(argumentit.polut, argumentit.saikeet, argumentit.enimmaiskoko)
+
     try:
-        sana = lue_yksi_sana(args.tiedosto)
+        sana = lue_yksi_sana(argumentit.tiedosto, argumentit.enimmaiskoko)
     except FileNotFoundError as e:
         print(f"Virhe: {e}", file=sys.stderr)
         return 1
@@ -75,4 +323,4 @@ def main() -> int:
 
 
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(main())
@@ -9,11 +9,22 @@
 
 # See <https://www.gnu.org/licenses/>.
 
-from datetime import datetime, date
-from typing import List, Tuple
+import os
+import sys
+from datetime import datetime, date, timedelta
+
+# Yhteiset apumoduulit (yhteiset/) ovat repositorion juuressa
+# (os.path ilman pathlib-tuontia nopeuttaa käynnistystä)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__)))))
+
+from yhteiset.aukot import tarkista_aikaleimat
+from yhteiset.hylkaykset import Hylkaykset, hylkaykset_tiedostolle, lue_hylkaysraja
+from yhteiset.isoviikot import Viikkotunnistin, csv_tiedostot, maanantai
+from yhteiset.pakkaus import avaa_luettavaksi
+from yhteiset.profilointi import kirjaa_rivit, mittaa, vaihe
 
 # Rivi: (aikaleima, kulutus_v1_Wh, kulutus_v2_Wh, kulutus_v3_Wh, tuotanto_v1_Wh, tuotanto_v2_Wh, tuotanto_v3_Wh)
-Rivi = Tuple[datetime, int, int, int, int, int, int]
+Rivi = tuple[datetime, int, int, int, int, int, int]
 
 def muunna_tiedot(tietue: list[str]) -> Rivi:
     """
@@ -26,7 +37,7 @@ def muunna_tiedot(tietue: list[str]) -> Rivi:
             - loput kentät: kokonaislukuja (Wh)
 
     Palauttaa:
-        Rivi: Tuple (datetime, int, int, int, int, int, int), jossa kulutus/tuotantoarvot ovat Wh-yksiköissä.
+        Rivi: tuple (datetime, int, int, int, int, int, int), jossa kulutus/tuotantoarvot ovat Wh-yksiköissä.
 
     Poikkeukset:
         ValueError: jos kenttiä ei ole täsmälleen 7, datetime ei ole ISO8601-muodossa
@@ -47,7 +58,9 @@ def muunna_tiedot(tietue: list[str]) -> Rivi:
         int(tietue[6]),
     )
 
-def lue_data(tiedoston_nimi: str) -> List[Rivi]:
+@mittaa()
+def lue_data(tiedoston_nimi: str, hylkaykset: Hylkaykset | None = None,
+             tunnistin: Viikkotunnistin | None = None) -> list[Rivi]:
     """
     Lukee puolipiste-erotellun CSV-tiedoston ja palauttaa rivit tupleina (Rivi) oikeilla tietotyypeillä.
 
@@ -62,27 +75,49 @@ def lue_data(tiedoston_nimi: str) -> List[Rivi]:
         tiedoston_nimi (str): Polku CSV-tiedostoon, jossa kentät erotellaan puolipisteellä ';'.
 
     Palauttaa:
-        List[Rivi]: Lista rivejä, jossa jokainen rivi on tuple:
+        list[Rivi]: Lista rivejä, jossa jokainen rivi on tuple:
             (datetime, int, int, int, int, int, int)
 
     Poikkeukset:
         FileNotFoundError / OSError: jos tiedosto puuttuu tai sitä ei voi lukea.
         ValueError: jos jokin rivi ei noudata odotettua muotoa
                     (esim. väärä datetime-muoto tai ei-kokonaislukuarvo).
+
+    Sietoinen tila (hylkaykset annettu):
+        Virheelliset rivit ohitetaan ja kirjataan sivutiedostoon; poikkeus
+        nostetaan vain, jos hylättyjen osuus ylittää rajan (HylkaysrajaYlittyi).
+
+    Viikon tunnistus (tunnistin annettu):
+        Jokaisen rivin aikaleima kirjataan tunnistimeen samalla läpikäynnillä,
+        ja tiedoston ISO-viikon saa lopuksi tunnistin.viikko()-kutsulla.
     """
-    tietokanta: List[Rivi] = []
-    with open(tiedoston_nimi, "r", encoding="utf-8") as f:
+    tietokanta: list[Rivi] = []
+    with vaihe("muunna_tiedot"), avaa_luettavaksi(tiedoston_nimi) as f:
         next(f, None)  # Ohittaa ensimmäisen rivin (otsikon) turvallisesti, myös tyhjässä tiedostossa
-        for rivi in f:
-            rivi = rivi.strip() # Poistaa kaikki alusta ja lopusta löytyvät whitespace-merkit (välilyönti, rivinvaihto, jne.)
-            if not rivi:
-                continue # Ohita tyhjät rivit
-            tietue = rivi.split(";")
-            tietokanta.append(muunna_tiedot(tietue))
-
+        if hylkaykset is not None:
+            # Sietoinen tila: virheelliset rivit kirjataan ja ohitetaan
+            for tietue in hylkaykset.kasittele(f, ";", 7, muunna_tiedot, ensimmainen_rivinumero=2):
+                tietokanta.append(tietue)
+                if tunnistin is not None:
+                    tunnistin.paivita(tietue[0])
+        else:
+            for rivi in f:
+                rivi = rivi.strip() # Poistaa kaikki alusta ja lopusta löytyvät whitespace-merkit (välilyönti, rivinvaihto, jne.)
+                if not rivi:
+                    continue # Ohita tyhjät rivit
+                tietue = muunna_tiedot(rivi.split(";"))
+                tietokanta.append(tietue)
+                if tunnistin is not None:
+                    tunnistin.paivita(tietue[0])
+        kirjaa_rivit(len(tietokanta))
+
+    if hylkaykset is not None:
+        hylkaykset.viimeistele()
+    kirjaa_rivit(len(tietokanta))
     return tietokanta
 
-def paivan_tiedot(paiva: date, tietokanta: List[Rivi]) -> List[str]:
+@mittaa(rivit=lambda paiva, tietokanta: len(tietokanta))  # päivä haetaan koko listasta
+def paivan_tiedot(paiva: date, tietokanta: list[Rivi]) -> list[str]:
     """
     Laskee annetulle päivälle (date) kulutus- ja tuotantosummat vaiheittain ja palauttaa tulostusystävällisen listan merkkijonoja.
 
@@ -93,11 +128,11 @@ def paivan_tiedot(paiva: date, tietokanta: List[Rivi]) -> List[str]:
 
     Parametrit:
         paiva (date): Päivä, jolta summat lasketaan.
-        tietokanta (List[Rivi]): Luettu tietokanta, jossa jokainen rivi on
+        tietokanta (list[Rivi]): Luettu tietokanta, jossa jokainen rivi on
             (datetime, kulutus_v1_Wh, kulutus_v2_Wh, kulutus_v3_Wh, tuotanto_v1_Wh, tuotanto_v2_Wh, tuotanto_v3_Wh).
     
     Palauttaa:
-        List[str]: Seuraavassa järjestyksessä:
+        list[str]: Seuraavassa järjestyksessä:
             [
                 "dd.mm.yyyy",
                 "kulutus_v1_kWh",
@@ -147,25 +182,45 @@ def paivan_tiedot(paiva: date, tietokanta: List[Rivi]) -> List[str]:
     ]
 
 
+# Päivärivien alut; lyhyet nimet tarvitsevat toisen sarkaimen
+PAIVIEN_NIMET: tuple[str, ...] = (
+    "maanantai\t", "tiistai\t\t", "keskiviikko\t", "torstai\t\t",
+    "perjantai\t", "lauantai\t", "sunnuntai\t",
+)
+
+@mittaa()
 def main() -> None:
     """
     Pääfunktio:
-      - Lukee CSV-datan tiedostosta 'viikko42.csv'
+      - Lukee CSV-datan komentoriviltä annetuista tiedostoista tai hakemistoista
+        (oletus: nykyhakemiston viikko*.csv eli 'viikko42.csv') ja tarkistaa aukot/kaksoiskappaleet
+      - Tunnistaa tiedoston ISO-viikon ja maanantain aikaleimoista jäsennyksen aikana
       - Laskee vaiheittaiset kulutus- ja tuotantosummat jokaiselle viikonpäivälle
-      - Tulostaa taulukkoraportin (kWh, 2 desimaalia, pilkku desimaalierottimena)
+      - Tulostaa taulukkoraportin viikoittain aikajärjestyksessä
+        (kWh, 2 desimaalia, pilkku desimaalierottimena)
     """
-    kulutus_tuotanto_tietokanta = lue_data("viikko42.csv")
-    print("\nViikon 42 sähkönkulutus ja -tuotanto (kWh, vaiheittain)", end="\n\n")
-    print("Päivä\t\tPvm\t\tKulutus [kWh]\t\tTuotanto [kWh]")
-    print("\t\t(pv.kk.vvvv)\tv1\tv2\tv3\tv1\tv2\tv3")
-    print("---------------------------------------------------------------------------")
-    print("maanantai\t" + "\t".join(paivan_tiedot(date(2025, 10, 13), kulutus_tuotanto_tietokanta)))
-    print("tiistai\t" + "\t" + "\t".join(paivan_tiedot(date(2025, 10, 14), kulutus_tuotanto_tietokanta)))
-    print("keskiviikko\t" + "\t".join(paivan_tiedot(date(2025, 10, 15), kulutus_tuotanto_tietokanta)))
-    print("torstai\t" + "\t" + "\t".join(paivan_tiedot(date(2025, 10, 16), kulutus_tuotanto_tietokanta)))
-    print("perjantai\t" + "\t".join(paivan_tiedot(date(2025, 10, 17), kulutus_tuotanto_tietokanta)))
-    print("lauantai\t" + "\t".join(paivan_tiedot(date(2025, 10, 18), kulutus_tuotanto_tietokanta)))
-    print("sunnuntai\t" + "\t".join(paivan_tiedot(date(2025, 10, 19), kulutus_tuotanto_tietokanta)))
+    # Lipulla --sietoinen[=raja] virheelliset rivit ohitetaan ja kirjataan
+    hylkaysraja = lue_hylkaysraja()
+    luetut = []
+    for tiedosto in csv_tiedostot(sys.argv[1:]):
+        tunnistin = Viikkotunnistin()
+        tietokanta = lue_data(tiedosto, hylkaykset_tiedostolle(tiedosto, hylkaysraja), tunnistin)
+        luetut.append((tunnistin.viikko(), tiedosto, tietokanta))
+        kirjaa_rivit(len(tietokanta))
+    luetut.sort(key=lambda luettu: luettu[:2])
+
+    for viikko, tiedosto, kulutus_tuotanto_tietokanta in luetut:
+        # Tarkistetaan aukot ja kaksoiskappaleet jo luetusta aikasarakkeesta (O(n))
+        aukkoindeksi = tarkista_aikaleimat([tietue[0] for tietue in kulutus_tuotanto_tietokanta])
+        if not aukkoindeksi.on_kunnossa():
+            print(f"Huomio: {aukkoindeksi.yhteenveto()}")
+        print(f"\nViikon {viikko[1]} sähkönkulutus ja -tuotanto (kWh, vaiheittain)", end="\n\n")
+        print("Päivä\t\tPvm\t\tKulutus [kWh]\t\tTuotanto [kWh]")
+        print("\t\t(pv.kk.vvvv)\tv1\tv2\tv3\tv1\tv2\tv3")
+        print("---------------------------------------------------------------------------")
+        viikon_maanantai = maanantai(viikko)
+        for i, nimi in enumerate(PAIVIEN_NIMET):
+            print(nimi + "\t".join(paivan_tiedot(viikon_maanantai + timedelta(days=i), kulutus_tuotanto_tietokanta)))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,208 @@
+# Copyright (c) 2025 Jonna Kangas
+
+# Ohjelmoinnin perusteet -opintojakso, harjoitustehtävä 5B
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# See <https://www.gnu.org/licenses/>.
+
+"""
+Sarakemuotoinen (tunnit × 6) esitys 3-vaiheiselle kulutus- ja tuotantodatalle.
+
+Rivi-tuplejen sijaan jokainen Wh-sarake tallennetaan omaan array('q')-taulukkoonsa.
+Analytiikka (vaiheiden epätasapaino, netto vaiheittain, viikon kuormituskertoimet,
+omakäyttö ja ylijäämätunnit) lasketaan kokonaisina sarakeoperaatioina (map/sum/slice), ei rivi kerrallaan.
+Liukuvat huippusummat lasketaan yhdellä läpikäynnillä juoksevina summina.
+"""
+
+from array import array
+from datetime import date
+from operator import sub
+
+from yhteiset.aikasarja import Aikasarja
+from yhteiset.liukuvat import IKKUNAT, Liukuvat
+from yhteiset.omakaytto import Omakaytto, summasarake
+from yhteiset.uudelleenotanta import segmenttirajat
+
+# Sarakkeiden järjestys vastaa CSV-tiedoston ja Rivi-tuplen järjestystä
+SARAKKEET: tuple[str, ...] = (
+    "kulutus_v1", "kulutus_v2", "kulutus_v3",
+    "tuotanto_v1", "tuotanto_v2", "tuotanto_v3",
+)
+
+
+class Vaihematriisi(Aikasarja):
+    """
+    Tuntimittaukset matriisina: aikaleimat + 6 Wh-saraketta (kulutus v1–v3, tuotanto v1–v3).
+
+    Rivit oletetaan aikajärjestykseen (kuten CSV-tiedostoissa). Jos rivejä lisätään
+    epäjärjestyksessä, matriisi järjestetään kerran ennen ensimmäistä aikahakua.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(SARAKKEET, "q")
+
+    def paivan_summat(self, paiva: date) -> list[int]:
+        """Laskee annetun päivän summat sarakkeittain (Wh)."""
+        return self.summat(*self.paivien_rajat(paiva, paiva))
+
+
+def vaiheiden_epatasapaino(matriisi: Vaihematriisi) -> array:
+    """
+    Laskee jokaiselle tunnille kulutuksen vaihe-epätasapainon.
+
+    Epätasapaino = (suurin vaihe - pienin vaihe) / vaiheiden keskiarvo.
+    Jos tunnin kokonaiskulutus on 0, epätasapainoksi merkitään 0.
+
+    Palauttaa:
+        array('d'): Yksi arvo tuntia kohden.
+    """
+    k1, k2, k3 = matriisi.sarakkeet[:3]
+    suurimmat = map(max, k1, k2, k3)
+    pienimmat = map(min, k1, k2, k3)
+    summat = map(sum, zip(k1, k2, k3))
+    return array("d", (
+        3 * (suurin - pienin) / summa if summa else 0.0
+        for suurin, pienin, summa in zip(suurimmat, pienimmat, summat)
+    ))
+
+
+def netto_vaiheittain(matriisi: Vaihematriisi) -> tuple[array, array, array]:
+    """
+    Laskee tunneittaisen nettokulutuksen (kulutus - tuotanto) jokaiselle vaiheelle.
+
+    Palauttaa:
+        tuple[array, array, array]: Nettosarakkeet v1, v2, v3 (Wh, voi olla negatiivinen).
+    """
+    kulutus = matriisi.sarakkeet[:3]
+    tuotanto = matriisi.sarakkeet[3:]
+    return tuple(array("q", map(sub, k, t)) for k, t in zip(kulutus, tuotanto))
+
+
+def viikkojen_rajat(matriisi: Vaihematriisi) -> list[tuple[tuple[int, int], int, int]]:
+    """
+    Jakaa (järjestetyn) matriisin ISO-viikkoihin.
+
+    Palauttaa:
+        list: [((vuosi, viikko), a, b), ...], jossa [a, b) on viikon indeksiväli.
+    """
+    matriisi.jarjesta()
+    avaimet, rajat = segmenttirajat(matriisi.aikaleimat, "viikko")
+    return list(zip(avaimet, rajat, rajat[1:]))
+
+
+def kuormituskertoimet(matriisi: Vaihematriisi) -> dict[tuple[int, int], tuple[float, float, float]]:
+    """
+    Laskee kulutuksen kuormituskertoimen (keskiteho / huipputeho) vaiheittain jokaiselle ISO-viikolle.
+
+    Palauttaa:
+        dict: (vuosi, viikko) -> (kerroin_v1, kerroin_v2, kerroin_v3). Jos vaiheen huippu on 0, kerroin on 0.
+    """
+    tulos = {}
+    for viikko, a, b in viikkojen_rajat(matriisi):
+        kertoimet = []
+        for sarake in matriisi.sarakkeet[:3]:
+            osa = sarake[a:b]
+            huippu = max(osa)
+            kertoimet.append(sum(osa) / len(osa) / huippu if huippu else 0.0)
+        tulos[viikko] = tuple(kertoimet)
+    return tulos
+
+
+def omakaytto_viikoittain(matriisi: Vaihematriisi) -> dict[tuple[int, int], tuple[Omakaytto, ...]]:
+    """
+    Laskee tuntikohtaisen omakäytön ja ylijäämän viikoittain vaiheille v1–v3 sekä
+    vaiheiden summalle (tuntinetotus yli vaiheiden).
+
+    Palauttaa:
+        dict: (vuosi, viikko) -> (v1, v2, v3, yhteensä) Omakaytto-tilastot (Wh).
+    """
+    kulutus = matriisi.sarakkeet[:3]
+    tuotanto = matriisi.sarakkeet[3:]
+    sarakeparit = [*zip(kulutus, tuotanto), (summasarake(*kulutus), summasarake(*tuotanto))]
+    tulos = {}
+    for viikko, a, b in viikkojen_rajat(matriisi):
+        aikaleimat = matriisi.aikaleimat[a:b]
+        tilastot = []
+        for k, t in sarakeparit:
+            oma = Omakaytto()
+            oma.lisaa_sarakkeet(aikaleimat, k[a:b], t[a:b])
+            tilastot.append(oma)
+        tulos[viikko] = tuple(tilastot)
+    return tulos
+
+
+def vaiheanalyysi(matriisi: Vaihematriisi) -> str:
+    """
+    Muodostaa viikoittaisen vaiheanalyysiraportin: kuormituskertoimet,
+    keskimääräinen epätasapaino ja nettokulutus vaiheittain (kWh) sekä
+    omavaraisuus, ylijäämätunnit ja pisin ylijäämäjakso vaiheittain ja yhteensä.
+
+    Palauttaa:
+        str: Raporttiteksti (pilkku desimaalierottimena).
+    """
+    epatasapaino = vaiheiden_epatasapaino(matriisi)
+    netto = netto_vaiheittain(matriisi)
+    kertoimet = kuormituskertoimet(matriisi)
+
+    r: list[str] = []
+    r.append("\nVaiheanalyysi viikoittain\n")
+    r.append(f"{'Viikko':<10}{'Kuormituskerroin v1/v2/v3':<28}{'Epätasapaino':<14}{'Netto [kWh] v1/v2/v3':<24}")
+    r.append("-" * 76)
+    for viikko, a, b in viikkojen_rajat(matriisi):
+        k1, k2, k3 = kertoimet[viikko]
+        keski_epatasapaino = sum(epatasapaino[a:b]) / (b - a)
+        n1, n2, n3 = (sum(sarake[a:b]) / 1000.0 for sarake in netto)
+        r.append(
+            f"{f'{viikko[0]}/{viikko[1]}':<10}"
+            f"{f'{k1:.2f} / {k2:.2f} / {k3:.2f}':<28}"
+            f"{keski_epatasapaino:<14.2f}"
+            f"{f'{n1:.2f} / {n2:.2f} / {n3:.2f}':<24}".replace(".", ",")
+        )
+    r.append("-" * 76)
+
+    r.append("\nOmakäyttö viikoittain (tuntinetotus vaiheittain ja vaiheet yhteensä)\n")
+    r.append(f"{'Viikko':<10}{'Omavaraisuus % v1/v2/v3/yht':<32}{'Ylijäämätunnit v1/v2/v3/yht':<30}"
+             f"{'Pisin jakso h v1/v2/v3/yht':<28}")
+    r.append("-" * 100)
+    for viikko, tilastot in omakaytto_viikoittain(matriisi).items():
+        r.append(
+            f"{f'{viikko[0]}/{viikko[1]}':<10}"
+            f"{' / '.join(f'{100 * oma.omavaraisuus:.1f}' for oma in tilastot):<32}".replace(".", ",")
+            + f"{' / '.join(str(oma.ylijaamatunnit) for oma in tilastot):<30}"
+            f"{' / '.join(str(oma.pisin) for oma in tilastot):<28}"
+        )
+    r.append("-" * 100)
+    r.append("")
+    return "\n".join(r)
+
+
+def liukuvat_huiput(matriisi: Vaihematriisi) -> str:
+    """
+    Muodostaa taulukon vaiheiden suurimmista liukuvista summista (24 h, 7 d, 30 d).
+
+    Kaikki ikkunat ja sarakkeet lasketaan samalla läpikäynnillä tarkkoina
+    Wh-kokonaislukusummina (yhteiset.liukuvat). Vain kokonaan datan kattamat
+    jaksot ovat mukana; muuten sarakkeessa on "-".
+
+    Palauttaa:
+        str: Raporttiteksti (pilkku desimaalierottimena).
+    """
+    matriisi.jarjesta()
+    liukuvat = Liukuvat(IKKUNAT, len(SARAKKEET)).lue(zip(matriisi.aikaleimat, zip(*matriisi.sarakkeet)))
+
+    r: list[str] = []
+    r.append("\nSuurimmat liukuvat summat vaiheittain (kWh)\n")
+    r.append(f"{'Jakso':<10}{'Kulutus v1/v2/v3':<28}{'Tuotanto v1/v2/v3':<28}")
+    r.append("-" * 66)
+    for nimi, huiput in liukuvat.huiput.items():
+        k1, k2, k3, t1, t2, t3 = (
+            f"{huippu[0] / 1000.0:.2f}".replace(".", ",") if huippu else "-" for huippu in huiput
+        )
+        r.append(f"{nimi:<10}{f'{k1} / {k2} / {k3}':<28}{f'{t1} / {t2} / {t3}':<28}")
+    r.append("-" * 66)
+    r.append("")
+    return "\n".join(r)
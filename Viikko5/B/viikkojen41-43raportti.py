@@ -9,11 +9,46 @@
 
 # See <https://www.gnu.org/licenses/>.
 
+import os
+import sys
+from collections.abc import Iterable, Iterator
 from datetime import datetime, date, timedelta
+from itertools import chain
+
+# Yhteiset apumoduulit (yhteiset/) ovat repositorion juuressa
+# (os.path ilman pathlib-tuontia nopeuttaa käynnistystä)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__)))))
+
+from vaihematriisi import Vaihematriisi, liukuvat_huiput, vaiheanalyysi
+from viikkovertailu import Paivataulu, vertailurivit
+from yhteiset.aukot import poista_kaksoiskappaleet, tarkista_sarja
+from yhteiset.hylkaykset import Hylkaykset, hylkaykset_tiedostolle, lue_hylkaysraja
+from yhteiset.isoviikot import Viikkotunnistin, csv_tiedostot, maanantai
+from yhteiset.pakkaus import avaa_luettavaksi
+from yhteiset.profilointi import kirjaa_rivit, mittaa, vaihe
+from yhteiset.raportointi import Rivipohja
+from yhteiset.raporttikohde import kirjoita_atomisesti
+from yhteiset.uudelleenotanta import uudelleenota
 
 # Rivi: (aikaleima, kulutus_v1_Wh, kulutus_v2_Wh, kulutus_v3_Wh, tuotanto_v1_Wh, tuotanto_v2_Wh, tuotanto_v3_Wh)
 Rivi = tuple[datetime, int, int, int, int, int, int]
 
+VIIKONPAIVAT: tuple[str, ...] = (
+    "maanantai", "tiistai", "keskiviikko", "torstai",
+    "perjantai", "lauantai", "sunnuntai"
+)
+
+# Viikkoraportin sarakeleveydet
+LEVEYS_VIIKONPAIVA: int = 13  # "Viikonpäivä"-sarakkeen leveys
+LEVEYS_PAIVAMAARA: int = 13   # "Päivämäärä"-sarakkeen leveys (dd.mm.yyyy)
+LEVEYS_NUMERO: int = 8        # Numeroiden (v1–v3 kulutus ja v1–v3 tuotanto) leveys
+
+# Hajautetun ajon raportti (ilman vaiheanalyysiä ja liukuvia huippuja) ei korvaa peräkkäisen ajon yhteenvetoa
+HAJAUTETTU_YHTEENVETO: str = "yhteenveto_hajautettu.txt"
+
+# Päivärivin pohja käännetään kerran: 2 tekstisaraketta + 6 lukua (2 desimaalia)
+PAIVARIVI = Rivipohja([LEVEYS_VIIKONPAIVA, LEVEYS_PAIVAMAARA], [LEVEYS_NUMERO] * 6)
+
 def muunna_tiedot(tietue: list[str]) -> Rivi:
     """
     Muuntaa puolipiste-erotellun CSV-rivin kentät oikeiksi tietotyypeiksi.
@@ -46,50 +81,98 @@ def muunna_tiedot(tietue: list[str]) -> Rivi:
         int(tietue[6]),
     )
 
-def lue_data(tiedoston_nimi: str) -> list[Rivi]:
+@mittaa()
+def lue_data(tiedoston_nimi: str, hylkaykset: Hylkaykset | None = None,
+             tunnistin: Viikkotunnistin | None = None) -> Vaihematriisi:
     """
-    Lukee puolipiste-erotellun CSV-tiedoston ja palauttaa rivit tupleina (Rivi) oikeilla tietotyypeillä.
+    Lukee puolipiste-erotellun CSV-tiedoston suoraan sarakemuotoiseen Vaihematriisiin.
 
     Odotettu syöte:
         - tiedoston_nimi (str): Polku CSV-tiedostoon, jossa ensimmäinen rivi on otsikko.
             Kentät: [ISO8601 datetime, int, int, int, int, int, int]; tyhjät rivit ohitetaan.
+            Tiedosto voi olla pakattu (gzip, bz2, xz, zstd); se puretaan virtana lukemisen aikana.
 
     Toiminta:
     - Ohittaa otsikkorivin, pilkkoo kentät puolipisteellä, ja kutsuu muunna_tiedot() jokaiselle riville.
+    - Muunnettu rivi lisätään matriisin sarakkeisiin; Rivi-tupleja ei säilytetä listana.
 
     Palauttaa:
-    - list[Rivi]: Lista tuple (datetime, int x 6), arvot Wh-yksiköissä.
+    - Vaihematriisi: Aikaleimat + 6 Wh-saraketta (kulutus v1..v3, tuotanto v1..v3).
 
     Poikkeukset:
     - FileNotFoundError / OSError: jos tiedostoa ei löydy tai lukeminen epäonnistuu.
     - ValueError: jos rivin kenttiä ei ole 7, datetime ei ole ISO8601-muotoinen
       tai jokin kenttä ei ole muunnettavissa kokonaisluvuksi.
 
+    Sietoinen tila (hylkaykset annettu):
+    - Virheelliset rivit ohitetaan ja kirjataan sivutiedostoon; poikkeus
+      nostetaan vain, jos hylättyjen osuus ylittää rajan (HylkaysrajaYlittyi).
+
+    Viikon tunnistus (tunnistin annettu):
+    - Jokaisen rivin aikaleima kirjataan tunnistimeen samalla läpikäynnillä,
+      ja tiedoston ISO-viikon saa lopuksi tunnistin.viikko()-kutsulla.
     """
-    tietokanta: list[Rivi] = []
-    with open(tiedoston_nimi, "r", encoding="utf-8") as f:
+    tietokanta = Vaihematriisi()
+    with vaihe("muunna_tiedot"), avaa_luettavaksi(tiedoston_nimi) as f:
         next(f, None)  # Ohittaa ensimmäisen rivin (otsikon) turvallisesti, myös tyhjässä tiedostossa
-        for rivi in f:
-            rivi = rivi.strip() # Poistaa kaikki alusta ja lopusta löytyvät whitespace-merkit (välilyönti, rivinvaihto, jne.)
-            if not rivi:
-                continue # Ohita tyhjät rivit
-            tietue = rivi.split(";")
-            tietokanta.append(muunna_tiedot(tietue))
-
+        if hylkaykset is not None:
+            # Sietoinen tila: virheelliset rivit kirjataan ja ohitetaan
+            for tietue in hylkaykset.kasittele(f, ";", 7, muunna_tiedot, ensimmainen_rivinumero=2):
+                tietokanta.lisaa(tietue)
+                if tunnistin is not None:
+                    tunnistin.paivita(tietue[0])
+        else:
+            for rivi in f:
+                rivi = rivi.strip() # Poistaa kaikki alusta ja lopusta löytyvät whitespace-merkit (välilyönti, rivinvaihto, jne.)
+                if not rivi:
+                    continue # Ohita tyhjät rivit
+                tietue = muunna_tiedot(rivi.split(";"))
+                tietokanta.lisaa(tietue)
+                if tunnistin is not None:
+                    tunnistin.paivita(tietue[0])
+        kirjaa_rivit(len(tietokanta))
+
+    if hylkaykset is not None:
+        hylkaykset.viimeistele()
+    kirjaa_rivit(len(tietokanta))
     return tietokanta
 
-def paivan_tiedot(paiva: date, tietokanta: list[Rivi]) -> list[str]:
+def tarkista_ja_korjaa(tiedoston_nimi: str, tietokanta: Vaihematriisi) -> Vaihematriisi:
+    """
+    Tarkistaa luetun matriisin aukot, kaksoiskappaleet ja järjestyksen (O(n), ei uutta jäsennystä).
+
+    Toiminta:
+    - Tulostaa huomautuksen, jos poikkeamia löytyy.
+    - Yhdistää saman aikaleiman rivit summaamalla: naiiveissa aikaleimoissa syksyn
+      kesäaikavaihdon toistuva tunti on oikea mittaus, joten päiväsummat säilyvät.
+
+    Palauttaa:
+    - Vaihematriisi: Korjattu matriisi (tai sama matriisi, jos korjattavaa ei ollut).
+    """
+    indeksi = tarkista_sarja(tietokanta)
+    if indeksi.on_kunnossa():
+        return tietokanta
+    print(f"Huomio ({tiedoston_nimi}): {indeksi.yhteenveto()}")
+    return poista_kaksoiskappaleet(tietokanta, indeksi, "summa")
+
+def paivan_rivimaara(paiva: date, tietokanta: Vaihematriisi) -> int:
+    """Päivän tuntirivien määrä matriisissa (profiloinnin käsitellyt rivit)."""
+    alku, loppu = tietokanta.paivien_rajat(paiva, paiva)
+    return loppu - alku
+
+@mittaa(rivit=paivan_rivimaara)
+def paivan_tiedot(paiva: date, tietokanta: Vaihematriisi) -> list[str]:
     """
     Laskee annetun päivän kulutus- ja tuotantosummat vaiheittain ja palauttaa ne tulostusystävällisinä merkkijonoina.
 
     Odotettu syöte:
     - paiva (date): Päivä, jolta summat lasketaan.
-    - tietokanta (list[Rivi]): Mittausrivit muodossa
-      (datetime, kulutus_v1_Wh, kulutus_v2_Wh, kulutus_v3_Wh,
+    - tietokanta (Vaihematriisi): Mittaukset sarakkeina
+      (kulutus_v1_Wh, kulutus_v2_Wh, kulutus_v3_Wh,
        tuotanto_v1_Wh, tuotanto_v2_Wh, tuotanto_v3_Wh).
 
     Toiminta:
-    - Summaa Wh-arvot (v1-v3 kulutus, v1-v3 tuotanto) ja muuntaa ne kWh:ksi (Wh / 1000),
+    - Hakee päivän rivit puolitushaulla ja summaa Wh-sarakkeet (v1-v3 kulutus, v1-v3 tuotanto) ja muuntaa ne kWh:ksi (Wh / 1000),
       muotoillen luvut kahden desimaalin tarkkuudella ja pilkun desimaalierottimena.
 
     Palauttaa:
@@ -101,17 +184,21 @@ def paivan_tiedot(paiva: date, tietokanta: list[Rivi]) -> list[str]:
     - Jos päivälle ei ole tietoja, summat ovat 0,00.
     """
     # Summataan ensin Wh, jotta vältytään pyöristysvirheiltä
-    kulutus_v1_wh = kulutus_v2_wh = kulutus_v3_wh = 0
-    tuotanto_v1_wh = tuotanto_v2_wh = tuotanto_v3_wh = 0
-
-    for tietue in tietokanta:
-        if tietue[0].date() == paiva:
-            kulutus_v1_wh += tietue[1]
-            kulutus_v2_wh += tietue[2]
-            kulutus_v3_wh += tietue[3]
-            tuotanto_v1_wh += tietue[4]
-            tuotanto_v2_wh += tietue[5]
-            tuotanto_v3_wh += tietue[6]
+    return muotoile_paivan_tiedot(paiva, tietokanta.paivan_summat(paiva))
+
+def muotoile_paivan_tiedot(paiva: date, summat_wh: list[int]) -> list[str]:
+    """
+    Muotoilee päivän Wh-summat tulostusystävällisiksi kWh-merkkijonoiksi.
+
+    Odotettu syöte:
+    - paiva (date): Päivä, jonka summat ovat kyseessä.
+    - summat_wh (list[int]): 6 Wh-summaa (kulutus v1..v3, tuotanto v1..v3).
+
+    Palauttaa:
+    - list[str]: Sama muoto kuin paivan_tiedot().
+    """
+    (kulutus_v1_wh, kulutus_v2_wh, kulutus_v3_wh,
+     tuotanto_v1_wh, tuotanto_v2_wh, tuotanto_v3_wh) = summat_wh
 
     # Muutetaan Wh kWh:ksi
     wh_muunnos_kwh = 1 / 1000.0
@@ -133,93 +220,95 @@ def paivan_tiedot(paiva: date, tietokanta: list[Rivi]) -> list[str]:
         f"{tuotanto_v3_kwh:.2f}".replace(".", ","),
     ]
 
-def viikkoraportti(viikon_numero: int, aloituspaiva: date, tietokanta: list[Rivi]) -> str: 
+@mittaa(rivit=lambda viikon_numero, aloituspaiva, tietokanta: (
+    len(VIIKONPAIVAT) if isinstance(tietokanta, Paivataulu) else len(tietokanta)))
+def viikkoraportti_rivit(viikon_numero: int, aloituspaiva: date, tietokanta: Vaihematriisi | Paivataulu) -> Iterator[str]:
     """
-    Muodostaa kiinteäleveyksisen viikkoraportin annetun viikon päiville.
+    Tuottaa kiinteäleveyksisen viikkoraportin rivi kerrallaan (generaattori).
 
     Odotettu syöte:
     - viikon_numero (int): Raportoitavan viikon numero.
     - aloituspaiva (date): Viikon maanantai.
-    - tietokanta (list[Rivi]): Mittausrivit (datetime + 6 × Wh).
+    - tietokanta (Vaihematriisi | Paivataulu): Mittaukset sarakemuodossa (aikaleimat + 6 × Wh)
+      tai usean tiedoston yhteinen päiväsummataulu.
 
     Toiminta:
-    - Laskee jokaiselle viikonpäivälle (maanantai–sunnuntai) kulutuksen ja tuotannon (v1..v3),
-      hyödyntäen paivan_tiedot()-funktiota, ja tuottaa vasemmalle tasattuun tekstiin otsikot, erotinrivit ja päivärivit.
+    - Koostaa matriisin päiväsummiksi yhdellä uudelleenotannalla (uudelleenota(..., "paiva"));
+      päiväsummataulusta viikon päivät haetaan suoraan.
+    - Muotoilee päivärivit valmiiksi käännetyllä PAIVARIVI-pohjalla: rivin kuusi lukua
+      muotoillaan yhdellä kutsulla ja desimaalipisteet vaihdetaan pilkuiksi kerralla.
 
     Palauttaa:
-    - str: Raporttiteksti (otsikot + erotinrivit + 7 päiväriviä).
+    - Iterator[str]: Raportin rivit rivinvaihtoineen (otsikot + erotinrivit + 7 päiväriviä).
     """
-    # Lista viikonpäivistä
-    viikonpaivat: list[str] = [
-        "maanantai", "tiistai", "keskiviikko", "torstai",
-        "perjantai", "lauantai", "sunnuntai"
-    ]
-
-    # Sarakeleveydet
-    leveys_viikonpaiva: int = 13   # "Viikonpäivä"-sarakkeen leveys
-    leveys_paivamaara: int = 13  # "Päivämäärä"-sarakkeen leveys (dd.mm.yyyy)
-    leveys_numero: int = 8    # Numeroiden (v1–v3 kulutus ja v1–v3 tuotanto) leveys
-    vaiheiden_leveys = 3 * leveys_numero  # leveys = 3 * leveys_numero = yhden ryhmän leveys (v1..v3)
-    tekstin_leveys = leveys_viikonpaiva + leveys_paivamaara  # teksti-osuuden yhteisleveys
+    vaiheiden_leveys = 3 * LEVEYS_NUMERO  # leveys = 3 * LEVEYS_NUMERO = yhden ryhmän leveys (v1..v3)
+    tekstin_leveys = LEVEYS_VIIKONPAIVA + LEVEYS_PAIVAMAARA  # teksti-osuuden yhteisleveys
+    erotin = "-" * PAIVARIVI.leveys + "\n"
 
     # Otsikkorivit
-    r: list[str] = []
-    r.append(f"\nViikon {viikon_numero} sähkönkulutus ja -tuotanto (kWh, vaiheittain)\n")
-    
-    header1 = (
-        f"{'Viikonpäivä':<{leveys_viikonpaiva}}" # Tasattu vasempaan reunaan
-        f"{'Päivämäärä':<{leveys_paivamaara}}" # Tasattu vasempaan reunaan
-         f"{'Kulutus [kWh]':<{vaiheiden_leveys}}" # Tasattu vasempaan reunaan
-         f"{'Tuotanto [kWh]':<{vaiheiden_leveys}}" # Tasattu vasempaan reunaan
+    yield f"\nViikon {viikon_numero} sähkönkulutus ja -tuotanto (kWh, vaiheittain)\n\n"
+    yield (
+        f"{'Viikonpäivä':<{LEVEYS_VIIKONPAIVA}}" # Tasattu vasempaan reunaan
+        f"{'Päivämäärä':<{LEVEYS_PAIVAMAARA}}" # Tasattu vasempaan reunaan
+        f"{'Kulutus [kWh]':<{vaiheiden_leveys}}" # Tasattu vasempaan reunaan
+        f"{'Tuotanto [kWh]':<{vaiheiden_leveys}}\n" # Tasattu vasempaan reunaan
     )
-
     # Alarivi: v1 v2 v3 -otsikot molemmille lohkoille
-    header2 = (
-        f"{'':<{tekstin_leveys}}" # Tasattu vasempaan reunaan
-        f"{'v1':<{leveys_numero}}" # Tasattu vasempaan reunaan
-        f"{'v2':<{leveys_numero}}" # Tasattu vasempaan reunaan
-        f"{'v3':<{leveys_numero}}" # Tasattu vasempaan reunaan
-        f"{'v1':<{leveys_numero}}" # Tasattu vasempaan reunaan
-        f"{'v2':<{leveys_numero}}" # Tasattu vasempaan reunaan
-        f"{'v3':<{leveys_numero}}" # Tasattu vasempaan reunaan
-    )
-
-    r.append(header1)
-    r.append(header2)
-    # Erotinrivi: 2 tekstikenttää + 6 numeroa → pituus leveys_viikonpaiva + leveys_paivamaara + 6*leveys_numero
-    r.append("-" * (leveys_viikonpaiva + leveys_paivamaara + leveys_numero*6))
+    yield f"{'':<{tekstin_leveys}}" + f"{'v1':<{LEVEYS_NUMERO}}{'v2':<{LEVEYS_NUMERO}}{'v3':<{LEVEYS_NUMERO}}" * 2 + "\n"
+    # Erotinrivi: 2 tekstikenttää + 6 numeroa
+    yield erotin
+
+    # Päiväsummat lasketaan kerran segmenteittäin; puuttuva päivä -> nollat
+    if isinstance(tietokanta, Paivataulu):
+        paivasummat = tietokanta.paivat
+    else:
+        paivasummat = {ryhma.avain: ryhma.arvot for ryhma in uudelleenota(tietokanta, "paiva")}
+    nollat = (0,) * 6
+    wh_muunnos_kwh = 1 / 1000.0
 
     # Rivit: yksi per viikonpäivä
-    for i, paiva in enumerate(viikonpaivat):
-        # Oletus: paivan_tiedot palauttaa listan (list[str]):
-        # [pvm, kulutus_v1, kulutus_v2, kulutus_v3, tuotanto_v1, tuotanto_v2, tuotanto_v3]
-        paivan_arvot = paivan_tiedot(aloituspaiva + timedelta(days=i), tietokanta)
-        pvm = paivan_arvot[0]
-        kulutus_v1, kulutus_v2, kulutus_v3, tuotanto_v1, tuotanto_v2, tuotanto_v3 = paivan_arvot[1:7]
-
-        row = (
-                f"{paiva:<{leveys_viikonpaiva}}" # Tasattu vasempaan reunaan
-                f"{pvm:<{leveys_paivamaara}}" # Tasattu vasempaan reunaan
-                f"{kulutus_v1:<{leveys_numero}}" # Tasattu vasempaan reunaan
-                f"{kulutus_v2:<{leveys_numero}}" # Tasattu vasempaan reunaan
-                f"{kulutus_v3:<{leveys_numero}}" # Tasattu vasempaan reunaan
-                f"{tuotanto_v1:<{leveys_numero}}" # Tasattu vasempaan reunaan
-                f"{tuotanto_v2:<{leveys_numero}}" # Tasattu vasempaan reunaan
-                f"{tuotanto_v3:<{leveys_numero}}" # Tasattu vasempaan reunaan
-            )
-        r.append(row)
-
-    r.append("-" * (leveys_viikonpaiva + leveys_paivamaara + leveys_numero*6))
-    r.append("")  # Lisätään yksi tyhjä rivi luettavuuden parantamiseksi
-    return "\n".join(r)
-
-def kirjoita_raportit_tiedostoon(tiedoston_nimi: str, raportit: list[str]) -> None:
+    for i, viikonpaiva in enumerate(VIIKONPAIVAT):
+        paiva = aloituspaiva + timedelta(days=i)
+        summat_wh = paivasummat.get(paiva, nollat)
+        yield PAIVARIVI.muotoile(
+            (viikonpaiva, paiva.strftime("%d.%m.%Y")),
+            [arvo * wh_muunnos_kwh for arvo in summat_wh],
+        ) + "\n"
+
+    yield erotin
+
+@mittaa(rivit=lambda viikon_numero, aloituspaiva, tietokanta: len(tietokanta))
+def viikkoraportti(viikon_numero: int, aloituspaiva: date, tietokanta: Vaihematriisi) -> str: 
+    """
+    Muodostaa kiinteäleveyksisen viikkoraportin annetun viikon päiville.
+
+    Odotettu syöte:
+    - viikon_numero (int): Raportoitavan viikon numero.
+    - aloituspaiva (date): Viikon maanantai.
+    - tietokanta (Vaihematriisi): Mittaukset sarakemuodossa (aikaleimat + 6 × Wh).
+
+    Toiminta:
+    - Kokoaa viikkoraportti_rivit()-generaattorin rivit yhdeksi merkkijonoksi.
+
+    Palauttaa:
+    - str: Raporttiteksti (otsikot + erotinrivit + 7 päiväriviä).
+    """
+    return "".join(viikkoraportti_rivit(viikon_numero, aloituspaiva, tietokanta))
+
+def kirjoita_raportit_tiedostoon(tiedoston_nimi: str, raportit: Iterable[str]) -> None:
     """
     Kirjoittaa annetut raportit samaan tekstitiedostoon annetussa järjestyksessä.
 
     Odotettu syöte:
     - tiedoston_nimi (str): Kohdetiedoston polku/nimi (esim. "yhteenveto.txt").
-    - raportit (list[str]): Raporttitekstit, jotka kirjoitetaan peräkkäin.
+    - raportit (Iterable[str]): Raporttitekstit tai -rivit, jotka kirjoitetaan peräkkäin.
+      Generaattori (esim. viikkoraportti_rivit()) kirjoitetaan rivi kerrallaan
+      ilman, että koko raporttia kootaan ensin muistiin.
+
+    Toiminta:
+    - Rivit kirjoitetaan suurella puskurilla väliaikaiseen tiedostoon, joka
+      vaihdetaan kohteen tilalle vasta lopuksi; keskeytynyt ajo ei jätä
+      puolikasta tiedostoa.
 
     Palauttaa:
     - None
@@ -227,38 +316,91 @@ def kirjoita_raportit_tiedostoon(tiedoston_nimi: str, raportit: list[str]) -> No
     Poikkeukset:
     - OSError: jos tiedostoon kirjoittaminen epäonnistuu.
     """
-    with open(tiedoston_nimi, "w", encoding="utf-8") as f:
-        for raportti in raportit:
-            f.write(raportti)
+    kirjoita_atomisesti(tiedoston_nimi, raportit)
 
+@mittaa()
 def main() -> None:
     """
-    Lukee viikon 41-43 CSV-data, tuottaa viikkoraportit ja tallentaa ne tiedostoon.
+    Lukee viikkojen CSV-datan, tuottaa viikkoraportit, vaiheanalyysin, liukuvat huippusummat ja
+    viikkovertailun ja tallentaa ne tiedostoon.
 
     Odotettu syöte:
-    - Ei parametreja; käyttää kovakoodattuja tiedostonimiä ja päivämääriä.
+    - Komentoriviltä CSV-tiedostot tai hakemistot (oletus: nykyhakemiston viikko*.csv).
+
+    Toiminta:
+    - Jokaisen tiedoston ISO-viikko ja maanantai tunnistetaan aikaleimoista
+      jäsennyksen aikana; tiedostot järjestetään ja ryhmitellään viikoittain,
+      joten viikkojen määrää tai päivämääriä ei tarvitse antaa.
+
+    Hajautettu tila (--hajautettu[=prosessit]):
+    - Tiedostot koostetaan paloittain prosessipoolissa suoraan päiväsummatauluun
+      (Paivataulu.paivita/yhdista), ja raporttiin tulevat viikkoraportit ja
+      viikkovertailu. Tiedostoja ei ladata muistiin, joten aineisto voi olla
+      muistia suurempi; rivit tarkistetaan tiukasti (ei korjauksia eikä sietoista tilaa).
+    - Vaiheanalyysi ja liukuvat huiput tarvitsevat tuntisarjan, joten ne puuttuvat,
+      ja raportti kirjoitetaan omaan tiedostoonsa HAJAUTETTU_YHTEENVETO eikä
+      korvaa peräkkäisen ajon yhteenveto.txt-tiedostoa.
 
     Palauttaa:
     - None
     """
-    # Luetaan data CSV-tiedostoista kutsumalla lue_data -funktiota
-    kulutus_ja_tuotanto_viikko_41 = lue_data("viikko41.csv")
-    kulutus_ja_tuotanto_viikko_42 = lue_data("viikko42.csv")
-    kulutus_ja_tuotanto_viikko_43 = lue_data("viikko43.csv")
-
-    # Luodaan viikkoraportit viikkoraportti-funktiota kutsumalla
-    raportti_viikko_41 = viikkoraportti(41, date(2025, 10, 6), kulutus_ja_tuotanto_viikko_41)
-    raportti_viikko_42 = viikkoraportti(42, date(2025, 10, 13), kulutus_ja_tuotanto_viikko_42)
-    raportti_viikko_43 = viikkoraportti(43, date(2025, 10, 20), kulutus_ja_tuotanto_viikko_43)
+    # Hajautettu koostaminen tuodaan vasta ajettaessa (käynnistysaika, ks. tests/test_tuontibudjetti.py)
+    from yhteiset.hajautus import koosta, lue_prosessit
+
+    # Lipulla --hajautettu[=prosessit] tiedostot koostetaan paloittain prosessipoolissa
+    prosessit = lue_prosessit()
+    # Lipulla --sietoinen[=raja] virheelliset rivit ohitetaan ja kirjataan tiedostokohtaisesti
+    hylkaysraja = lue_hylkaysraja()
+    tiedostot = csv_tiedostot(sys.argv[1:])
+    if not tiedostot:
+        print("Ei luettavia viikkotiedostoja")
+        return
+
+    if prosessit is not None:
+        paivataulu = koosta(Paivataulu, muunna_tiedot, ";", tiedostot, prosessit)
+        kirjaa_rivit(paivataulu.rivit)
+        viikot = paivataulu.viikot()
+        kirjoita_raportit_tiedostoon(HAJAUTETTU_YHTEENVETO, chain(
+            chain.from_iterable(
+                viikkoraportti_rivit(viikko[1], maanantai(viikko), paivataulu) for viikko in viikot
+            ),
+            vertailurivit(paivataulu, viikot),
+        ))
+        print(f"Raportti on valmis tiedostossa {HAJAUTETTU_YHTEENVETO} ({len(viikot)} viikkoa, "
+              f"{len(tiedostot)} tiedostoa, {prosessit} prosessia; ilman vaiheanalyysiä ja liukuvia huippuja)")
+        return
+
+    # Luetaan data CSV-tiedostoista; viikko tunnistetaan samalla läpikäynnillä
+    luetut: list[tuple[tuple[int, int], str, Vaihematriisi]] = []
+    for tiedosto in tiedostot:
+        tunnistin = Viikkotunnistin()
+        matriisi = lue_data(tiedosto, hylkaykset_tiedostolle(tiedosto, hylkaysraja), tunnistin)
+        luetut.append((tunnistin.viikko(), tiedosto, tarkista_ja_korjaa(tiedosto, matriisi)))
+    luetut.sort(key=lambda luettu: luettu[:2])
+
+    # Jokainen tiedosto koostetaan kerran yhteiseen päiväsummatauluun, josta
+    # viikkoraportit ja viikkovertailu johdetaan; saman viikon tiedostot yhdistyvät
+    paivataulu = Paivataulu()
+    kaikki_viikot = Vaihematriisi()
+    for _, _, matriisi in luetut:
+        paivataulu.lisaa_matriisi(matriisi)
+        # Vaiheanalyysi lasketaan samoista matriiseista sarakeoperaatioina
+        for rivi in matriisi.rivit():
+            kaikki_viikot.lisaa(rivi)
+    kirjaa_rivit(len(kaikki_viikot))
+    viikot = list(dict.fromkeys(viikko for viikko, _, _ in luetut))
+
+    # Viikkoraporttien rivit tuotetaan generaattoreina suoraan tiedostoon
+    viikkoraportit = (viikkoraportti_rivit(viikko[1], maanantai(viikko), paivataulu) for viikko in viikot)
 
     # Kirjoitetaan viikkoraportit tiedostoon kutsumalla kirjoita_raportit_tiedostoon -funktiota
-    kirjoita_raportit_tiedostoon("yhteenveto.txt", [
-        raportti_viikko_41,
-        raportti_viikko_42,
-        raportti_viikko_43,
-    ])
+    kirjoita_raportit_tiedostoon("yhteenveto.txt", chain(
+        chain.from_iterable(viikkoraportit),
+        [vaiheanalyysi(kaikki_viikot), liukuvat_huiput(kaikki_viikot)],
+        vertailurivit(paivataulu, viikot),
+    ))
 
-    print("Raportti on valmis")
+    print(f"Raportti on valmis ({len(viikot)} viikkoa, {len(tiedostot)} tiedostoa)")
 
 if __name__ == "__main__":
     main()
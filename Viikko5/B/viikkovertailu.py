@@ -0,0 +1,175 @@
+# Copyright (c) 2025 Jonna Kangas
+
+# Ohjelmoinnin perusteet -opintojakso, harjoitustehtävä 5B
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# See <https://www.gnu.org/licenses/>.
+
+"""
+Usean viikon vertailu yhteisestä päiväsummataulusta.
+
+Toiminta:
+    - Jokainen ladattu matriisi koostetaan kerran päiväsummiksi (uudelleenota)
+      yhteiseen Paivataulu-tauluun: päivä -> 6 Wh-summaa.
+    - Viikkoraportit, viikkomuutokset, liukuvat keskiarvot ja viikonpäivävertailu
+      johdetaan taulusta. Viikon tiedot ovat 7 hakua taulusta, joten uusi viikko
+      lisää työtä O(7) eikä vaadi uutta läpikäyntiä tunneista.
+    - Summat pidetään kokonaislukuina (Wh) ja muunnetaan kWh:ksi vasta tulostettaessa.
+      Siksi paloittain koostetut taulut (paivita/yhdista) yhdistyvät bitilleen
+      samaksi tulokseksi kuin koko aineisto kerralla.
+"""
+
+from collections.abc import Iterator, Sequence
+from datetime import date
+from operator import add
+
+from vaihematriisi import Vaihematriisi
+from yhteiset.raportointi import Lukupohja, Rivipohja
+from yhteiset.uudelleenotanta import uudelleenota
+
+# Liukuvan keskiarvon ikkuna (viikkoa)
+LIUKUVA_IKKUNA: int = 4
+
+LEVEYS_VIIKKO: int = 10
+LEVEYS_NUMERO: int = 8
+
+NOLLAT: tuple[int, ...] = (0,) * 6
+WH_KWH: float = 1 / 1000.0
+
+# Viikko + v1..v3 + yhteensä + liukuva keskiarvo v1..v3; muutos liitetään perään
+VERTAILURIVI = Rivipohja([LEVEYS_VIIKKO], [LEVEYS_NUMERO] * 7)
+# Viikko + 7 viikonpäivää
+VIIKONPAIVARIVI = Rivipohja([LEVEYS_VIIKKO], [LEVEYS_NUMERO] * 7)
+MUUTOS = Lukupohja("{:+.2f} kWh")
+MUUTOS_PROSENTTEINA = Lukupohja(" ({:+.1f} %)")
+
+Viikko = tuple[int, int]  # (ISO-vuosi, ISO-viikko)
+
+
+class Paivataulu:
+    """
+    Kaikkien ladattujen tiedostojen päiväkohtaiset Wh-summat.
+
+    Attribuutit:
+        paivat (dict[date, tuple[int, ...]]): Päivä -> (kulutus v1..v3, tuotanto v1..v3) Wh.
+        rivit (int): Tauluun koostettujen tuntirivien määrä.
+    """
+
+    def __init__(self) -> None:
+        self.paivat: dict[date, tuple[int, ...]] = {}
+        self.rivit: int = 0
+
+    def lisaa_matriisi(self, matriisi: Vaihematriisi) -> None:
+        """Koostaa matriisin päiväsummiksi ja lisää ne tauluun (saman päivän summat yhdistetään)."""
+        self.rivit += len(matriisi)
+        for ryhma in uudelleenota(matriisi, "paiva"):
+            vanhat = self.paivat.get(ryhma.avain)
+            self.paivat[ryhma.avain] = ryhma.arvot if vanhat is None else tuple(map(add, vanhat, ryhma.arvot))
+
+    def paivita(self, tietue: Sequence) -> None:
+        """Lisää yhden rivin (aikaleima, 6 × Wh) päivänsä summiin (hajautettu koostaminen)."""
+        paiva = tietue[0].date()
+        self.rivit += 1
+        vanhat = self.paivat.get(paiva)
+        self.paivat[paiva] = tuple(tietue[1:]) if vanhat is None else tuple(map(add, vanhat, tietue[1:]))
+
+    def yhdista(self, toinen: "Paivataulu") -> None:
+        """Yhdistää toisen taulun päiväsummat tähän tauluun."""
+        paivat = self.paivat
+        self.rivit += toinen.rivit
+        for paiva, summat in toinen.paivat.items():
+            vanhat = paivat.get(paiva)
+            paivat[paiva] = summat if vanhat is None else tuple(map(add, vanhat, summat))
+
+    def viikot(self) -> list[Viikko]:
+        """Taulun ISO-viikot aikajärjestyksessä."""
+        return sorted({tuple(paiva.isocalendar()[:2]) for paiva in self.paivat})
+
+    def viikon_paivat(self, viikko: Viikko) -> list[tuple[int, ...]]:
+        """Viikon seitsemän päivän summat maanantaista sunnuntaihin (puuttuva päivä -> nollat)."""
+        vuosi, numero = viikko
+        return [self.paivat.get(date.fromisocalendar(vuosi, numero, i), NOLLAT) for i in range(1, 8)]
+
+    def viikon_summat(self, viikko: Viikko) -> tuple[int, ...]:
+        """Viikon Wh-summat sarakkeittain."""
+        return tuple(map(sum, zip(*self.viikon_paivat(viikko))))
+
+
+def _muutos(nykyinen: int, edellinen: int | None) -> str:
+    """Muutos edellisestä viikosta kWh:na ja prosentteina ("-" ensimmäiselle viikolle)."""
+    if edellinen is None:
+        return "-"
+    teksti = MUUTOS((nykyinen - edellinen) * WH_KWH)
+    if edellinen:
+        teksti += MUUTOS_PROSENTTEINA(100 * (nykyinen - edellinen) / edellinen)
+    return teksti
+
+
+def _vertailutaulukko(otsikko: str, viikot: Sequence[Viikko], summat: Sequence[tuple[int, int, int]]) -> Iterator[str]:
+    """Yhden suureen (kulutus tai tuotanto) viikkotaulukko: vaiheet, yhteensä, liukuva ka. ja muutos."""
+    erotin = "-" * (VERTAILURIVI.leveys + 24) + "\n"
+    yield f"\n{otsikko}\n\n"
+    yield (
+        f"{'Viikko':<{LEVEYS_VIIKKO}}{'v1':<{LEVEYS_NUMERO}}{'v2':<{LEVEYS_NUMERO}}{'v3':<{LEVEYS_NUMERO}}"
+        f"{'yht':<{LEVEYS_NUMERO}}{f'ka{LIUKUVA_IKKUNA} v1':<{LEVEYS_NUMERO}}{'v2':<{LEVEYS_NUMERO}}"
+        f"{'v3':<{LEVEYS_NUMERO}}Muutos ed. viikosta\n"
+    )
+    yield erotin
+    # Liukuva summa: lisätään uusi viikko ja vähennetään ikkunasta poistuva
+    liukuva = [0, 0, 0]
+    edellinen = None
+    for i, (viikko, vaiheet) in enumerate(zip(viikot, summat)):
+        for v in range(3):
+            liukuva[v] += vaiheet[v]
+            if i >= LIUKUVA_IKKUNA:
+                liukuva[v] -= summat[i - LIUKUVA_IKKUNA][v]
+        ikkuna = min(i + 1, LIUKUVA_IKKUNA)
+        yhteensa = sum(vaiheet)
+        yield VERTAILURIVI.muotoile(
+            (f"{viikko[0]}/{viikko[1]}",),
+            [arvo * WH_KWH for arvo in vaiheet] + [yhteensa * WH_KWH] + [arvo * WH_KWH / ikkuna for arvo in liukuva],
+        ) + _muutos(yhteensa, edellinen) + "\n"
+        edellinen = yhteensa
+    yield erotin
+
+
+def vertailurivit(taulu: Paivataulu, viikot: Sequence[Viikko] | None = None) -> Iterator[str]:
+    """
+    Tuottaa usean viikon vertailuraportin rivit.
+
+    Osat:
+        - Kulutus ja tuotanto viikoittain vaiheittain (kWh), viikon kokonaismuutos
+          edelliseen ladattuun viikkoon sekä vaiheiden liukuva keskiarvo
+          LIUKUVA_IKKUNA viimeisimmän ladatun viikon yli.
+        - Sama viikonpäivä viikoittain: päivän kokonaiskulutus (v1+v2+v3, kWh)
+          ja viikonpäivien keskiarvot.
+
+    Parametrit:
+        taulu (Paivataulu): Yhteinen päiväsummataulu.
+        viikot (Sequence[Viikko] | None): Vertailtavat viikot (oletus: kaikki taulun viikot).
+    """
+    viikot = taulu.viikot() if viikot is None else list(viikot)
+    if not viikot:
+        return
+    paivat = {viikko: taulu.viikon_paivat(viikko) for viikko in viikot}
+    summat = [tuple(map(sum, zip(*paivat[viikko]))) for viikko in viikot]
+
+    yield f"\nViikkovertailu, {len(viikot)} viikkoa (kWh, vaiheittain)\n"
+    yield from _vertailutaulukko("Kulutus", viikot, [s[:3] for s in summat])
+    yield from _vertailutaulukko("Tuotanto", viikot, [s[3:] for s in summat])
+
+    erotin = "-" * VIIKONPAIVARIVI.leveys + "\n"
+    yield "\nKulutus viikonpäivittäin (kWh, v1+v2+v3)\n\n"
+    yield f"{'Viikko':<{LEVEYS_VIIKKO}}" + "".join(f"{nimi:<{LEVEYS_NUMERO}}" for nimi in ("ma", "ti", "ke", "to", "pe", "la", "su")) + "\n"
+    yield erotin
+    viikonpaivien_summat = [0] * 7
+    for viikko in viikot:
+        kulutukset = [sum(paiva[:3]) for paiva in paivat[viikko]]
+        viikonpaivien_summat = list(map(add, viikonpaivien_summat, kulutukset))
+        yield VIIKONPAIVARIVI.muotoile((f"{viikko[0]}/{viikko[1]}",), [arvo * WH_KWH for arvo in kulutukset]) + "\n"
+    yield erotin
+    yield VIIKONPAIVARIVI.muotoile(("ka",), [arvo * WH_KWH / len(viikot) for arvo in viikonpaivien_summat]) + "\n"
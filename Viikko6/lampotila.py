@@ -0,0 +1,284 @@
+# Copyright (c) 2025 Jonna Kangas
+
+# Ohjelmoinnin perusteet -opintojakso, harjoitustehtävä 6
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# See <https://www.gnu.org/licenses/>.
+
+"""
+Vuorokausikulutuksen lämpötilariippuvuus lämmitystarveluvun avulla.
+
+Toiminta:
+    - Jokainen vuorokausi on yksi havainto: x = lämmitystarve (°Cvrk) eli
+      max(0, LAMMITYSRAJA - vuorokauden keskilämpötila), y = vuorokauden kulutus (kWh).
+    - Pienimmän neliösumman sovitus y = a + b·x lasketaan summista
+      n, Σx, Σy, Σxy, Σx², Σy², joten kuukauden tai osa-aineiston (esim. vuosi tai
+      kohde) tulokset voidaan yhdistää laskemalla summat yhteen ilman uutta
+      läpikäyntiä. Kulmakerroin b on kulutus lämmitystarveastetta kohden ja
+      vakio a lämpötilasta riippumaton peruskulutus vuorokaudessa.
+    - Jäännökset (y - a - b·x) kuukausittain koko aineiston sovitusta vasten
+      saadaan samoista summista.
+    - Havainnot voi kerätä rivi kerrallaan tiedostoa luettaessa (paivita()) tai
+      valmiista sarjasta päiväryhmittäin (lisaa_sarja()).
+"""
+
+from collections.abc import Iterator, Sequence
+from datetime import date
+from math import sqrt
+from operator import mul
+
+from yhteiset.aikasarja import Aikasarja
+from yhteiset.raportointi import Lukupohja, Rivipohja
+from yhteiset.uudelleenotanta import uudelleenota
+
+# Lämmitystarveluvun perusraja °C (Suomessa käytetty S17)
+LAMMITYSRAJA: float = 17.0
+
+# Kuukausi: (vuosi, kuukausi)
+Kuukausi = tuple[int, int]
+
+KUUKAUSIRIVI = Rivipohja([10, 8], [10, 12, 12])
+SOVITUS = Rivipohja([], [11, 11])
+JAANNOS = Rivipohja([], [11, 11])
+EI_SOVITUSTA = f"{'-':<11}{'-':<11}"
+KOKO_SOVITUS = Lukupohja("- sovitus: kulutus = {:.2f} kWh/vrk + {:.3f} kWh × lämmitystarve (°Cvrk)\n")
+KORRELAATIO = Lukupohja("- korrelaatio r = {:.3f}, selitysaste R² = {:.3f}\n")
+JAANNOSHAJONTA = Lukupohja("- jäännösten keskihajonta: {:.2f} kWh/vrk\n")
+
+
+def lammitystarve(lampotila: float) -> float:
+    """Vuorokauden lämmitystarve (°Cvrk) keskilämpötilasta."""
+    return max(0.0, LAMMITYSRAJA - lampotila)
+
+
+class Regressio:
+    """
+    Yhden selittäjän pienimmän neliösumman sovitus summista.
+
+    Attribuutit:
+        n (int): Havaintojen määrä.
+        sx, sy, sxy, sxx, syy (float): Σx, Σy, Σxy, Σx², Σy².
+    """
+
+    def __init__(self) -> None:
+        self.n: int = 0
+        self.sx: float = 0.0
+        self.sy: float = 0.0
+        self.sxy: float = 0.0
+        self.sxx: float = 0.0
+        self.syy: float = 0.0
+
+    def paivita(self, x: float, y: float) -> None:
+        """Lisää yhden havainnon."""
+        self.n += 1
+        self.sx += x
+        self.sy += y
+        self.sxy += x * y
+        self.sxx += x * x
+        self.syy += y * y
+
+    def lisaa(self, xs: Sequence[float], ys: Sequence[float]) -> None:
+        """Lisää havainnot sarakkeina (sama tulos kuin paivita() havainto kerrallaan)."""
+        self.n += len(xs)
+        self.sx += sum(xs)
+        self.sy += sum(ys)
+        self.sxy += sum(map(mul, xs, ys))
+        self.sxx += sum(map(mul, xs, xs))
+        self.syy += sum(map(mul, ys, ys))
+
+    def yhdista(self, toinen: "Regressio") -> None:
+        """Yhdistää toisen osa-aineiston summat tähän."""
+        self.n += toinen.n
+        self.sx += toinen.sx
+        self.sy += toinen.sy
+        self.sxy += toinen.sxy
+        self.sxx += toinen.sxx
+        self.syy += toinen.syy
+
+    def _keskitetyt(self) -> tuple[float, float, float]:
+        # Keskitetyt neliö- ja tulosummat: Σ(x-x̄)², Σ(x-x̄)(y-ȳ), Σ(y-ȳ)²
+        n = self.n
+        return (self.sxx - self.sx * self.sx / n,
+                self.sxy - self.sx * self.sy / n,
+                self.syy - self.sy * self.sy / n)
+
+    def sovitus(self) -> tuple[float, float] | None:
+        """
+        Palauttaa (vakio a, kulmakerroin b) tai None, jos sovitusta ei voi laskea
+        (alle 2 havaintoa tai x on vakio, esim. kesäkuukausi ilman lämmitystarvetta).
+        """
+        if self.n < 2:
+            return None
+        kxx, kxy, _ = self._keskitetyt()
+        if kxx <= 1e-9 * max(1.0, self.sxx):
+            return None
+        b = kxy / kxx
+        return (self.sy - b * self.sx) / self.n, b
+
+    def korrelaatio(self) -> float | None:
+        """Pearsonin korrelaatiokerroin tai None, jos x tai y on vakio."""
+        if self.n < 2:
+            return None
+        kxx, kxy, kyy = self._keskitetyt()
+        if kxx <= 0 or kyy <= 0:
+            return None
+        return kxy / sqrt(kxx * kyy)
+
+    def jaannokset(self, a: float, b: float) -> tuple[float, float]:
+        """
+        Jäännösten y - a - b·x keskiarvo ja keskihajonta (neliöllinen keskiarvo
+        keskiarvon ympäriltä) annettua sovitusta vasten.
+
+        Poikkeukset:
+            ValueError: jos havaintoja ei ole.
+        """
+        n = self.n
+        if n == 0:
+            raise ValueError("Tyhjästä aineistosta ei voi laskea jäännöksiä")
+        summa = self.sy - a * n - b * self.sx
+        # Σ(y - a - bx)² auki kirjoitettuna summien avulla
+        nelio = (self.syy + a * a * n + b * b * self.sxx
+                 - 2 * a * self.sy - 2 * b * self.sxy + 2 * a * b * self.sx)
+        keskiarvo = summa / n
+        return keskiarvo, sqrt(max(0.0, nelio / n - keskiarvo * keskiarvo))
+
+
+class Lampotilaanalyysi:
+    """
+    Kuukausittaiset regressiosummat (x = lämmitystarve, y = vuorokausikulutus).
+
+    Osa-aineistot yhdistetään yhdista()-metodilla. Vuorokausi lasketaan
+    aikaleiman omasta päivämäärästä, joten osa-aineistojen rajojen pitää
+    osua vuorokausien rajoille.
+
+    Attribuutit:
+        kuukaudet (dict[Kuukausi, Regressio]): Kuukausi -> regressiosummat.
+        lampotilat (dict[Kuukausi, float]): Kuukausi -> vuorokausien keskilämpötilojen summa.
+    """
+
+    def __init__(self) -> None:
+        self.kuukaudet: dict[Kuukausi, Regressio] = {}
+        self.lampotilat: dict[Kuukausi, float] = {}
+        # Kesken oleva vuorokausi rivi kerrallaan luettaessa
+        self._paiva: date | None = None
+        self._kulutus: float = 0.0
+        self._lampotila: float = 0.0
+        self._tunnit: int = 0
+
+    def _kuukausi(self, avain: Kuukausi) -> Regressio:
+        regressio = self.kuukaudet.get(avain)
+        if regressio is None:
+            regressio = self.kuukaudet[avain] = Regressio()
+            self.lampotilat[avain] = 0.0
+        return regressio
+
+    def lisaa_paiva(self, paiva: date, kulutus: float, lampotila: float) -> None:
+        """Lisää yhden vuorokauden (kulutus kWh, keskilämpötila °C)."""
+        avain = (paiva.year, paiva.month)
+        self._kuukausi(avain).paivita(lammitystarve(lampotila), kulutus)
+        self.lampotilat[avain] += lampotila
+
+    def paivita(self, tietue: tuple) -> None:
+        """
+        Lisää yhden Rivi-tuplen (aika, kulutus, tuotanto, lämpötila). Vuorokausi
+        kirjataan, kun seuraava vuorokausi alkaa tai tulokset luetaan.
+        """
+        paiva = tietue[0].date()
+        if paiva != self._paiva:
+            self._kirjaa()
+            self._paiva = paiva
+        self._kulutus += tietue[1]
+        self._lampotila += tietue[3]
+        self._tunnit += 1
+
+    def _kirjaa(self) -> None:
+        if self._tunnit:
+            self.lisaa_paiva(self._paiva, self._kulutus, self._lampotila / self._tunnit)
+        self._paiva = None
+        self._kulutus = self._lampotila = 0.0
+        self._tunnit = 0
+
+    def lisaa_sarja(self, sarja: Aikasarja) -> None:
+        """
+        Lisää sarjan vuorokaudet ("kulutus" summana, "lampotila" keskiarvona)
+        kuukausittain sarakkeina.
+        """
+        kulutus = sarja.nimet.index("kulutus")
+        lampotila = sarja.nimet.index("lampotila")
+        koostimet = ["summa"] * len(sarja.nimet)
+        koostimet[lampotila] = "keskiarvo"
+        kuukaudet: dict[Kuukausi, tuple[list[float], list[float]]] = {}
+        for ryhma in uudelleenota(sarja, "paiva", koostimet):
+            avain = (ryhma.avain.year, ryhma.avain.month)
+            lampotilat, kulutukset = kuukaudet.setdefault(avain, ([], []))
+            lampotilat.append(ryhma.arvot[lampotila])
+            kulutukset.append(ryhma.arvot[kulutus])
+        for avain, (lampotilat, kulutukset) in kuukaudet.items():
+            self._kuukausi(avain).lisaa([lammitystarve(t) for t in lampotilat], kulutukset)
+            self.lampotilat[avain] += sum(lampotilat)
+
+    def yhdista(self, toinen: "Lampotilaanalyysi") -> None:
+        """Yhdistää toisen osa-aineiston kuukausisummat tähän."""
+        self._kirjaa()
+        toinen._kirjaa()
+        for avain, regressio in toinen.kuukaudet.items():
+            self._kuukausi(avain).yhdista(regressio)
+            self.lampotilat[avain] += toinen.lampotilat[avain]
+
+    def kokonais(self) -> Regressio:
+        """Kaikkien kuukausien yhdistetyt summat."""
+        self._kirjaa()
+        tulos = Regressio()
+        for regressio in self.kuukaudet.values():
+            tulos.yhdista(regressio)
+        return tulos
+
+
+def lampotilarivit(analyysi: Lampotilaanalyysi) -> Iterator[str]:
+    """
+    Tuottaa lämpötilariippuvuusraportin rivit.
+
+    Osat:
+        - Koko aineiston sovitus, korrelaatio ja jäännösten keskihajonta.
+        - Kuukausittain: vuorokausien määrä, keskilämpötila, lämmitystarveluku,
+          kulutus, kuukauden oma sovitus (peruskulutus ja kWh/°Cvrk; "-", jos
+          lämmitystarve on koko kuukauden vakio) sekä jäännösten keskiarvo ja
+          keskihajonta koko aineiston sovitusta vasten.
+    """
+    kokonais = analyysi.kokonais()
+    yield f"Kulutuksen lämpötilariippuvuus (lämmitystarveluku, raja {LAMMITYSRAJA:.0f} °C)\n"
+    if kokonais.n == 0:
+        yield "Ei vuorokausia\n"
+        return
+    yield f"Koko aineisto: {kokonais.n} vuorokautta\n"
+    sovitus = kokonais.sovitus()
+    if sovitus is None:
+        yield "- sovitusta ei voi laskea (lämmitystarve on vakio)\n"
+    else:
+        r = kokonais.korrelaatio()
+        yield KOKO_SOVITUS(*sovitus)
+        if r is not None:
+            yield KORRELAATIO(r, r * r)
+        yield JAANNOSHAJONTA(kokonais.jaannokset(*sovitus)[1])
+
+    erotin = "-" * (KUUKAUSIRIVI.leveys + 44) + "\n"
+    yield "\n"
+    yield (f"{'Kuukausi':<10}{'Vrk':<8}{'Lämpö °C':<10}{'Tarve °Cvrk':<12}{'Kulutus kWh':<12}"
+           f"{'Perus/vrk':<11}{'kWh/°Cvrk':<11}{'Jäännös ka':<11}{'kh':<11}\n")
+    yield erotin
+    for avain in sorted(analyysi.kuukaudet):
+        regressio = analyysi.kuukaudet[avain]
+        rivi = KUUKAUSIRIVI.muotoile(
+            (f"{avain[1]:02d}/{avain[0]}", str(regressio.n)),
+            (analyysi.lampotilat[avain] / regressio.n, regressio.sx, regressio.sy),
+        )
+        oma = regressio.sovitus()
+        rivi += EI_SOVITUSTA if oma is None else SOVITUS.muotoile((), oma)
+        if sovitus is not None:
+            rivi += JAANNOS.muotoile((), regressio.jaannokset(*sovitus))
+        yield rivi + "\n"
+    yield erotin
@@ -0,0 +1,335 @@
+# Copyright (c) 2025 Jonna Kangas
+
+# Ohjelmoinnin perusteet -opintojakso, harjoitustehtävä 6
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# See <https://www.gnu.org/licenses/>.
+
+"""
+Virtaavat tuntitilastot (min/max/huipputunti/prosenttipisteet) energiadatalle.
+
+Tilasto päivitetään samoista aikasegmenteistä, joista raportin summat lasketaan
+(tai rivi kerrallaan paivita()-metodilla, joka puskuroi päivän rivit viipaleeksi).
+Prosenttipisteet perustuvat kiinteälevyiseen histogrammiin, jonka
+lokerot tallennetaan harvana sanakirjana (lokeron indeksi -> lukumäärä).
+Kahden tilaston histogrammit voidaan siksi yhdistää lokeroittain, jolloin
+esim. kuukausi- tai aikavälitilasto saadaan valmiista päiväkohtaisista
+osatilastoista ilman uutta läpikäyntiä. Samoista segmenteistä kootaan myös
+tuntikohtainen ylijäämä ja päällekkäisyys (yhteiset.omakaytto). Sarakkeet on jo
+netotettu, joten päällekkäisyys raportoidaan netotuksen jäännöksenä eikä
+omavaraisuutena; omavaraisuus lasketaan Viikko5:n vaiheittaisista bruttosarakkeista.
+"""
+
+from collections import Counter
+from collections.abc import Sequence
+from datetime import date, datetime
+
+from yhteiset.aikasarja import Aikasarja
+from yhteiset.omakaytto import Omakaytto
+from yhteiset.raportointi import Lukupohja
+from yhteiset.sqlitevarasto import omakayton_koosteet, sarakkeen_tilasto
+from yhteiset.uudelleenotanta import uudelleenota
+
+# Lokeron leveys kWh. Data on kolmen desimaalin tarkkuudella, joten 0,001 kWh:n
+# lokeroilla prosenttipisteet ovat tarkkoja mittausarvoja.
+LOKERON_LEVEYS: float = 0.001
+
+# Tilastorivien lukuosat; päivämäärät (joissa on pisteitä) liitetään erikseen
+HUIPPUKULUTUS = Lukupohja("- huippukulutus: {:.2f} kWh (")
+HUIPPUTUOTANTO = Lukupohja("- huipputuotanto: {:.2f} kWh (")
+EI_TUOTANTOA = "- huipputuotanto: ei tuotantoa\n"
+PROSENTTIPISTEET = Lukupohja("- tuntikulutus p50/p95/p99: {:.2f} / {:.2f} / {:.2f} kWh\n")
+# Viikko6:n sarakkeet on jo netotettu, joten min(kulutus, tuotanto) on vain netotuksesta
+# jäänyt päällekkäisyys eikä omavaraisuus (bruttosarakkeista ks. Viikko5/B vaiheanalyysi)
+NETOTUKSEN_JAANNOS = Lukupohja("- kulutus ja tuotanto samalla tunnilla (netotuksen jäännös): "
+                               "{:.1f} % kulutuksesta, {:.2f} kWh\n")
+YLIJAAMATUNNIT = Lukupohja("- ylijäämätunnit: {} h, ylijäämä verkkoon {:.2f} kWh\n")
+
+
+class Sarjatilasto:
+    """
+    Yhden suureen (esim. tuntikulutus) virtaava tilasto.
+
+    Pitää kirjaa pienimmästä ja suurimmasta arvosta, suurimman arvon
+    aikaleimasta (huipputunti) sekä harvasta histogrammista prosenttipisteitä varten.
+    """
+
+    def __init__(self) -> None:
+        self.lkm: int = 0
+        self.pienin: float | None = None
+        self.suurin: float | None = None
+        self.huipputunti: datetime | None = None
+        self.lokerot: dict[int, int] = {}
+
+    def paivita(self, aika: datetime, arvo: float) -> None:
+        """Lisää yhden tuntiarvon tilastoon."""
+        self.lkm += 1
+        if self.pienin is None or arvo < self.pienin:
+            self.pienin = arvo
+        if self.suurin is None or arvo > self.suurin:
+            self.suurin = arvo
+            self.huipputunti = aika
+        lokero = round(arvo / LOKERON_LEVEYS)
+        self.lokerot[lokero] = self.lokerot.get(lokero, 0) + 1
+
+    def lisaa_sarake(self, aikaleimat: Sequence[datetime], arvot: Sequence[float]) -> None:
+        """
+        Lisää kokonaisen sarakeviipaleen kerralla (sama tulos kuin paivita() rivi kerrallaan).
+
+        Min/max ja histogrammi lasketaan sarakeoperaatioina (min, max, Counter).
+        """
+        if not arvot:
+            return
+        osa = Sarjatilasto()
+        osa.lkm = len(arvot)
+        osa.pienin = min(arvot)
+        # max(..., key) palauttaa ensimmäisen suurimman, kuten paivita()
+        huippu = max(range(len(arvot)), key=arvot.__getitem__)
+        osa.suurin = arvot[huippu]
+        osa.huipputunti = aikaleimat[huippu]
+        osa.lokerot = Counter(round(arvo / LOKERON_LEVEYS) for arvo in arvot)
+        self.yhdista(osa)
+
+    def yhdista(self, toinen: "Sarjatilasto") -> None:
+        """
+        Yhdistää toisen tilaston tähän tilastoon (esim. päivä -> kuukausi).
+
+        Huomio:
+            - Jos suurin arvo on molemmissa sama, säilytetään aiempi huipputunti,
+              jolloin tulos vastaa yhtä läpikäyntiä aikajärjestyksessä.
+        """
+        if toinen.lkm == 0:
+            return
+        self.lkm += toinen.lkm
+        if self.pienin is None or toinen.pienin < self.pienin:
+            self.pienin = toinen.pienin
+        if self.suurin is None or toinen.suurin > self.suurin:
+            self.suurin = toinen.suurin
+            self.huipputunti = toinen.huipputunti
+        for lokero, lkm in toinen.lokerot.items():
+            self.lokerot[lokero] = self.lokerot.get(lokero, 0) + lkm
+
+    def prosenttipiste(self, p: float) -> float:
+        """
+        Palauttaa p:nnen prosenttipisteen (0–100) lähimmän sijan menetelmällä.
+
+        Poikkeukset:
+            ValueError: jos tilasto on tyhjä tai p ei ole väliltä 0–100.
+        """
+        if self.lkm == 0:
+            raise ValueError("Tyhjästä tilastosta ei voi laskea prosenttipistettä")
+        if not (0 <= p <= 100):
+            raise ValueError(f"Virheellinen prosenttipiste: {p}")
+        # Lähimmän sijan menetelmä: pienin arvo, jota vähintään p % havainnoista ei ylitä
+        sija = max(1, -(-self.lkm * p // 100))
+        kertyma = 0
+        for lokero in sorted(self.lokerot):
+            kertyma += self.lokerot[lokero]
+            if kertyma >= sija:
+                return lokero * LOKERON_LEVEYS
+        return self.suurin
+
+
+class Tuntitilasto:
+    """
+    Kulutuksen ja tuotannon tuntitilastot sekä tuntikohtainen omakäyttö yhdelle jaksolle.
+
+    Päivitetään sarjan indeksiväleinä (lisaa_vali) tai Rivi-tupleilla (aika,
+    kulutus kWh, tuotanto kWh, lämpötila) paivita()-metodilla. Rivit kerätään
+    päivän puskuriin ja lisätään tilastoihin päivä kerrallaan sarakeviipaleina;
+    viimeistele() lisää keskeneräisen päivän (yhdista() ja lisaa_vali() kutsuvat
+    sitä itse). Jaksot lisätään ja yhdistetään aikajärjestyksessä, jotta jakson
+    rajan yli jatkuvat ylijäämäjaksot yhdistyvät.
+    """
+
+    def __init__(self) -> None:
+        self.kulutus = Sarjatilasto()
+        self.tuotanto = Sarjatilasto()
+        self.omakaytto = Omakaytto()
+        # paivita()-rivien puskuri: päivä, aikaleimat, kulutus, tuotanto
+        self._paiva: date | None = None
+        self._puskuri: tuple[list, list, list] = ([], [], [])
+
+    def paivita(self, tietue: tuple) -> None:
+        """Lisää yhden Rivi-tuplen päivän puskuriin; edellinen päivä lisätään tilastoihin."""
+        paiva = tietue[0].date()
+        if paiva != self._paiva:
+            self.viimeistele()
+            self._paiva = paiva
+        aikaleimat, kulutus, tuotanto = self._puskuri
+        aikaleimat.append(tietue[0])
+        kulutus.append(tietue[1])
+        tuotanto.append(tietue[2])
+
+    def viimeistele(self) -> "Tuntitilasto":
+        """Lisää puskuroidut paivita()-rivit tilastoihin yhtenä viipaleena ja palauttaa tilaston."""
+        aikaleimat, kulutus, tuotanto = self._puskuri
+        if aikaleimat:
+            self._lisaa_sarakkeet(aikaleimat, kulutus, tuotanto)
+            self._puskuri = ([], [], [])
+        return self
+
+    def _lisaa_sarakkeet(self, aikaleimat: Sequence[datetime], kulutus: Sequence[float],
+                         tuotanto: Sequence[float]) -> None:
+        self.kulutus.lisaa_sarake(aikaleimat, kulutus)
+        self.tuotanto.lisaa_sarake(aikaleimat, tuotanto)
+        self.omakaytto.lisaa_sarakkeet(aikaleimat, kulutus, tuotanto)
+
+    def lisaa_vali(self, sarja: Aikasarja, a: int, b: int) -> None:
+        """Lisää sarjan indeksivälin [a, b) sarakkeet ("kulutus", "tuotanto") tilastoon."""
+        self.viimeistele()
+        aikaleimat = sarja.aikaleimat[a:b]
+        kulutus = sarja.sarake("kulutus")[a:b]
+        tuotanto = sarja.sarake("tuotanto")[a:b]
+        self._lisaa_sarakkeet(aikaleimat, kulutus, tuotanto)
+
+    def yhdista(self, toinen: "Tuntitilasto") -> None:
+        """Yhdistää aikajärjestyksessä seuraavan jakson tilastot tähän tilastoon."""
+        self.viimeistele()
+        toinen.viimeistele()
+        self.kulutus.yhdista(toinen.kulutus)
+        self.tuotanto.yhdista(toinen.tuotanto)
+        self.omakaytto.yhdista(toinen.omakaytto)
+
+
+class Energiakooste:
+    """
+    Kuukausittaiset summat hajautettua koostamista varten (ks. yhteiset.hajautus).
+
+    Päivitetään Rivi-tupleilla (aika, kulutus kWh, tuotanto kWh, lämpötila).
+    Summat kerätään kokonaislukuina (Wh ja lämpötilan sadasosat; data on
+    0,001 kWh:n ja 0,1 °C:n tarkkuudella), joten osakoosteiden yhdistäminen
+    antaa saman tuloksen palojen järjestyksestä ja määrästä riippumatta.
+
+    Attribuutit:
+        kuukaudet (dict[tuple[int, int], list[int]]): (vuosi, kuukausi) ->
+            [kulutus Wh, tuotanto Wh, lämpötilojen summa °C/100, tuntien lkm].
+    """
+
+    def __init__(self) -> None:
+        self.kuukaudet: dict[tuple[int, int], list[int]] = {}
+
+    def paivita(self, tietue: tuple) -> None:
+        """Lisää yhden Rivi-tuplen kuukautensa summiin."""
+        aika = tietue[0]
+        summat = self.kuukaudet.get((aika.year, aika.month))
+        if summat is None:
+            summat = self.kuukaudet[(aika.year, aika.month)] = [0, 0, 0, 0]
+        summat[0] += round(tietue[1] * 1000)
+        summat[1] += round(tietue[2] * 1000)
+        summat[2] += round(tietue[3] * 100)
+        summat[3] += 1
+
+    def yhdista(self, toinen: "Energiakooste") -> None:
+        """Yhdistää toisen osakoosteen kuukausisummat tähän."""
+        for avain, toiset in toinen.kuukaudet.items():
+            summat = self.kuukaudet.get(avain)
+            if summat is None:
+                self.kuukaudet[avain] = list(toiset)
+            else:
+                for i, arvo in enumerate(toiset):
+                    summat[i] += arvo
+
+    def viimeistele(self) -> list[tuple[tuple[int, int] | None, float, float, float, int]]:
+        """
+        Palauttaa kuukaudet aikajärjestyksessä ja lopuksi kaikkien kuukausien
+        yhteissumman (avain None) muodossa
+        (avain, kulutus kWh, tuotanto kWh, keskilämpötila °C, tuntien lkm).
+        """
+        tulos = []
+        yhteensa = [0, 0, 0, 0]
+        for avain in sorted(self.kuukaudet):
+            summat = self.kuukaudet[avain]
+            yhteensa = [a + b for a, b in zip(yhteensa, summat)]
+            tulos.append((avain, *_kooste_yksikoissa(summat)))
+        tulos.append((None, *_kooste_yksikoissa(yhteensa)))
+        return tulos
+
+
+def _kooste_yksikoissa(summat: list[int]) -> tuple[float, float, float, int]:
+    kulutus, tuotanto, lampotila, lkm = summat
+    return kulutus / 1000, tuotanto / 1000, lampotila / 100 / lkm if lkm else 0.0, lkm
+
+
+def laske_paivatilastot(tietokanta: Aikasarja) -> dict[date, Tuntitilasto]:
+    """
+    Laskee päiväkohtaiset osatilastot yhdellä läpikäynnillä (päiväsegmenteittäin).
+
+    Palauttaa:
+        dict[date, Tuntitilasto]: Päivä -> päivän tuntitilasto. Osatilastot
+        voidaan yhdistää funktiolla yhdista_paivat() mille tahansa aikavälille.
+    """
+    paivat: dict[date, Tuntitilasto] = {}
+    for ryhma in uudelleenota(tietokanta, "paiva"):
+        tilasto = paivat[ryhma.avain] = Tuntitilasto()
+        tilasto.lisaa_vali(tietokanta, ryhma.alku, ryhma.loppu)
+    return paivat
+
+
+def yhdista_paivat(paivatilastot: dict[date, Tuntitilasto], alku: date, loppu: date) -> Tuntitilasto:
+    """Yhdistää päiväkohtaiset osatilastot väliltä alku–loppu (rajat mukaan luettuina)."""
+    tulos = Tuntitilasto()
+    for paiva in sorted(paivatilastot):
+        if alku <= paiva <= loppu:
+            tulos.yhdista(paivatilastot[paiva])
+    return tulos
+
+
+def tuntitilasto_kannasta(yhteys, ehto: str = "1", parametrit: Sequence = ()) -> Tuntitilasto:
+    """
+    Laskee jakson tuntitilaston SQLite-kannan koosteista (ks. yhteiset.sqlitevarasto).
+
+    Tulos on sama kuin lisaa_vali()-kutsuilla samoista riveistä: histogrammi
+    lasketaan samoilla LOKERON_LEVEYS-lokeroilla GROUP BY -koosteena.
+    """
+    tilasto = Tuntitilasto()
+    for sarja, sarake in ((tilasto.kulutus, "kulutus"), (tilasto.tuotanto, "tuotanto")):
+        lkm, pienin, suurin, aika, lokerot = sarakkeen_tilasto(yhteys, sarake, LOKERON_LEVEYS, ehto, parametrit)
+        if lkm:
+            sarja.lkm, sarja.pienin, sarja.suurin, sarja.lokerot = lkm, pienin, suurin, lokerot
+            sarja.huipputunti = datetime.fromisoformat(aika)
+    oma = tilasto.omakaytto
+    (oma.tunnit, oma.kulutus, oma.tuotanto, oma.omakaytto, oma.ylijaamatunnit,
+     oma.pisin, alku) = omakayton_koosteet(yhteys, ehto, parametrit)
+    oma.ylijaama = oma.tuotanto - oma.omakaytto
+    oma.pisimman_alku = datetime.fromisoformat(alku) if alku else None
+    return tilasto
+
+
+def tilastorivit(tilasto: Tuntitilasto) -> str:
+    """
+    Muotoilee tilaston raporttiriveiksi (pilkku desimaalierottimena).
+
+    Palauttaa:
+        str: Rivit huippukulutukselle, huipputuotannolle ("ei tuotantoa", jos
+        jaksolla ei ole tuotantoa), kulutuksen
+        prosenttipisteille p50/p95/p99, netotuksen jälkeiselle kulutuksen ja
+        tuotannon päällekkäisyydelle (ei omavaraisuus, koska data on netotettu),
+        ylijäämätunneille ja pisimmälle peräkkäiselle ylijäämäjaksolle.
+        Tyhjälle tilastolle palautetaan tyhjä merkkijono.
+    """
+    tilasto.viimeistele()
+    if tilasto.kulutus.lkm == 0:
+        return ""
+    kulutus = tilasto.kulutus
+    tuotanto = tilasto.tuotanto
+    oma = tilasto.omakaytto
+    if tuotanto.suurin > 0:
+        huipputuotanto = HUIPPUTUOTANTO(tuotanto.suurin) + f"{tuotanto.huipputunti:%d.%m.%Y klo %H}.00)\n"
+    else:
+        huipputuotanto = EI_TUOTANTOA  # nollatunnin aikaleima ei olisi huippu
+    pisin = f"- pisin ylijäämäjakso: {oma.pisin} h"
+    if oma.pisimman_alku is not None:
+        pisin += f" (alkaen {oma.pisimman_alku:%d.%m.%Y klo %H}.00)"
+    return (
+        HUIPPUKULUTUS(kulutus.suurin) + f"{kulutus.huipputunti:%d.%m.%Y klo %H}.00)\n"
+        + huipputuotanto
+        + PROSENTTIPISTEET(kulutus.prosenttipiste(50), kulutus.prosenttipiste(95), kulutus.prosenttipiste(99))
+        + NETOTUKSEN_JAANNOS(100 * oma.omavaraisuus, oma.omakaytto)
+        + YLIJAAMATUNNIT(oma.ylijaamatunnit, oma.ylijaama)
+        + pisin + "\n"
+    )
@@ -9,11 +9,66 @@
 
 # See <https://www.gnu.org/licenses/>.
 
-from datetime import datetime, date
+from __future__ import annotations
+
+import os
+import sys
+from collections.abc import Iterable, Iterator
+from datetime import datetime, date, timedelta
+
+# Yhteiset apumoduulit (yhteiset/) ovat repositorion juuressa
+# (os.path ilman pathlib-tuontia nopeuttaa käynnistystä)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from tilastot import Energiakooste, Tuntitilasto, tilastorivit, tuntitilasto_kannasta
+from yhteiset.aikasarja import Aikasarja
+from yhteiset.aukot import poista_kaksoiskappaleet, tarkista_sarja
+from yhteiset.hylkaykset import Hylkaykset, hylkaykset_tiedostolle, lue_hylkaysraja
+from yhteiset.pakkaus import avaa_luettavaksi
+from yhteiset.profilointi import kirjaa_rivit, mittaa, vaihe
+from yhteiset.raportointi import Lukupohja
+from yhteiset.sqlitevarasto import (TUNTIMITTAUSTEN_SARAKKEET, ajan_tasalla, avaa, hae_tuntisarakkeet,
+                                    jakson_summat, lue_kantapolku, tuo, vuorokaudet)
+from yhteiset.uudelleenotanta import Ryhma, uudelleenota
+
+# Tuontibudjetti (tests/test_tuontibudjetti.py): typing-moduulia ei tuoda, ja
+# lippujen ja valikon takana olevat moduulit tuodaan niitä käyttävissä funktioissa
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    import sqlite3
+
+    # Tietolähde: luettu sarja tai SQLite-kanta (--sqlite); sqlite3 tuodaan vasta kantaa avattaessa
+    Tietokanta = Aikasarja | sqlite3.Connection
 
 # Rivi: (aika, kulutus (netotettu) kWh, tuotanto (netotettu) kWh, vuorokauden keskilämpötila)
 Rivi = tuple[datetime, float, float, float]
 
+# Raporttijakson koosteet: (kulutus kWh, tuotanto kWh, lämpötilojen summa, tietueiden lkm, tuntitilasto)
+Jakso = tuple[float, float, float, int, Tuntitilasto]
+
+# Aikasarjan sarakkeet Rivi-tuplen järjestyksessä (ilman aikaa)
+SARAKKEET: tuple[str, ...] = ("kulutus", "tuotanto", "lampotila")
+
+EROTIN = "--------------------------------------------------\n"
+
+# Raporttien lukurivit käännetään kerran; kaikki kolme lukua muotoillaan yhdellä kutsulla
+AIKAVALIN_LUVUT = Lukupohja(
+    "Aikavälin kokonaiskulutus: {:.2f} kWh\n"
+    "Aikavälin kokonaistuotanto: {:.2f} kWh\n"
+    "Aikavälin keskilämpötila: {:.2f} °C\n"
+)
+JAKSON_LUVUT = Lukupohja(
+    "- kokonaiskulutus: {:.2f} kWh\n"
+    "- kokonaistuotanto: {:.2f} kWh\n"
+    "- keskilämpötila: {:.2f} °C\n"
+)
+LIUKUVA_IKKUNA = Lukupohja("- {}: {:.2f} kWh (keskiarvo {:.3f} kWh/h)")
+
+# Komentorivilippu, jolla liukuvat summat virtaavat CSV-muodossa tiedostoa luettaessa
+LIUKUVAT_LIPPU = "--liukuvat"
+# Komentorivilippu, jolla lämpötilaraportti lasketaan tiedostoja luettaessa (valinnaiset tiedostot perään)
+LAMPOTILA_LIPPU = "--lampotila"
+
 def muunna_tiedot(tietue: list[str]) -> Rivi:
     """
     Muuntaa puolipiste-erotellun CSV-rivin kentät oikeiksi tietotyypeiksi.
@@ -48,53 +103,135 @@ def muunna_tiedot(tietue: list[str]) -> Rivi:
         float(tietue[3].replace(",", ".")),
     )
 
-def lue_data(tiedoston_nimi: str) -> list[Rivi]:
+@mittaa()
+def lue_data(tiedoston_nimi: str, hylkaykset: Hylkaykset | None = None) -> Aikasarja:
     """
-    Lukee puolipiste-erotellun CSV-tiedoston ja palauttaa rivit tupleina (Rivi) oikeilla tietotyypeillä.
+    Lukee puolipiste-erotellun CSV-tiedoston sarakemuotoiseen Aikasarjaan oikeilla tietotyypeillä.
 
     Odotettu syöte:
         - tiedoston_nimi (str): Polku CSV-tiedostoon, jossa ensimmäinen rivi on otsikko.
           Otsikot esim.: "Aika; Kulutus (netotettu) kWh; Tuotanto (netotettu) kWh; Vuorokauden keskilämpötila"
           Datassa desimaalierotin voi olla pilkku tai piste (esim. 1,569).
+          Tiedosto voi olla pakattu (gzip, bz2, xz, zstd); se puretaan virtana lukemisen aikana.
 
     Toiminta:
         - Ohittaa otsikkorivin turvallisesti.
         - Pilkkoo rivit puolipisteellä ja muuntaa kentät funktiolla muunna_tiedot().
+        - Lisää muunnetut rivit aikasarjan sarakkeisiin ("kulutus", "tuotanto", "lampotila").
 
     Palauttaa:
-        - list[Rivi]: Lista tupleja (datetime, float, float, float), arvot kWh/°C.
+        - Aikasarja: Aikaleimat + float-sarakkeet, arvot kWh/°C.
 
     Poikkeukset:
         - FileNotFoundError / OSError: jos tiedostoa ei löydy tai lukeminen epäonnistuu.
         - ValueError: jos rivin kenttiä ei ole 4, datetime ei ole ISO8601-muotoinen
                       tai jokin kenttä ei ole muunnettavissa desimaaliluvuksi.
+
+    Sietoinen tila (hylkaykset annettu):
+        - Virheelliset rivit ohitetaan ja kirjataan sivutiedostoon; poikkeus
+          nostetaan vain, jos hylättyjen osuus ylittää rajan (HylkaysrajaYlittyi).
     """
-    tietokanta: list[Rivi] = []
-    with open(tiedoston_nimi, "r", encoding="utf-8") as f:
+    tietokanta = Aikasarja(SARAKKEET)
+    lisaa = tietokanta.lisaa
+    with vaihe("muunna_tiedot"):
+        for tietue in lue_rivit(tiedoston_nimi, hylkaykset):
+            lisaa(tietue)
+        kirjaa_rivit(len(tietokanta))
+    kirjaa_rivit(len(tietokanta))
+    return tietokanta
+
+def lue_rivit(tiedoston_nimi: str, hylkaykset: Hylkaykset | None = None) -> Iterator[Rivi]:
+    """
+    Lukee CSV-tiedoston rivi kerrallaan ja tuottaa muunnetut rivit (ks. lue_data()).
+
+    Rivit tuotetaan sitä mukaa kuin tiedostoa luetaan, joten niitä voi käsitellä
+    (esim. liukuvat summat) ilman koko sarjaa muistissa. Sietoisen tilan
+    hylkäysraja tarkistetaan, kun tiedosto on luettu loppuun.
+    """
+    with avaa_luettavaksi(tiedoston_nimi) as f:
         next(f, None)  # Ohittaa ensimmäisen rivin (otsikon) turvallisesti, myös tyhjässä tiedostossa
-        for rivi in f:
-            rivi = rivi.strip() # Poistaa kaikki alusta ja lopusta löytyvät whitespace-merkit (välilyönti, rivinvaihto, jne.)
-            if not rivi:
-                continue # Ohita tyhjät rivit
-            tietue = rivi.split(";")
-            tietokanta.append(muunna_tiedot(tietue))
+        if hylkaykset is not None:
+            # Sietoinen tila: virheelliset rivit kirjataan ja ohitetaan
+            yield from hylkaykset.kasittele(f, ";", 4, muunna_tiedot, ensimmainen_rivinumero=2)
+        else:
+            for rivi in f:
+                rivi = rivi.strip() # Poistaa kaikki alusta ja lopusta löytyvät whitespace-merkit (välilyönti, rivinvaihto, jne.)
+                if not rivi:
+                    continue # Ohita tyhjät rivit
+                tietue = rivi.split(";")
+                yield muunna_tiedot(tietue)
 
-    return tietokanta
+    if hylkaykset is not None:
+        hylkaykset.viimeistele()
+
+def tarkista_ja_korjaa(tietokanta: Aikasarja) -> Aikasarja:
+    """
+    Tarkistaa luetun sarjan aukot, kaksoiskappaleet ja järjestyksen (O(n), ei uutta jäsennystä).
+
+    Toiminta:
+        - Tulostaa huomautuksen, jos poikkeamia löytyy.
+        - Poistaa kaksoiskappaleet säilyttäen ensimmäisen rivin, jotta toistuvat rivit
+          eivät kasvata summia eivätkä vääristä keskilämpötilan jakajaa (tietue_lkm).
+        - Aukkoja ei täytetä; ne vain raportoidaan.
+
+    Palauttaa:
+        - Aikasarja: Korjattu sarja (tai sama sarja, jos korjattavaa ei ollut).
+    """
+    indeksi = tarkista_sarja(tietokanta)
+    if indeksi.on_kunnossa():
+        return tietokanta
+    print(f"Huomio: {indeksi.yhteenveto()}")
+    return poista_kaksoiskappaleet(tietokanta, indeksi, "ensimmainen")
+
+@mittaa()
+def lataa_tietokanta(tiedoston_nimi: str, kantapolku: str | None, hylkaykset: Hylkaykset | None = None) -> Tietokanta:
+    """
+    Lataa datan joko muistiin (Aikasarja) tai SQLite-kantaan.
+
+    Toiminta:
+        - Ilman kantaa: lukee CSV:n ja korjaa sen (lue_data(), tarkista_ja_korjaa()).
+        - Kannan kanssa: jos CSV ei ole muuttunut edellisen tuonnin jälkeen, kantaa
+          käytetään sellaisenaan eikä tiedostoa jäsennetä. Muuten CSV luetaan ja
+          korjataan kuten ennen ja tuodaan kantaan yhdessä transaktiossa.
+
+    Palauttaa:
+        - Tietokanta: Aikasarja tai avattu sqlite3.Connection.
+    """
+    yhteys = avaa(kantapolku) if kantapolku else None
+    if yhteys is not None and ajan_tasalla(yhteys, "tuntimittaukset", tiedoston_nimi):
+        return yhteys
+
+    tietokanta = lue_data(tiedoston_nimi, hylkaykset)
+    kirjaa_rivit(len(tietokanta))
+    with vaihe("tarkista_ja_korjaa", len(tietokanta)):
+        tietokanta = tarkista_ja_korjaa(tietokanta)
+    if yhteys is None:
+        return tietokanta
+
+    rivit = (
+        (aika.isoformat(), aika.date().isoformat(), aika.month, kulutus, tuotanto, lampotila)
+        for aika, kulutus, tuotanto, lampotila in tietokanta.rivit()
+    )
+    with vaihe("tuo_kantaan", len(tietokanta)):
+        tuo(yhteys, "tuntimittaukset", tiedoston_nimi, TUNTIMITTAUSTEN_SARAKKEET, rivit)
+    return yhteys
 
 def nayta_paavalikko() -> int:  
     """
     Tulostaa päävalikon ja kysyy käyttäjän valinnan.
 
     Toiminta:
-        - Näyttää päävalikon vaihtoehdot (1–4).
+        - Näyttää päävalikon vaihtoehdot (1–6).
         - Kysyy valinnan numerona ja toistaa, kunnes käyttäjä antaa kelvollisen arvon.
 
     Palauttaa:
-        - int: Käyttäjän valinta väliltä 1–4.
+        - int: Käyttäjän valinta väliltä 1–6.
             1 = Aikavälin raportti
             2 = Kuukausiraportti
             3 = Vuosiraportti
-            4 = Lopeta ohjelma
+            4 = Liukuvat summat ja keskiarvot
+            5 = Lämpötilariippuvuus
+            6 = Lopeta ohjelma
     """
     while True:
         print("---------------------------------------------------------")
@@ -102,11 +239,13 @@ def nayta_paavalikko() -> int:
         print("1) Päiväkohtainen yhteenveto aikaväliltä")
         print("2) Kuukausikohtainen yhteenveto yhdelle kuukaudelle")
         print("3) Vuoden 2025 kokonaisyhteenveto")
-        print("4) Lopeta ohjelma")
+        print("4) Kulutuksen liukuvat summat ja keskiarvot (24 h, 7 d, 30 d)")
+        print("5) Kulutuksen lämpötilariippuvuus (lämmitystarveluku)")
+        print("6) Lopeta ohjelma")
         print("---------------------------------------------------------")
         try:
-            valinta = int(input("Anna valinta (numero 1-4): "))
-            if 1 <= valinta <= 4:
+            valinta = int(input("Anna valinta (numero 1-6): "))
+            if 1 <= valinta <= 6:
                 return valinta
         except ValueError:
             pass
@@ -141,19 +280,87 @@ def nayta_jatkovalikko() -> int:
             pass
         print("Virheellinen valinta, yritä uudelleen.\n")
 
-def luo_aikavalin_raportti(alkupaiva: str, loppupaiva: str, tietokanta: list[Rivi]) -> str:
+def rivimaara(tietokanta: Tietokanta) -> int:
+    """Tietolähteen tuntirivien määrä (profiloinnin käsitellyt rivit)."""
+    return len(tietokanta) if isinstance(tietokanta, Aikasarja) else jakson_summat(tietokanta)[3]
+
+@mittaa(rivit=lambda tietokanta, ryhmat: sum(ryhma.lkm for ryhma in ryhmat))
+def koosta_ryhmat(tietokanta: Aikasarja, ryhmat: list[Ryhma]) -> Jakso:
+    """
+    Yhdistää uudelleenotannan ryhmät yhdeksi raporttijaksoksi.
+
+    Odotettu syöte:
+        - tietokanta (Aikasarja): Sarja, josta ryhmät on laskettu.
+        - ryhmat (list[Ryhma]): Summaryhmät (arvot: kulutus, tuotanto, lämpötilojen summa).
+
+    Palauttaa:
+        - tuple: (kulutus kWh, tuotanto kWh, lämpötilojen summa, tietueiden lkm, tuntitilasto).
+    """
+    kulutus = 0
+    tuotanto = 0
+    vuorokauden_keskilampotila = 0
+    tietue_lkm = 0
+    tilasto = Tuntitilasto()  # Huippu- ja prosenttipistetilastot samoista segmenteistä
+    for ryhma in ryhmat:
+        kulutus += ryhma.arvot[0]
+        tuotanto += ryhma.arvot[1]
+        vuorokauden_keskilampotila += ryhma.arvot[2]
+        tietue_lkm += ryhma.lkm
+        tilasto.lisaa_vali(tietokanta, ryhma.alku, ryhma.loppu)
+    return kulutus, tuotanto, vuorokauden_keskilampotila, tietue_lkm, tilasto
+
+@mittaa()
+def koosta_kannasta(yhteys: "sqlite3.Connection", ehto: str = "1", parametrit: tuple = ()) -> Jakso:
+    """
+    Laskee raporttijakson koosteet SQL-kyselyinä (summat, lkm, huiput ja histogrammi).
+
+    Odotettu syöte:
+        - yhteys (sqlite3.Connection): Kanta, johon data on tuotu.
+        - ehto (str): Kiinteä WHERE-ehto, esim. "paiva BETWEEN ? AND ?".
+        - parametrit (tuple): Ehdon parametrit.
+
+    Palauttaa:
+        - Jakso: Sama muoto kuin koosta_ryhmat().
+    """
+    kulutus, tuotanto, vuorokauden_keskilampotila, tietue_lkm = jakson_summat(yhteys, ehto, parametrit)
+    kirjaa_rivit(tietue_lkm)
+    return kulutus, tuotanto, vuorokauden_keskilampotila, tietue_lkm, tuntitilasto_kannasta(yhteys, ehto, parametrit)
+
+def raportin_rivit(otsikko: str, lukupohja: Lukupohja, jakso: Jakso) -> Iterator[str]:
+    """
+    Tuottaa jaksoraportin rivit generaattorina.
+
+    Odotettu syöte:
+        - otsikko (str): Raportin otsikkorivi (ilman rivinvaihtoa).
+        - lukupohja (Lukupohja): AIKAVALIN_LUVUT tai JAKSON_LUVUT.
+        - jakso (Jakso): Jakson koosteet (koosta_ryhmat() tai koosta_kannasta()).
+
+    Palauttaa:
+        - Iterator[str]: Raportin rivit rivinvaihtoineen.
+    """
+    kulutus, tuotanto, vuorokauden_keskilampotila, tietue_lkm, tilasto = jakso
+    yield EROTIN
+    yield otsikko + "\n"
+    yield lukupohja(kulutus, tuotanto, vuorokauden_keskilampotila/tietue_lkm)
+    yield tilastorivit(tilasto)
+    yield EROTIN
+
+@mittaa()
+def luo_aikavalin_raportti(alkupaiva: str, loppupaiva: str, tietokanta: Tietokanta) -> str:
     """
     Muodostaa yhteenvedon valitulta aikaväliltä (päivärajat mukaan luettuina).
 
     Odotettu syöte:
         - alkupaiva (str): Päivämäärä muodossa 'pv.kk.vvvv'
         - loppupaiva (str): Päivämäärä muodossa 'pv.kk.vvvv'
-        - tietokanta (list[Rivi]): Luettu data, jossa datetime voi olla aikavyöhyketietoinen.
-          Päivärajauksessa käytetään tietue[0].date().
+        - tietokanta (Tietokanta): Luettu data (datetime voi olla aikavyöhyketietoinen)
+          tai SQLite-kanta. Päivärajauksessa käytetään aikaleiman omaa päivämäärää.
 
     Toiminta:
-        - Summaa kulutuksen ja tuotannon (kWh) sekä keskiarvoistaa päivän keskilämpötilan (°C)
-          niiltä tietueilta, jotka osuvat aikavälin sisään.
+        - Hakee aikavälin indeksirajat aikaleimoista puolitushaulla ja koostaa
+          vain välin rivit päiväsegmenteiksi: kulutuksen ja tuotannon summa (kWh)
+          sekä keskilämpötila (°C).
+        - Laskee samoista segmenteistä huipputunnit ja tuntikulutuksen prosenttipisteet.
 
     Palauttaa:
         - str: Muotoiltu raporttiteksti.
@@ -169,35 +376,28 @@ def luo_aikavalin_raportti(alkupaiva: str, loppupaiva: str, tietokanta: list[Riv
     loppu_kuukausi = int(loppupaiva.split('.')[1])
     loppu_vuosi = int(loppupaiva.split('.')[2])
     loppu = date(loppu_vuosi, loppu_kuukausi, loppu_paiva)
-    kulutus = 0
-    tuotanto = 0
-    vuorokauden_keskilampotila = 0
-    tietue_lkm = 0
-    for tietue in tietokanta:
-        if alku <= tietue[0].date() <= loppu:
-            kulutus += tietue[1]
-            tuotanto += tietue[2]
-            vuorokauden_keskilampotila += tietue[3]
-            tietue_lkm += 1
-    raportti = "--------------------------------------------------\n"
-    raportti += f"Raportti aikaväliltä: {alkupaiva}-{loppupaiva}\n"
-    raportti += f"Aikavälin kokonaiskulutus: {kulutus:.2f} kWh\n".replace(".", ",")
-    raportti += f"Aikavälin kokonaistuotanto: {tuotanto:.2f} kWh\n".replace(".", ",")
-    raportti += f"Aikavälin keskilämpötila: {vuorokauden_keskilampotila/tietue_lkm:.2f} °C\n".replace(".", ",")
-    raportti += "--------------------------------------------------\n"
-    return raportti
-
-def luo_kuukausiraportti(kuukausi: str, tietokanta: list[Rivi]) -> str:
+    if isinstance(tietokanta, Aikasarja):
+        a, b = tietokanta.paivien_rajat(alku, loppu)
+        jakso = koosta_ryhmat(tietokanta, uudelleenota(tietokanta, "paiva", a=a, b=b))
+    else:
+        jakso = koosta_kannasta(tietokanta, "paiva BETWEEN ? AND ?", (alku.isoformat(), loppu.isoformat()))
+    kirjaa_rivit(jakso[3])
+    otsikko = f"Raportti aikaväliltä: {alkupaiva}-{loppupaiva}"
+    return "".join(raportin_rivit(otsikko, AIKAVALIN_LUVUT, jakso))
+
+@mittaa()
+def luo_kuukausiraportti(kuukausi: str, tietokanta: Tietokanta) -> str:
     """
     Muodostaa yhteenvedon valitulle kuukaudelle.
 
     Odotettu syöte:
         - kuukausi (str): Kuukauden numero merkkijonona ('1'–'12').
-        - tietokanta (list[Rivi]): Luettu data.
+        - tietokanta (Tietokanta): Luettu data tai SQLite-kanta.
     
     Toiminta:
-        - Summaa kulutuksen ja tuotannon (kWh) sekä keskiarvoistaa päivän keskilämpötilan (°C)
-          valitulta kuukaudelta.
+        - Hakee valitun kuukauden rivit jokaiselta datan vuodelta puolitushaulla ja
+          koostaa vain ne: kulutuksen ja tuotannon summa (kWh) sekä keskilämpötila (°C).
+        - Laskee samoista segmenteistä huipputunnit ja tuntikulutuksen prosenttipisteet.
 
     Palauttaa:
         - str: Muotoiltu raporttiteksti.
@@ -212,32 +412,32 @@ def luo_kuukausiraportti(kuukausi: str, tietokanta: list[Rivi]) -> str:
     if not (1 <= kuukausi <= 12):
         raise ValueError(f"Virheellinen kuukauden numero: {kuukausi}")
 
-    kulutus = 0
-    tuotanto = 0
-    vuorokauden_keskilampotila = 0
-    tietue_lkm = 0
-    for tietue in tietokanta:
-        if tietue[0].date().month == kuukausi:
-            kulutus += tietue[1]
-            tuotanto += tietue[2]
-            vuorokauden_keskilampotila += tietue[3]
-            tietue_lkm += 1
-    
-    raportti = "--------------------------------------------------\n"
-    raportti += f"Raportti kuukaudelta: {kuukaudet[kuukausi-1]}\n"
-    raportti += f"- kokonaiskulutus: {kulutus:.2f} kWh\n".replace(".", ",")
-    raportti += f"- kokonaistuotanto: {tuotanto:.2f} kWh\n".replace(".", ",")
-    raportti += f"- keskilämpötila: {vuorokauden_keskilampotila/tietue_lkm:.2f} °C\n".replace(".", ",")
-    raportti += "--------------------------------------------------\n"
-    return raportti
-
-def luo_vuosiraportti(tietokanta: list[Rivi]) -> str:
+    # Avain on (vuosi, kuukausi); kuukausi valitaan kaikilta datan vuosilta kuten ennenkin
+    if isinstance(tietokanta, Aikasarja):
+        tietokanta.jarjesta()
+        ryhmat = []
+        if tietokanta.aikaleimat:
+            for vuosi in range(tietokanta.aikaleimat[0].year, tietokanta.aikaleimat[-1].year + 1):
+                ensimmainen = date(vuosi, kuukausi, 1)
+                seuraava = date(vuosi + kuukausi // 12, kuukausi % 12 + 1, 1)
+                a, b = tietokanta.paivien_rajat(ensimmainen, seuraava - timedelta(days=1))
+                ryhmat += uudelleenota(tietokanta, "kuukausi", a=a, b=b)
+        jakso = koosta_ryhmat(tietokanta, ryhmat)
+    else:
+        jakso = koosta_kannasta(tietokanta, "kuukausi = ?", (kuukausi,))
+    kirjaa_rivit(jakso[3])
+    otsikko = f"Raportti kuukaudelta: {kuukaudet[kuukausi-1]}"
+    return "".join(raportin_rivit(otsikko, JAKSON_LUVUT, jakso))
+
+@mittaa(rivit=rivimaara)
+def luo_vuosiraportti(tietokanta: Tietokanta) -> str:
     """
     Muodostaa koko datan kattavan vuosiyhteenvedon.
 
     Toiminta:
-        - Summaa kaikkien tietueiden kulutuksen ja tuotannon (kWh),
-          sekä laskee keskimääräisen vuorokauden keskilämpötilan (°C).
+        - Koostaa sarjan vuosiryhmiksi: kulutuksen ja tuotannon summa (kWh)
+          sekä keskimääräinen vuorokauden keskilämpötila (°C).
+        - Laskee samoista segmenteistä huipputunnit ja tuntikulutuksen prosenttipisteet.
     
     Huom:
         - Otsikkoteksti on kiinteä "Raportti vuodelta 2025". Jos data kattaa muun vuoden,
@@ -246,23 +446,171 @@ def luo_vuosiraportti(tietokanta: list[Rivi]) -> str:
     Palauttaa:
         - str: Muotoiltu raporttiteksti.
     """
-    kulutus = 0
-    tuotanto = 0
-    vuorokauden_keskilampotila = 0
-    tietue_lkm = 0
-    for tietue in tietokanta:
-        kulutus += tietue[1]
-        tuotanto += tietue[2]
-        vuorokauden_keskilampotila += tietue[3]
-        tietue_lkm += 1
-    
-    raportti = "--------------------------------------------------\n"
-    raportti += "Raportti vuodelta 2025\n"
-    raportti += f"- kokonaiskulutus: {kulutus:.2f} kWh\n".replace(".", ",")
-    raportti += f"- kokonaistuotanto: {tuotanto:.2f} kWh\n".replace(".", ",")
-    raportti += f"- keskilämpötila: {vuorokauden_keskilampotila/tietue_lkm:.2f} °C\n".replace(".", ",")
-    raportti += "--------------------------------------------------\n"
-    return raportti
+    if isinstance(tietokanta, Aikasarja):
+        jakso = koosta_ryhmat(tietokanta, uudelleenota(tietokanta, "vuosi"))
+    else:
+        jakso = koosta_kannasta(tietokanta)
+    return "".join(raportin_rivit("Raportti vuodelta 2025", JAKSON_LUVUT, jakso))
+
+def kulutuksen_rivit(tietokanta: Tietokanta) -> Iterator[tuple[datetime, tuple[float]]]:
+    """
+    Tuottaa kulutuksen (aika, (kulutus kWh,)) -rivit aikajärjestyksessä liukuville summille.
+    """
+    if isinstance(tietokanta, Aikasarja):
+        return zip(tietokanta.aikaleimat, zip(tietokanta.sarake("kulutus")))
+    return (
+        (datetime.fromisoformat(aika), (kulutus,))
+        for aika, kulutus in hae_tuntisarakkeet(tietokanta, ("kulutus",))
+    )
+
+@mittaa(rivit=rivimaara)
+def luo_liukuvien_raportti(tietokanta: Tietokanta) -> str:
+    """
+    Muodostaa raportin kulutuksen liukuvista summista ja keskiarvoista (24 h, 7 d, 30 d).
+
+    Toiminta:
+        - Käy sarjan läpi kerran liukuvilla ikkunoilla (yhteiset.liukuvat), joten
+          laskenta on O(n) ikkunoiden leveydestä riippumatta.
+        - Raportoi kunkin ikkunan suurimman täyden jakson (summa, tuntikeskiarvo
+          ja viimeinen tunti) sekä datan viimeisen tunnin päättyvät ikkunat.
+
+    Palauttaa:
+        - str: Muotoiltu raporttiteksti.
+    """
+    from yhteiset.liukuvat import Liukuvat
+
+    liukuvat = Liukuvat().lue(kulutuksen_rivit(tietokanta))
+    r = [EROTIN, "Liukuvat summat ja keskiarvot: kulutus (netotettu)\n"]
+    r.append("Suurimmat jaksot:\n")
+    for nimi, (huippu,) in liukuvat.huiput.items():
+        if huippu is None:
+            r.append(f"- {nimi}: data ei kata koko jaksoa\n")
+            continue
+        summa, aika, lkm = huippu
+        r.append(LIUKUVA_IKKUNA(nimi, summa, summa / lkm) + f", viimeinen tunti {aika:%d.%m.%Y klo %H}.00\n")
+    viimeisin = next(iter(liukuvat.ikkunat.values())).aika
+    if viimeisin is not None:
+        r.append(f"Viimeisimmät jaksot (viimeinen tunti {viimeisin:%d.%m.%Y klo %H}.00):\n")
+        for nimi, ikkuna in liukuvat.ikkunat.items():
+            r.append(LIUKUVA_IKKUNA(nimi, ikkuna.summat()[0], ikkuna.keskiarvot()[0]) + "\n")
+    r.append(EROTIN)
+    return "".join(r)
+
+def virtaa_liukuvat(tiedoston_nimi: str, hylkaykset: Hylkaykset | None = None) -> None:
+    """
+    Laskee kulutuksen liukuvat summat ja keskiarvot tiedostoa luettaessa ja
+    kirjoittaa ne CSV-riveinä vakiotulosteeseen (--liukuvat).
+
+    Toiminta:
+        - Rivit syötetään liukuville ikkunoille suoraan lukufunktiolta (lue_rivit()),
+          ja jokaisen rivin tulos kirjoitetaan heti; sarjaa ei pidetä muistissa.
+        - Koko sarjan korjausta (tarkista_ja_korjaa()) ei voi tehdä virtana, joten
+          toistuvat ja aiempaan aikaan palaavat rivit ohitetaan (ensimmäinen säilyy)
+          ja niiden määrä ilmoitetaan virhetulosteeseen.
+    """
+    from yhteiset.liukuvat import IKKUNAT, Liukuvat
+
+    csv_rivi = Lukupohja(";".join(["{:.3f}"] * (2 * len(IKKUNAT))) + "\n")
+    liukuvat = Liukuvat()
+    ikkunat = liukuvat.ikkunat.values()
+    kirjoita = sys.stdout.write
+    kirjoita("Aika;" + ";".join(f"{nimi} summa kWh;{nimi} keskiarvo kWh/h" for nimi in IKKUNAT) + "\n")
+    for aika, kulutus, _, _ in kasvavat_rivit(tiedoston_nimi, lue_rivit(tiedoston_nimi, hylkaykset)):
+        liukuvat.paivita(aika, (kulutus,))
+        luvut = []
+        for ikkuna in ikkunat:
+            luvut += (ikkuna.summat()[0], ikkuna.keskiarvot()[0])
+        kirjoita(aika.isoformat() + ";" + csv_rivi(*luvut))
+
+def kasvavat_rivit(tiedoston_nimi: str, rivit: Iterable[Rivi]) -> Iterator[Rivi]:
+    """
+    Ohittaa virtana luettaessa toistuvat ja aiempaan aikaan palaavat rivit
+    (ensimmäinen säilyy, kuten tarkista_ja_korjaa()) ja ilmoittaa niiden määrän
+    virhetulosteeseen, kun rivit on käyty läpi.
+    """
+    edellinen = None
+    ohitetut = 0
+    for tietue in rivit:
+        if edellinen is not None and tietue[0] <= edellinen:
+            ohitetut += 1
+            continue
+        edellinen = tietue[0]
+        yield tietue
+    if ohitetut:
+        print(f"Huomio ({tiedoston_nimi}): {ohitetut} toistuvaa tai epäjärjestyksessä olevaa riviä ohitettiin",
+              file=sys.stderr)
+
+@mittaa(rivit=rivimaara)
+def luo_lampotilaraportti(tietokanta: Tietokanta) -> str:
+    """
+    Muodostaa raportin vuorokausikulutuksen riippuvuudesta lämpötilasta.
+
+    Toiminta:
+        - Koostaa sarjan vuorokausiksi (kulutuksen summa, keskilämpötila) ja
+          kerää kuukausittaiset regressiosummat (lampotila.Lampotilaanalyysi).
+        - Kannasta vuorokausikoosteet haetaan SQL-koosteina.
+
+    Palauttaa:
+        - str: Muotoiltu raporttiteksti.
+    """
+    from lampotila import Lampotilaanalyysi, lampotilarivit
+
+    analyysi = Lampotilaanalyysi()
+    if isinstance(tietokanta, Aikasarja):
+        analyysi.lisaa_sarja(tietokanta)
+    else:
+        for paiva, kulutus, lampotila in vuorokaudet(tietokanta):
+            analyysi.lisaa_paiva(date.fromisoformat(paiva), kulutus, lampotila)
+    return EROTIN + "".join(lampotilarivit(analyysi)) + EROTIN
+
+@mittaa()
+def hajautettu_raportti(tiedostot: list[str], prosessit: int) -> str:
+    """
+    Koostaa tiedostojen kuukausi- ja kokonaissummat paloittain prosessipoolissa (--hajautettu).
+
+    Toiminta:
+        - Tiedostot jaetaan tavualueiksi, jotka koostetaan Energiakooste-osatiloiksi
+          rinnakkain ja yhdistetään (yhteiset.hajautus). Tiedostoja ei ladata
+          muistiin, joten ne voivat olla suurempia kuin käytettävissä oleva muisti.
+        - Summat ovat kokonaislukuja, joten tulos on sama prosessien määrästä riippumatta.
+        - Rivejä ei korjata (tarkista_ja_korjaa()) eikä sietoista tilaa tueta:
+          virheellinen rivi keskeyttää koosteen.
+
+    Palauttaa:
+        - str: Muotoiltu raporttiteksti.
+    """
+    from yhteiset.hajautus import koosta
+
+    koosteet = koosta(Energiakooste, muunna_tiedot, ";", tiedostot, prosessit).viimeistele()
+    kirjaa_rivit(koosteet[-1][4])
+    r = [EROTIN]
+    for avain, kulutus, tuotanto, keskilampotila, lkm in koosteet:
+        r.append(f"Kuukausi {avain[1]:02d}/{avain[0]} ({lkm} h)\n" if avain else f"Yhteensä ({lkm} h)\n")
+        r.append(JAKSON_LUVUT(kulutus, tuotanto, keskilampotila))
+    r.append(EROTIN)
+    return "".join(r)
+
+@mittaa()
+def lampotilaraportti_tiedostoista(tiedostot: list[str], hylkaysraja: float | None = None) -> str:
+    """
+    Laskee lämpötilaraportin tiedostoja luettaessa (--lampotila).
+
+    Jokaisen tiedoston vuorokaudet kerätään omaan analyysiinsa rivi kerrallaan
+    lukemisen aikana, ja osa-analyysit yhdistetään summina. Tiedostot voivat olla
+    esim. eri vuosien dataa, kunhan vuorokausi ei jakaudu kahteen tiedostoon.
+    """
+    from lampotila import Lampotilaanalyysi, lampotilarivit
+
+    analyysi = Lampotilaanalyysi()
+    for tiedosto in tiedostot:
+        osa = Lampotilaanalyysi()
+        rivit = 0
+        for tietue in kasvavat_rivit(tiedosto, lue_rivit(tiedosto, hylkaykset_tiedostolle(tiedosto, hylkaysraja))):
+            osa.paivita(tietue)
+            rivit += 1
+        kirjaa_rivit(rivit)
+        analyysi.yhdista(osa)
+    return EROTIN + "".join(lampotilarivit(analyysi)) + EROTIN
     
 def tulosta_raportti_konsoliin(raportti: str) -> None:
     """
@@ -273,35 +621,95 @@ def tulosta_raportti_konsoliin(raportti: str) -> None:
     """
     print(raportti)
 
-def kirjoita_raportti_tiedostoon(raportti: str) -> None:
+def kirjoita_raportti_tiedostoon(raportti: str, tiedoston_nimi: str = "raportti.txt") -> None:
     """
-    Kirjoittaa raportin tiedostoon 'raportti.txt'.
+    Kirjoittaa raportin tiedostoon (oletus 'raportti.txt').
 
     Odotettu syöte:
         - raportti (str): Raporttiteksti.
+        - tiedoston_nimi (str): Kohdetiedosto.
 
     Toiminta:
-        - Luo tai ylikirjoittaa tiedoston 'raportti.txt' ja kirjoittaa raportin sinne.
+        - Luo tai ylikirjoittaa tiedoston atomisesti: raportti kirjoitetaan
+          väliaikaiseen tiedostoon, joka vaihdetaan kohteen tilalle, joten
+          keskeytynyt kirjoitus ei jätä puolikasta raporttia.
     
     Poikkeukset:
         - OSError: jos tiedostoon kirjoittaminen epäonnistuu.
     """
-    with open("raportti.txt", "w", encoding="utf-8") as f:
-        f.write(raportti)
+    from yhteiset.raporttikohde import kirjoita_atomisesti
+
+    kirjoita_atomisesti(tiedoston_nimi, raportti)
+
+def kirjoita_raportit_hakemistoon(hakemisto: str, tietokanta: Tietokanta) -> list[str]:
+    """
+    Kirjoittaa kuukausiraportit ja vuosiraportin omiin tiedostoihinsa (--raportit).
+
+    Raportit kirjoitetaan Raporttikohteen kirjoitussäikeessä, joten seuraava
+    raportti muotoillaan sillä aikaa, kun edellinen kirjoitetaan levylle.
+    Jokainen tiedosto kirjoitetaan atomisesti.
+
+    Palauttaa:
+        list[str]: Kirjoitetut tiedostot.
+    """
+    from yhteiset.raporttikohde import Raporttikohde
+
+    with Raporttikohde(hakemisto, kirjoitussaie=True) as kohde:
+        for kuukausi in range(1, 13):
+            kohde.kirjoita(f"kuukausi_{kuukausi:02d}.txt", luo_kuukausiraportti(str(kuukausi), tietokanta))
+        kohde.kirjoita("vuosi.txt", luo_vuosiraportti(tietokanta))
+    return kohde.tiedostot
 
+@mittaa()
 def main() -> None:
     """
     Ohjelman pääfunktio: lukee datan, näyttää valikot ja ohjaa raporttien luomista.
 
     Toiminta:
-        - Lukee datan tiedostosta '2025.csv'.
-        - Näyttää päävalikon; valinnat 1–3 tuottavat raportin ja vievät jatkovalikkoon.
-        - Valinta 4 lopettaa ohjelman välittömästi.
+        - Lukee datan tiedostosta '2025.csv' ja tarkistaa aukot/kaksoiskappaleet.
+          Lipulla --sqlite[=tiedosto] data tuodaan kantaan (oletus 2025.sqlite) ja
+          raportit lasketaan SQL-koosteina; muuttumatonta CSV:tä ei jäsennetä uudelleen.
+          Lipulla --sietoinen[=raja] virheelliset rivit ohitetaan ja kirjataan.
+        - Lipulla --liukuvat kulutuksen liukuvat summat kirjoitetaan CSV-muodossa
+          vakiotulosteeseen tiedostoa luettaessa, eikä valikkoa näytetä.
+        - Lipulla --hajautettu[=prosessit] [tiedostot...] tiedostojen kuukausisummat
+          koostetaan paloittain prosessipoolissa (oletus 2025.csv), eikä valikkoa näytetä.
+        - Lipulla --raportit[=hakemisto] kuukausi- ja vuosiraportit kirjoitetaan omiin
+          tiedostoihinsa (oletus hakemisto raportit), eikä valikkoa näytetä.
+        - Lipulla --lampotila [tiedostot...] lämpötilariippuvuusraportti lasketaan
+          tiedostoja luettaessa (oletus 2025.csv) ja tulostetaan, eikä valikkoa näytetä.
+        - Näyttää päävalikon; valinnat 1–5 tuottavat raportin ja vievät jatkovalikkoon.
+        - Valinta 6 lopettaa ohjelman välittömästi.
         - Jatkovalikon valinta 1 kirjoittaa raportin tiedostoon,
           valinta 2 palaa päävalikkoon, valinta 3 lopettaa ohjelman.
     """
+    # Lippujen jäsentimet ovat ominaisuuksiensa moduuleissa; raskaat osat niissä tuodaan vasta käytettäessä
+    from yhteiset.hajautus import lue_prosessit
+    from yhteiset.raporttikohde import lue_raporttihakemisto
+
     # Luetaan data tiedostosta
-    kulutus_ja_tuotanto_2025: list[Rivi] = lue_data("2025.csv")
+    hylkaysraja = lue_hylkaysraja()
+    hylkaykset = hylkaykset_tiedostolle("2025.csv", hylkaysraja)
+    kantapolku = lue_kantapolku("2025.sqlite")  # poistaa lipun ennen tiedostoargumentteja
+    prosessit = lue_prosessit()
+    if prosessit is not None:
+        tulosta_raportti_konsoliin(hajautettu_raportti(sys.argv[1:] or ["2025.csv"], prosessit))
+        return
+    if LAMPOTILA_LIPPU in sys.argv[1:]:
+        sys.argv.remove(LAMPOTILA_LIPPU)
+        tulosta_raportti_konsoliin(lampotilaraportti_tiedostoista(sys.argv[1:] or ["2025.csv"], hylkaysraja))
+        return
+    if LIUKUVAT_LIPPU in sys.argv[1:]:
+        sys.argv.remove(LIUKUVAT_LIPPU)
+        virtaa_liukuvat("2025.csv", hylkaykset)
+        return
+    raporttihakemisto = lue_raporttihakemisto()
+    kulutus_ja_tuotanto_2025: Tietokanta = lataa_tietokanta("2025.csv", kantapolku, hylkaykset)
+    kirjaa_rivit(lambda: rivimaara(kulutus_ja_tuotanto_2025))
+    if raporttihakemisto is not None:
+        tiedostot = kirjoita_raportit_hakemistoon(raporttihakemisto, kulutus_ja_tuotanto_2025)
+        print(f"Kirjoitettu {len(tiedostot)} raporttia hakemistoon {raporttihakemisto}")
+        return
 
     while True:
         # Päävalikon käsittely
@@ -319,6 +727,12 @@ def main() -> None:
             raportti = luo_vuosiraportti(kulutus_ja_tuotanto_2025)
             tulosta_raportti_konsoliin(raportti)
         elif ensimmainen_valinta == 4:
+            raportti = luo_liukuvien_raportti(kulutus_ja_tuotanto_2025)
+            tulosta_raportti_konsoliin(raportti)
+        elif ensimmainen_valinta == 5:
+            raportti = luo_lampotilaraportti(kulutus_ja_tuotanto_2025)
+            tulosta_raportti_konsoliin(raportti)
+        elif ensimmainen_valinta == 6:
             print("Lopetaan ohjelma!")
             break
         else:
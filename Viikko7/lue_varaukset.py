@@ -12,7 +12,92 @@
 
 # See <https://www.gnu.org/licenses/>.
 
-from datetime import datetime
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime, time, timedelta
+
+# Yhteiset apumoduulit (yhteiset/) ovat repositorion juuressa
+# (os.path ilman pathlib-tuontia nopeuttaa käynnistystä)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from varauskoosteet import Varauskoosteet, koosta_varaukset, koosterivit
+from yhteiset.hylkaykset import Hylkaykset, hylkaykset_tiedostolle, lue_hylkaysraja
+from yhteiset.koodisto import Koodisto
+from yhteiset.pakkaus import avaa_luettavaksi
+from yhteiset.profilointi import kirjaa_rivit, mittaa, vaihe
+from yhteiset.raportointi import Lukupohja
+from yhteiset.sqlitevarasto import (VARAUSTEN_SARAKKEET, ajan_tasalla, avaa, hae_varausrivit,
+                                    lue_kantapolku, tuo, varaukset_kohteittain, varausten_koosteet)
+
+# Tuontibudjetti (tests/test_tuontibudjetti.py): typing-moduulia ei tuoda, ja
+# lippujen takana olevat moduulit tuodaan niitä käyttävissä funktioissa
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    import sqlite3
+
+    # Varauslähde: luetut varaukset tai SQLite-kanta (--sqlite); sqlite3 tuodaan vasta kantaa avattaessa
+    Varaukset = list[dict] | sqlite3.Connection
+
+# Kokonaistulorivin pohja käännetään kerran (desimaalipilkku yhdellä muunnoksella)
+KOKONAISTULOT = Lukupohja("Vahvistettujen varausten kokonaistulot: {:.2f} €")
+
+# Binäärimuoto (--binaari): otsake, merkkijonotaulu ja kiinteälevyiset tietueet.
+# Otsake: tunniste, versio, tietueiden lkm, merkkijonotaulun pituus tavuina
+BINAARIOTSAKE = struct.Struct("<4sHII")
+BINAARITUNNISTE = b"VARB"
+BINAARIVERSIO = 1
+BINAARIPAATE = ".bin"
+# Tietue: id, päivä (ordinaali), luotu-päivä (ordinaali), luotu-sekunti vuorokaudesta,
+# kellonaika minuutteina, kesto h, tuntihinta sentteinä, nimi, sähköposti,
+# puhelinnumero ja varauskohde merkkijonotaulun indekseinä, tilabitit
+VARAUSTIETUE = struct.Struct("<qiiiHHiIIIIB")
+VAHVISTETTU_BITTI = 0x01
+
+# Saatavuushaku (--vapaat[=kohde,alkaen,kesto_h,päivä,alku,loppu]); pelkkä lippu käyttää esimerkkihakua
+SAATAVUUSLIPPU = "--vapaat"
+ESIMERKKIHAKU = "Kukkahuone,2025-12-01T09:00,3,2025-11-12,09:00,12:00"
+
+
+class Varauslista(list):
+    """
+    Latauskohtainen varauslista, jonka toistuvat tekstikentät on sanakirjakoodattu.
+
+    Attribuutit:
+        kohteet (Koodisto): Varauskohde -> kohdekoodi.
+        asiakkaat (Koodisto): Asiakkaan sähköposti -> asiakaskoodi.
+
+    Listaan lisätään varauksesta kopio, jossa on lisäksi kentät "kohdekoodi" ja
+    "asiakaskoodi" ja jonka varauskohde ja sähköposti on korvattu koodiston
+    kanonisella oliolla; annettua sanakirjaa ei muuteta. Nimi ja puhelinnumero
+    internoidaan (sys.intern), joten kukin erillinen arvo on muistissa vain kerran
+    riippumatta siitä, monessako varauksessa se esiintyy.
+    """
+
+    def __init__(self, varaukset: Iterable[dict] = ()) -> None:
+        super().__init__()
+        self.kohteet = Koodisto()
+        self.asiakkaat = Koodisto()
+        for varaus in varaukset:
+            self.lisaa(varaus)
+
+    def lisaa(self, varaus: dict) -> None:
+        """Lisää listan loppuun kopion varauksesta tekstikentät koodattuina."""
+        kohdekoodi = self.kohteet.koodaa(varaus["varauskohde"])
+        asiakaskoodi = self.asiakkaat.koodaa(varaus["sahkoposti"])
+        self.append({
+            **varaus,
+            "varauskohde": self.kohteet[kohdekoodi],
+            "sahkoposti": self.asiakkaat[asiakaskoodi],
+            "nimi": sys.intern(varaus["nimi"]),
+            "puhelinnumero": sys.intern(varaus["puhelinnumero"]),
+            "kohdekoodi": kohdekoodi,
+            "asiakaskoodi": asiakaskoodi,
+        })
 
 def muunna_varaustiedot(varaus_lista: list[str]) -> dict:
     """
@@ -54,7 +139,8 @@ def muunna_varaustiedot(varaus_lista: list[str]) -> dict:
         "luotu": datetime.strptime(varaus_lista[10], "%Y-%m-%d %H:%M:%S")
     }
 
-def hae_varaukset(varaustiedosto: str) -> list[dict]:
+@mittaa()
+def hae_varaukset(varaustiedosto: str, hylkaykset: Hylkaykset | None = None) -> Varauslista:
     """
     Lukee varaukset tiedostosta ja muuntaa jokaisen rivin sanakirjaksi.
 
@@ -63,40 +149,217 @@ def hae_varaukset(varaustiedosto: str) -> list[dict]:
             kuvaa yhden varauksen. Kentät on eroteltu '|' -merkillä.
 
     Palauttaa:
-        list[dict]: Lista sanakirjoja, joissa on yhden varauksen tiedot.
+        Varauslista: Lista sanakirjoja, joissa on yhden varauksen tiedot
+        (toistuvat tekstikentät sanakirjakoodattuina).
 
     Huomio:
         - Tyhjät rivit eivät ole käsitelty erikseen.
         - Kenttämäärää ei tarkisteta; puutteelliset/virheelliset rivit
           voivat aiheuttaa poikkeuksia muunnosvaiheessa.
         - Jos tiedostoa ei löydy, Python nostaa FileNotFoundErrorin.
+        - Pakattu tiedosto (gzip, bz2, xz, zstd) puretaan virtana lukemisen aikana.
+        - Sietoisessa tilassa (hylkaykset annettu) tyhjät rivit ohitetaan ja
+          virheelliset rivit ohitetaan ja kirjataan sivutiedostoon; poikkeus
+          nostetaan vain, jos hylättyjen osuus ylittää rajan (HylkaysrajaYlittyi).
     """
-    varaukset: list[dict] = []
-    with open(varaustiedosto, "r", encoding="utf-8") as f:
-        for varausrivi in f:
-            varausrivi = varausrivi.strip()
-            varauksen_tiedot = varausrivi.split('|')
-            varaukset.append(muunna_varaustiedot(varauksen_tiedot))
+    varaukset = Varauslista()
+    with vaihe("muunna_varaustiedot"), avaa_luettavaksi(varaustiedosto) as f:
+        if hylkaykset is not None:
+            for varaus in hylkaykset.kasittele(f, "|", 11, muunna_varaustiedot):
+                varaukset.lisaa(varaus)
+        else:
+            for varausrivi in f:
+                varausrivi = varausrivi.strip()
+                varauksen_tiedot = varausrivi.split('|')
+                varaukset.lisaa(muunna_varaustiedot(varauksen_tiedot))
+        kirjaa_rivit(len(varaukset))
+    if hylkaykset is not None:
+        hylkaykset.viimeistele()
+    kirjaa_rivit(len(varaukset))
     return varaukset
 
-def vahvistetut_varaukset(varaukset: list):
+def kirjoita_varaukset_binaarina(varaukset: list[dict], binaaritiedosto: str) -> None:
     """
-    Tulostaa vahvistetut varaukset kompaktissa muodossa.
+    Kirjoittaa varaukset tiiviiseen binäärimuotoon.
+
+    Parametrit:
+        varaukset (list[dict]): Varaukset (esim. hae_varaukset()-funktiolta).
+        binaaritiedosto (str): Kirjoitettava tiedosto.
+
+    Muoto:
+        - Otsake (BINAARIOTSAKE), sitten merkkijonotaulu (UTF-8, erottimena NUL)
+          ja lopuksi kiinteälevyiset tietueet (VARAUSTIETUE).
+        - Nimet, sähköpostit, puhelinnumerot ja varauskohteet tallennetaan
+          merkkijonotauluun vain kerran; tietueessa on niiden indeksit.
+        - Hinnat tallennetaan sentteinä kokonaislukuina.
+    """
+    from yhteiset.raporttikohde import kirjoita_atomisesti
+
+    merkkijonot: dict[str, int] = {}
+
+    def indeksi(teksti: str) -> int:
+        return merkkijonot.setdefault(teksti, len(merkkijonot))
+
+    tietueet = bytearray()
+    for varaus in varaukset:
+        luotu = varaus["luotu"]
+        kellonaika = varaus["kellonaika"]
+        tietueet += VARAUSTIETUE.pack(
+            varaus["id"],
+            varaus["paivamaara"].toordinal(),
+            luotu.toordinal(),
+            luotu.hour * 3600 + luotu.minute * 60 + luotu.second,
+            kellonaika.hour * 60 + kellonaika.minute,
+            varaus["kesto"],
+            round(varaus["tuntihinta"] * 100),
+            indeksi(varaus["nimi"]),
+            indeksi(varaus["sahkoposti"]),
+            indeksi(varaus["puhelinnumero"]),
+            indeksi(varaus["varauskohde"]),
+            VAHVISTETTU_BITTI if varaus["vahvistettu"] else 0,
+        )
+    taulu = "\0".join(merkkijonot).encode("utf-8")
+    # Atominen kirjoitus: keskeytynyt ajo ei jätä katkennutta binääritiedostoa
+    kirjoita_atomisesti(binaaritiedosto, [
+        BINAARIOTSAKE.pack(BINAARITUNNISTE, BINAARIVERSIO, len(varaukset), len(taulu)),
+        taulu,
+        tietueet,
+    ], binaari=True)
+
+@mittaa()
+def hae_varaukset_binaarista(binaaritiedosto: str) -> Varauslista:
+    """
+    Lukee kirjoita_varaukset_binaarina()-funktion tuottaman tiedoston.
+
+    Tiedosto muistikartoitetaan (mmap) ja tietueet puretaan yhdellä
+    struct.iter_unpack-läpikäynnillä; tekstikenttiä ei jäsennetä lainkaan.
+
+    Palauttaa:
+        Varauslista: Samat sanakirjat kuin hae_varaukset().
+
+    Poikkeukset:
+        ValueError: jos tiedosto ei ole tuettua binäärimuotoa tai se on katkennut.
+    """
+    with open(binaaritiedosto, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError(f"Tyhjä binääritiedosto: {binaaritiedosto}")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as kartta:
+            if len(kartta) < BINAARIOTSAKE.size:
+                raise ValueError(f"Katkennut binääritiedosto: {binaaritiedosto}")
+            tunniste, versio, lkm, taulun_pituus = BINAARIOTSAKE.unpack_from(kartta)
+            if tunniste != BINAARITUNNISTE or versio != BINAARIVERSIO:
+                raise ValueError(f"Tuntematon binäärimuoto: {binaaritiedosto}")
+            alku = BINAARIOTSAKE.size + taulun_pituus
+            loppu = alku + lkm * VARAUSTIETUE.size
+            if len(kartta) != loppu:
+                raise ValueError(f"Katkennut binääritiedosto: {binaaritiedosto}")
+            merkkijonot = kartta[BINAARIOTSAKE.size:alku].decode("utf-8").split("\0")
+            with memoryview(kartta)[alku:loppu] as nakyma:
+                varaukset = Varauslista(
+                    {
+                        "id": varaus_id,
+                        "nimi": merkkijonot[nimi],
+                        "sahkoposti": merkkijonot[sahkoposti],
+                        "puhelinnumero": merkkijonot[puhelinnumero],
+                        "paivamaara": date.fromordinal(paiva),
+                        "kellonaika": time(minuutti // 60, minuutti % 60),
+                        "kesto": kesto,
+                        "tuntihinta": sentit / 100,
+                        "vahvistettu": bool(tila & VAHVISTETTU_BITTI),
+                        "varauskohde": merkkijonot[varauskohde],
+                        "luotu": datetime.fromordinal(luotu_paiva) + timedelta(seconds=luotu_sekunti),
+                    }
+                    for (varaus_id, paiva, luotu_paiva, luotu_sekunti, minuutti, kesto, sentit,
+                         nimi, sahkoposti, puhelinnumero, varauskohde, tila)
+                    in VARAUSTIETUE.iter_unpack(nakyma)
+                )
+    kirjaa_rivit(len(varaukset))
+    return varaukset
+
+def varmista_binaari(varaustiedosto: str, hylkaykset: Hylkaykset | None = None) -> str:
+    """
+    Palauttaa tekstitiedoston binääriversion polun ja kirjoittaa sen,
+    jos se puuttuu tai on tekstitiedostoa vanhempi.
+    """
+    binaaritiedosto = os.path.splitext(varaustiedosto)[0] + BINAARIPAATE
+    if not os.path.exists(binaaritiedosto) or os.path.getmtime(binaaritiedosto) < os.path.getmtime(varaustiedosto):
+        kirjoita_varaukset_binaarina(hae_varaukset(varaustiedosto, hylkaykset), binaaritiedosto)
+    return binaaritiedosto
+
+def lue_varaustiedosto(varaustiedosto: str, hylkaykset: Hylkaykset | None = None) -> Varauslista:
+    """Lukee varaukset teksti- tai binääritiedostosta päätteen mukaan (binäärimuoto on aina validi)."""
+    if varaustiedosto.endswith(BINAARIPAATE):
+        return hae_varaukset_binaarista(varaustiedosto)
+    return hae_varaukset(varaustiedosto, hylkaykset)
+
+@mittaa()
+def lataa_varaukset(varaustiedosto: str, kantapolku: str | None, hylkaykset: Hylkaykset | None = None) -> Varaukset:
+    """
+    Lataa varaukset joko muistiin tai SQLite-kantaan.
+
+    Parametrit:
+        varaustiedosto (str): Polku varaustiedostoon (tuontilähde, teksti tai .bin).
+        kantapolku (str | None): Kantatiedosto tai None, jolloin varaukset luetaan listaksi.
+        hylkaykset (Hylkaykset | None): Sietoisen latauksen kirjanpito (ks. hae_varaukset()).
+
+    Palauttaa:
+        Varaukset: Lista sanakirjoja tai avattu sqlite3.Connection. Jos tiedosto ei ole
+        muuttunut edellisen tuonnin jälkeen, kantaa käytetään jäsentämättä tiedostoa.
+    """
+    if not kantapolku:
+        varaukset = lue_varaustiedosto(varaustiedosto, hylkaykset)
+        kirjaa_rivit(len(varaukset))
+        return varaukset
+    yhteys = avaa(kantapolku)
+    if not ajan_tasalla(yhteys, "varaukset", varaustiedosto):
+        # Kannassa päivämäärät ja ajat ovat tekstinä, vahvistus kokonaislukuna
+        rivit = (
+            (varaus["id"], varaus["nimi"], varaus["sahkoposti"], varaus["puhelinnumero"],
+             varaus["paivamaara"].isoformat(), varaus["kellonaika"].strftime("%H:%M"),
+             varaus["kesto"], varaus["tuntihinta"], varaus["vahvistettu"], varaus["varauskohde"],
+             str(varaus["luotu"]))
+            for varaus in lue_varaustiedosto(varaustiedosto, hylkaykset)
+        )
+        kirjaa_rivit(tuo(yhteys, "varaukset", varaustiedosto, VARAUSTEN_SARAKKEET, rivit))
+    return yhteys
+
+def varausmaara(varaukset: Varaukset) -> int:
+    """Varausten määrä listassa tai kannassa (profiloinnin käsitellyt rivit)."""
+    if isinstance(varaukset, list):
+        return len(varaukset)
+    vahvistetut, ei_vahvistetut, _ = varausten_koosteet(varaukset)
+    return vahvistetut + ei_vahvistetut
+
+def rajaa_varaukset(varaukset: Varaukset, ehto: str = "1") -> Varauslista:
+    """
+    Palauttaa varaukset listana; kannasta haetaan vain WHERE-ehdon rajaamat rivit.
+
+    Parametrit:
+        varaukset (Varaukset): Lista sanakirjoja tai SQLite-kanta.
+        ehto (str): Kiinteä SQL-ehto (esim. "vahvistettu = 1"); listaa ei rajata,
+            koska raporttien omat ehdot tekevät saman rajauksen.
+    """
+    if isinstance(varaukset, list):
+        return varaukset
+    return Varauslista(muunna_varaustiedot(rivi) for rivi in hae_varausrivit(varaukset, ehto))
+
+def vahvistetut_varaukset_rivit(varaukset: Varaukset) -> Iterator[str]:
+    """
+    Tuottaa vahvistetut varaukset kompaktissa muodossa rivi kerrallaan.
 
     Parametrit:
         varaukset (list[dict]): Varauksia sisältävä lista, jossa jokainen alkio on sanakirja.
 
-    Tulostus:
-        Kirjoittaa raportin näytölle (konsoliin) käyttäen print()-komentoja.
+    Palauttaa:
+        Iterator[str]: Raporttirivit (ilman rivinvaihtoa).
     """
-    for varaus in varaukset:
+    for varaus in rajaa_varaukset(varaukset, "vahvistettu = 1"):
         if varaus["vahvistettu"]:
-            print(f"- {varaus['nimi']}, {varaus['varauskohde']}, {varaus['paivamaara'].strftime('%d.%m.%Y')} klo {varaus['kellonaika'].strftime('%H.%M')}")
-    print()
+            yield f"- {varaus['nimi']}, {varaus['varauskohde']}, {varaus['paivamaara'].strftime('%d.%m.%Y')} klo {varaus['kellonaika'].strftime('%H.%M')}"
 
-def pitkat_varaukset(varaukset: list[dict]) -> None:   
+def vahvistetut_varaukset(varaukset: Varaukset):
     """
-    Tulostaa varaukset, joiden kesto on vähintään 3 tuntia.
+    Tulostaa vahvistetut varaukset kompaktissa muodossa.
 
     Parametrit:
         varaukset (list[dict]): Varauksia sisältävä lista, jossa jokainen alkio on sanakirja.
@@ -104,14 +367,25 @@ def pitkat_varaukset(varaukset: list[dict]) -> None:
     Tulostus:
         Kirjoittaa raportin näytölle (konsoliin) käyttäen print()-komentoja.
     """
-    for varaus in varaukset:
+    tulosta_rivit(vahvistetut_varaukset_rivit(varaukset))
+
+def pitkat_varaukset_rivit(varaukset: Varaukset) -> Iterator[str]:
+    """
+    Tuottaa varaukset, joiden kesto on vähintään 3 tuntia, rivi kerrallaan.
+
+    Parametrit:
+        varaukset (list[dict]): Varauksia sisältävä lista, jossa jokainen alkio on sanakirja.
+
+    Palauttaa:
+        Iterator[str]: Raporttirivit (ilman rivinvaihtoa).
+    """
+    for varaus in rajaa_varaukset(varaukset, "kesto >= 3"):
         if(varaus['kesto'] >= 3):
-            print(f"- {varaus['nimi']}, {varaus['paivamaara'].strftime('%d.%m.%Y')} klo {varaus['kellonaika'].strftime('%H.%M')}, kesto {varaus['kesto']} h, {varaus['varauskohde']}")
-    print()
+            yield f"- {varaus['nimi']}, {varaus['paivamaara'].strftime('%d.%m.%Y')} klo {varaus['kellonaika'].strftime('%H.%M')}, kesto {varaus['kesto']} h, {varaus['varauskohde']}"
 
-def varausten_vahvistusstatus(varaukset: list[dict]) -> None: 
+def pitkat_varaukset(varaukset: Varaukset) -> None:   
     """
-    Tulostaa kunkin varauksen vahvistusstatuksen.
+    Tulostaa varaukset, joiden kesto on vähintään 3 tuntia.
 
     Parametrit:
         varaukset (list[dict]): Varauksia sisältävä lista, jossa jokainen alkio on sanakirja.
@@ -119,62 +393,282 @@ def varausten_vahvistusstatus(varaukset: list[dict]) -> None:
     Tulostus:
         Kirjoittaa raportin näytölle (konsoliin) käyttäen print()-komentoja.
     """
-    for varaus in varaukset:
+    tulosta_rivit(pitkat_varaukset_rivit(varaukset))
+
+def varausten_vahvistusstatus_rivit(varaukset: Varaukset) -> Iterator[str]:
+    """
+    Tuottaa kunkin varauksen vahvistusstatuksen rivi kerrallaan.
+
+    Parametrit:
+        varaukset (list[dict]): Varauksia sisältävä lista, jossa jokainen alkio on sanakirja.
+
+    Palauttaa:
+        Iterator[str]: Raporttirivit (ilman rivinvaihtoa).
+    """
+    for varaus in rajaa_varaukset(varaukset):
         if(varaus['vahvistettu']):
-            print(f"{varaus['nimi']} → Vahvistettu")
+            yield f"{varaus['nimi']} → Vahvistettu"
         else:
-            print(f"{varaus['nimi']} → EI vahvistettu")
-    print()
+            yield f"{varaus['nimi']} → EI vahvistettu"
 
-def varausten_lkm(varaukset: list[dict]) -> None:
+def varausten_vahvistusstatus(varaukset: Varaukset) -> None: 
     """
-    Laskee ja tulostaa vahvistettujen ja ei-vahvistettujen varausten lukumäärät.
+    Tulostaa kunkin varauksen vahvistusstatuksen.
 
     Parametrit:
         varaukset (list[dict]): Varauksia sisältävä lista, jossa jokainen alkio on sanakirja.
 
     Tulostus:
         Kirjoittaa raportin näytölle (konsoliin) käyttäen print()-komentoja.
+    """
+    tulosta_rivit(varausten_vahvistusstatus_rivit(varaukset))
+
+def varausten_lkm_rivit(varaukset: Varaukset) -> Iterator[str]:
+    """
+    Laskee vahvistettujen ja ei-vahvistettujen varausten lukumäärät ja tuottaa yhteenvetorivit.
+
+    Parametrit:
+        varaukset (list[dict]): Varauksia sisältävä lista, jossa jokainen alkio on sanakirja.
+
+    Palauttaa:
+        Iterator[str]: Raporttirivit (ilman rivinvaihtoa).
 
+    Huomio:
+        - Kannasta lukumäärät lasketaan SQL-koosteena ilman rivien hakua.
     """
     vahvistetutVaraukset = 0
     eiVahvistetutVaraukset = 0
+    if not isinstance(varaukset, list):
+        vahvistetutVaraukset, eiVahvistetutVaraukset, _ = varausten_koosteet(varaukset)
+        varaukset = []
     for varaus in varaukset:
         if(varaus['vahvistettu']):
             vahvistetutVaraukset += 1
         else:
             eiVahvistetutVaraukset += 1
 
-    print(f"- Vahvistettuja varauksia: {vahvistetutVaraukset} kpl")
-    print(f"- Ei-vahvistettuja varauksia: {eiVahvistetutVaraukset} kpl")
-    print()
+    yield f"- Vahvistettuja varauksia: {vahvistetutVaraukset} kpl"
+    yield f"- Ei-vahvistettuja varauksia: {eiVahvistetutVaraukset} kpl"
 
-def varausten_kokonaistulot(varaukset: list[dict]) -> None:
+def varausten_lkm(varaukset: Varaukset) -> None:
     """
-    Laskee ja tulostaa vahvistettujen varausten kokonaistulot euroina.
+    Laskee ja tulostaa vahvistettujen ja ei-vahvistettujen varausten lukumäärät.
 
     Parametrit:
         varaukset (list[dict]): Varauksia sisältävä lista, jossa jokainen alkio on sanakirja.
 
     Tulostus:
         Kirjoittaa raportin näytölle (konsoliin) käyttäen print()-komentoja.
+
+    """
+    tulosta_rivit(varausten_lkm_rivit(varaukset))
+
+def varausten_kokonaistulot_rivit(varaukset: Varaukset) -> Iterator[str]:
+    """
+    Laskee vahvistettujen varausten kokonaistulot euroina ja tuottaa raporttirivin.
+
+    Parametrit:
+        varaukset (list[dict]): Varauksia sisältävä lista, jossa jokainen alkio on sanakirja.
+
+    Palauttaa:
+        Iterator[str]: Raporttirivit (ilman rivinvaihtoa).
+
+    Huomio:
+        - Kannasta tulot lasketaan SQL-koosteena ilman rivien hakua.
     """
     varaustenTulot = 0
+    if not isinstance(varaukset, list):
+        _, _, varaustenTulot = varausten_koosteet(varaukset)
+        varaukset = []
     for varaus in varaukset:
         if(varaus['vahvistettu']):
             varaustenTulot += varaus['kesto']*varaus['tuntihinta']
 
-    print("Vahvistettujen varausten kokonaistulot:", f"{varaustenTulot:.2f}".replace('.', ','), "€")
+    yield KOKONAISTULOT(varaustenTulot)
+
+def varausten_kokonaistulot(varaukset: Varaukset) -> None:
+    """
+    Laskee ja tulostaa vahvistettujen varausten kokonaistulot euroina.
+
+    Parametrit:
+        varaukset (list[dict]): Varauksia sisältävä lista, jossa jokainen alkio on sanakirja.
+
+    Tulostus:
+        Kirjoittaa raportin näytölle (konsoliin) käyttäen print()-komentoja.
+    """
+    tulosta_rivit(varausten_kokonaistulot_rivit(varaukset))
+
+def varaukset_kohteittain_rivit(varaukset: Varaukset) -> Iterator[str]:
+    """
+    Laskee varausten ja vahvistettujen varausten lukumäärät varauskohteittain.
+
+    Parametrit:
+        varaukset (Varaukset): Varauslista tai SQLite-kanta.
+
+    Palauttaa:
+        Iterator[str]: Raporttirivit kohteiden ensiesiintymisjärjestyksessä (ilman rivinvaihtoa).
+
+    Huomio:
+        - Listalla lasketaan kokonaislukuavaimilla: kohdekoodi on suoraan laskurilistan indeksi.
+        - Kannasta lukumäärät lasketaan GROUP BY -koosteena.
+    """
+    if not isinstance(varaukset, list):
+        rivit = varaukset_kohteittain(varaukset)
+    else:
+        if not isinstance(varaukset, Varauslista):
+            varaukset = Varauslista(varaukset)
+        lkm = [0] * len(varaukset.kohteet)
+        vahvistetut = [0] * len(varaukset.kohteet)
+        for varaus in varaukset:
+            lkm[varaus["kohdekoodi"]] += 1
+            vahvistetut[varaus["kohdekoodi"]] += varaus["vahvistettu"]
+        rivit = zip(varaukset.kohteet.arvot, lkm, vahvistetut)
+    for kohde, kohteen_lkm, kohteen_vahvistetut in rivit:
+        yield f"- {kohde}: {kohteen_lkm} kpl, joista vahvistettuja {kohteen_vahvistetut} kpl"
+
+def varaukset_kohteittain_raportti(varaukset: Varaukset) -> None:
+    """
+    Tulostaa varausten lukumäärät varauskohteittain.
+
+    Parametrit:
+        varaukset (Varaukset): Varauslista tai SQLite-kanta.
+    """
+    tulosta_rivit(varaukset_kohteittain_rivit(varaukset))
+
+def varauskoosteet_rivit(varaukset: Varaukset) -> Iterator[str]:
+    """
+    Tuottaa tulot, varatut tunnit ja käyttöasteen kohteittain, asiakkaittain ja kuukausittain.
+
+    Parametrit:
+        varaukset (Varaukset): Varauslista tai SQLite-kanta.
+
+    Palauttaa:
+        Iterator[str]: Raporttirivit (ilman rivinvaihtoa).
+    """
+    koosteet = koosta_varaukset(rajaa_varaukset(varaukset))
+    for otsikko, ulottuvuus in (("Kohteittain:", "kohde"), ("Asiakkaittain:", "asiakas"), ("Kuukausittain:", "kuukausi")):
+        yield otsikko
+        yield from koosterivit(koosteet, ulottuvuus)
+
+def hajautetut_koosteet_rivit(tiedostot: list[str], prosessit: int) -> Iterator[str]:
+    """
+    Koostaa varaustiedostot paloittain prosessipoolissa (--hajautettu) ja tuottaa
+    kokonaistulot sekä koosteet kohteittain, asiakkaittain ja kuukausittain.
+
+    Tiedostoja ei ladata muistiin, ja tulot kerätään sentteinä, joten tulos on
+    sama prosessien ja palojen määrästä riippumatta (ks. yhteiset.hajautus).
+    Virheellinen rivi keskeyttää koosteen.
+
+    Palauttaa:
+        Iterator[str]: Raporttirivit (ilman rivinvaihtoa).
+    """
+    from yhteiset.hajautus import koosta
+
+    koosteet = koosta(Varauskoosteet, muunna_varaustiedot, "|", tiedostot, prosessit, otsikkorivit=0)
+    kirjaa_rivit(sum(kooste.lkm for kooste in koosteet.ryhmat["kohde"].values()))
+    yield KOKONAISTULOT(sum(kooste.tulot_senttia for kooste in koosteet.ryhmat["kohde"].values()) / 100)
+    for otsikko, ulottuvuus in (("Kohteittain:", "kohde"), ("Asiakkaittain:", "asiakas"), ("Kuukausittain:", "kuukausi")):
+        yield otsikko
+        yield from koosterivit(koosteet, ulottuvuus)
+
+def varauskoosteet_raportti(varaukset: Varaukset) -> None:
+    """
+    Tulostaa tulot, varatut tunnit ja käyttöasteen kohteittain, asiakkaittain ja kuukausittain.
+
+    Parametrit:
+        varaukset (Varaukset): Varauslista tai SQLite-kanta.
+    """
+    tulosta_rivit(varauskoosteet_rivit(varaukset))
+
+def saatavuus_rivit(varaukset: Varaukset, kohde: str, jalkeen: datetime, kesto_h: int,
+                    paiva: date, alku: time, loppu: time) -> Iterator[str]:
+    """
+    Tuottaa saatavuushaut saatavuusindeksistä: kohteen ensimmäinen vapaa aika
+    ja päivän aikavälillä vapaat kohteet.
+
+    Parametrit:
+        varaukset (Varaukset): Varauslista tai SQLite-kanta.
+        kohde (str): Kohde, jolle etsitään ensimmäinen vapaa aika.
+        jalkeen (datetime): Hetki, jonka jälkeen vapaata aikaa etsitään.
+        kesto_h (int): Tarvittava yhtäjaksoinen aika tunteina.
+        paiva (date), alku (time), loppu (time): Aikaväli, jolle vapaat kohteet haetaan.
+
+    Palauttaa:
+        Iterator[str]: Raporttirivit (ilman rivinvaihtoa).
+    """
+    from saatavuus import Saatavuusindeksi
+
+    indeksi = Saatavuusindeksi(rajaa_varaukset(varaukset))
+    vapaa = indeksi.ensimmainen_vapaa(kohde, jalkeen, kesto_h)
+    yield f"- Ensimmäinen vapaa {kesto_h} h aika kohteessa {kohde} {jalkeen:%d.%m.%Y klo %H.%M} jälkeen: {vapaa:%d.%m.%Y klo %H.%M}"
+    vapaat = indeksi.vapaat_kohteet(paiva, alku, loppu)
+    yield f"- Vapaat kohteet {paiva:%d.%m.%Y} klo {alku:%H.%M}–{loppu:%H.%M}: {', '.join(vapaat) or 'ei yhtään'}"
+
+def lue_saatavuushaku() -> tuple[str, datetime, int, date, time, time] | None:
+    """
+    Palauttaa komentoriviltä annetun saatavuushaun tai None, jos lippua ei ole annettu.
+
+    Haku annetaan muodossa --vapaat=kohde,YYYY-MM-DDTHH:MM,kesto_h,YYYY-MM-DD,HH:MM,HH:MM
+    (saatavuus_rivit()-funktion parametrit). Pelkkä --vapaat käyttää esimerkkihakua.
+    Komentorivilippu poistetaan sys.argv:sta.
+
+    Poikkeukset:
+        ValueError: jos hakua ei voi jäsentää.
+    """
+    for arg in sys.argv[1:]:
+        if arg == SAATAVUUSLIPPU or arg.startswith(SAATAVUUSLIPPU + "="):
+            sys.argv.remove(arg)
+            osat = (arg.partition("=")[2] or ESIMERKKIHAKU).split(",")
+            if len(osat) != 6:
+                raise ValueError(f"Saatavuushaussa on oltava 6 kenttää: {arg}")
+            kohde, jalkeen, kesto_h, paiva, alku, loppu = osat
+            return (kohde, datetime.fromisoformat(jalkeen), int(kesto_h), date.fromisoformat(paiva),
+                    time.fromisoformat(alku), time.fromisoformat(loppu))
+    return None
+
+def tulosta_rivit(rivit: Iterable[str]) -> None:
+    """
+    Tulostaa raportin rivit sitä mukaa kuin ne valmistuvat ja lopuksi tyhjän rivin.
+
+    Parametrit:
+        rivit (Iterable[str]): Raporttirivit ilman rivinvaihtoa (esim. *_rivit()-generaattori).
+    """
+    for rivi in rivit:
+        print(rivi)
     print()
 
+@mittaa()
 def main():
     """
     Pääohjelma: lukee varaukset tiedostosta ja tulostaa useita raportteja.
 
     Tulostus:
         Kirjoittaa raportit näytölle (konsoliin) käyttäen print()-komentoja.
+
+    Lipulla --sqlite[=tiedosto] varaukset tuodaan kantaan (oletus varaukset.sqlite)
+    ja raportit rajataan ja kootaan SQL-kyselyinä. Lipulla --binaari varaukset luetaan
+    binääritiedostosta varaukset.bin, joka kirjoitetaan tarvittaessa tekstitiedostosta.
+    Lipulla --sietoinen[=raja] virheelliset rivit ohitetaan ja kirjataan.
+    Lipulla --hajautettu[=prosessit] [tiedostot...] vain tulot ja koosteet lasketaan
+    tiedostoista paloittain prosessipoolissa (oletus varaukset.txt).
+    Lipulla --vapaat[=haku] tulostetaan lisäksi saatavuushaku (ks. lue_saatavuushaku()).
     """
-    varaukset = hae_varaukset("varaukset.txt")
+    # Lippujen jäsentimet ovat ominaisuuksiensa moduuleissa; raskaat osat niissä tuodaan vasta käytettäessä
+    from yhteiset.hajautus import lue_prosessit
+
+    varaustiedosto = "varaukset.txt"
+    saatavuushaku = lue_saatavuushaku()
+    hylkaykset = hylkaykset_tiedostolle(varaustiedosto, lue_hylkaysraja())
+    kantapolku = lue_kantapolku("varaukset.sqlite")
+    prosessit = lue_prosessit()
+    if prosessit is not None:
+        tulosta_rivit(hajautetut_koosteet_rivit(sys.argv[1:] or [varaustiedosto], prosessit))
+        return
+    if "--binaari" in sys.argv:
+        sys.argv.remove("--binaari")
+        varaustiedosto = varmista_binaari(varaustiedosto, hylkaykset)
+    varaukset = lataa_varaukset(varaustiedosto, kantapolku, hylkaykset)
+    kirjaa_rivit(lambda: varausmaara(varaukset))
     print("1) Vahvistetut varaukset")
     vahvistetut_varaukset(varaukset)
     print("2) Pitkät varaukset (≥ 3 h)")
@@ -185,6 +679,13 @@ def main():
     varausten_lkm(varaukset)
     print("5) Vahvistettujen varausten kokonaistulot")
     varausten_kokonaistulot(varaukset)
+    print("6) Varaukset kohteittain")
+    varaukset_kohteittain_raportti(varaukset)
+    print("7) Tulot, varatut tunnit ja käyttöaste")
+    varauskoosteet_raportti(varaukset)
+    if saatavuushaku is not None:
+        print("8) Vapaat ajat")
+        tulosta_rivit(saatavuus_rivit(varaukset, *saatavuushaku))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
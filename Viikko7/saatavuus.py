@@ -0,0 +1,157 @@
+# Copyright (c) 2025 Jonna Kangas
+
+# Ohjelmoinnin perusteet -opintojakso, harjoitustehtävä 7
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# See <https://www.gnu.org/licenses/>.
+
+"""
+Varauskohteiden saatavuushaku.
+
+Rakenteet:
+    - Kohdekohtainen väli-indeksi: varaukset yhdistettyinä, päällekkäisyydettöminä
+      väleinä [alku, loppu) minuutteina (päivän ordinaali * 1440 + minuutti) kahdessa
+      järjestetyssä listassa. Yksittäinen vapaustarkistus on puolitushaku (O(log n)),
+      ja ensimmäisen vapaan ajan haku hyppää varattujen välien yli.
+    - Päiväkohtaiset varauskartat: jokaiselle päivälle ja kohteelle kokonaisluku,
+      jonka bitti i tarkoittaa varttia i (96 varttia vuorokaudessa). Usean kohteen
+      saatavuus tarkistetaan yhdellä bittimaskin AND-operaatiolla kohdetta kohden.
+"""
+
+from bisect import bisect_right
+from collections.abc import Iterable
+from datetime import date, datetime, time, timedelta
+
+MINUUTTEJA_PAIVASSA = 24 * 60
+VARTTI = 15
+
+# Oletusaukioloaika ensimmäisen vapaan ajan haussa (kellonajat)
+AUKEAA = time(8, 0)
+SULKEUTUU = time(20, 0)
+
+
+def _minuutteina(hetki: datetime) -> int:
+    return hetki.toordinal() * MINUUTTEJA_PAIVASSA + hetki.hour * 60 + hetki.minute
+
+
+def _hetkena(minuutit: int) -> datetime:
+    paiva, minuutti = divmod(minuutit, MINUUTTEJA_PAIVASSA)
+    return datetime.combine(date.fromordinal(paiva), time(minuutti // 60, minuutti % 60))
+
+
+def _vartit(alku: int, loppu: int) -> int:
+    """Bittimaski vuorokauden minuuttivälin [alku, loppu) varteille (osittaiset vartit mukaan)."""
+    ensimmainen = alku // VARTTI
+    viimeinen = -(-loppu // VARTTI)  # ylöspäin pyöristys
+    return ((1 << (viimeinen - ensimmainen)) - 1) << ensimmainen
+
+
+class Saatavuusindeksi:
+    """
+    Varausten saatavuusindeksi.
+
+    Attribuutit:
+        alut (dict[str, list[int]]): Kohde -> yhdistettyjen varausvälien alut minuutteina.
+        loput (dict[str, list[int]]): Kohde -> välien loput (samassa järjestyksessä).
+        paivakartat (dict[date, dict[str, int]]): Päivä -> kohde -> varttien bittikartta.
+    """
+
+    def __init__(self, varaukset: Iterable[dict], vain_vahvistetut: bool = False) -> None:
+        """
+        Rakentaa indeksin varauksista (esim. hae_varaukset()-funktion tuloksesta).
+
+        Parametrit:
+            varaukset (Iterable[dict]): Varaukset kentillä varauskohde, paivamaara, kellonaika ja kesto.
+            vain_vahvistetut (bool): Jos True, vahvistamattomat varaukset eivät varaa aikaa.
+        """
+        valit: dict[str, list[tuple[int, int]]] = {}
+        self.paivakartat: dict[date, dict[str, int]] = {}
+        for varaus in varaukset:
+            if vain_vahvistetut and not varaus["vahvistettu"]:
+                continue
+            kohde = varaus["varauskohde"]
+            alku = _minuutteina(datetime.combine(varaus["paivamaara"], varaus["kellonaika"]))
+            loppu = alku + varaus["kesto"] * 60
+            valit.setdefault(kohde, []).append((alku, loppu))
+            # Keskiyön yli jatkuva varaus jaetaan päiville
+            while alku < loppu:
+                paiva, minuutti = divmod(alku, MINUUTTEJA_PAIVASSA)
+                paivan_loppu = min(loppu - paiva * MINUUTTEJA_PAIVASSA, MINUUTTEJA_PAIVASSA)
+                kartat = self.paivakartat.setdefault(date.fromordinal(paiva), {})
+                kartat[kohde] = kartat.get(kohde, 0) | _vartit(minuutti, paivan_loppu)
+                alku = (paiva + 1) * MINUUTTEJA_PAIVASSA
+
+        # Järjestetään ja yhdistetään päällekkäiset ja peräkkäiset välit
+        self.alut: dict[str, list[int]] = {}
+        self.loput: dict[str, list[int]] = {}
+        for kohde, kohteen_valit in valit.items():
+            alut: list[int] = []
+            loput: list[int] = []
+            for alku, loppu in sorted(kohteen_valit):
+                if loput and alku <= loput[-1]:
+                    loput[-1] = max(loput[-1], loppu)
+                else:
+                    alut.append(alku)
+                    loput.append(loppu)
+            self.alut[kohde] = alut
+            self.loput[kohde] = loput
+
+    def kohteet(self) -> list[str]:
+        """Palauttaa indeksin kohteet."""
+        return list(self.alut)
+
+    def on_vapaa(self, kohde: str, alku: datetime, loppu: datetime) -> bool:
+        """Palauttaa True, jos kohteella ei ole varausta välillä [alku, loppu). O(log n)."""
+        alut = self.alut.get(kohde, [])
+        a, b = _minuutteina(alku), _minuutteina(loppu)
+        # Ensimmäinen väli, joka päättyy alun jälkeen; vapaa, jos se alkaa vasta lopussa
+        i = bisect_right(self.loput.get(kohde, []), a)
+        return i == len(alut) or alut[i] >= b
+
+    def ensimmainen_vapaa(self, kohde: str, jalkeen: datetime, kesto_h: float,
+                          aukeaa: time = AUKEAA, sulkeutuu: time = SULKEUTUU) -> datetime:
+        """
+        Palauttaa ensimmäisen hetken (aikaisintaan jalkeen), jolloin kohde on vapaa
+        kesto_h tuntia yhtäjaksoisesti aukioloajan sisällä.
+
+        Haku alkaa puolitushaulla ja hyppää suoraan kunkin esteenä olevan välin loppuun.
+
+        Poikkeukset:
+            ValueError: jos kesto ei mahdu aukioloaikaan.
+        """
+        kesto = round(kesto_h * 60)
+        avaus = aukeaa.hour * 60 + aukeaa.minute
+        sulku = sulkeutuu.hour * 60 + sulkeutuu.minute
+        if kesto <= 0 or kesto > sulku - avaus:
+            raise ValueError(f"Kesto {kesto_h} h ei mahdu aukioloaikaan {aukeaa:%H:%M}-{sulkeutuu:%H:%M}")
+        alut = self.alut.get(kohde, [])
+        loput = self.loput.get(kohde, [])
+        t = _minuutteina(jalkeen)
+        while True:
+            paiva, minuutti = divmod(t, MINUUTTEJA_PAIVASSA)
+            if minuutti < avaus:
+                t = paiva * MINUUTTEJA_PAIVASSA + avaus
+            elif minuutti + kesto > sulku:
+                t = (paiva + 1) * MINUUTTEJA_PAIVASSA + avaus
+            i = bisect_right(loput, t)
+            if i == len(alut) or alut[i] >= t + kesto:
+                return _hetkena(t)
+            t = loput[i]
+
+    def vapaat_kohteet(self, paiva: date, alku: time, loppu: time, kohteet: Iterable[str] | None = None) -> list[str]:
+        """
+        Palauttaa kohteet, jotka ovat vapaina päivänä paiva välillä [alku, loppu).
+
+        Tarkistus tehdään päivän varttibittikartoista; osittain varattu vartti
+        lasketaan varatuksi.
+
+        Parametrit:
+            kohteet (Iterable[str] | None): Tarkistettavat kohteet (oletus: kaikki indeksin kohteet).
+        """
+        maski = _vartit(alku.hour * 60 + alku.minute, loppu.hour * 60 + loppu.minute)
+        kartat = self.paivakartat.get(paiva, {})
+        return [kohde for kohde in (self.alut if kohteet is None else kohteet) if not kartat.get(kohde, 0) & maski]
@@ -0,0 +1,274 @@
+# Copyright (c) 2025 Jonna Kangas
+
+# Ohjelmoinnin perusteet -opintojakso, harjoitustehtävä 7
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# See <https://www.gnu.org/licenses/>.
+
+"""
+Varausten ryhmittelykoosteet: tulot, varatut tunnit ja käyttöaste
+varauskohteittain, asiakkaittain ja kuukausittain.
+
+Toiminta:
+    - Koosteet lasketaan yhdellä läpikäynnillä hajautustauluihin
+      (ulottuvuus -> ryhmäavain -> Kooste).
+    - Kohteet ja asiakkaat ryhmitellään koodiston koodeilla (kohdekoodi,
+      asiakaskoodi; asiakas tunnistetaan sähköpostista kuten Varauslistassa),
+      ja nimet puretaan vasta raporttia muotoiltaessa.
+    - Osakoosteet (esim. tiedoston paloista) voidaan yhdistää yhdista()-metodilla.
+      Tulot kerätään sentteinä kokonaislukuina, joten yhdistetty tulos on
+      sama palojen järjestyksestä riippumatta.
+    - Uuden varauksen lisäys ja varauksen vahvistus päivittävät koosteita
+      inkrementaalisesti ilman uutta läpikäyntiä.
+    - Käyttöasteet lasketaan vasta viimeistele()-vaiheessa.
+"""
+
+from collections.abc import Iterable, Iterator
+from datetime import date
+
+from yhteiset.koodisto import Koodisto
+from yhteiset.raportointi import Lukupohja
+
+# Varattavissa olevat tunnit kohdetta kohden vuorokaudessa (käyttöasteen nimittäjä)
+AUKIOLOTUNNIT: int = 12
+
+# Ryhmittelyulottuvuudet; avaimet: kohdekoodi, asiakaskoodi ja (vuosi, kuukausi)
+ULOTTUVUUDET: tuple[str, ...] = ("kohde", "asiakas", "kuukausi")
+
+# Raporttirivien lukuosat; nimet ja sähköpostit (joissa voi olla pisteitä) liitetään erikseen
+KOOSTERIVI = Lukupohja("{} varausta ({} vahvistettua), {} h, {:.2f} €")
+KAYTTOASTE = Lukupohja(", käyttöaste {:.1f} %")
+
+
+def _kuukauden_paivat(vuosi: int, kuukausi: int) -> int:
+    """Kuukauden päivien määrä (kuten calendar.monthrange, joka toisi mukanaan locale- ja re-moduulit)."""
+    if kuukausi == 12:
+        return 31
+    return (date(vuosi, kuukausi + 1, 1) - date(vuosi, kuukausi, 1)).days
+
+
+class Kooste:
+    """
+    Yhden ryhmän kertyneet tiedot.
+
+    Attribuutit:
+        lkm (int): Varausten lukumäärä.
+        vahvistetut (int): Vahvistettujen varausten lukumäärä.
+        tunnit (int): Vahvistettujen varausten tunnit.
+        tulot_senttia (int): Vahvistettujen varausten tulot sentteinä.
+    """
+
+    def __init__(self) -> None:
+        self.lkm: int = 0
+        self.vahvistetut: int = 0
+        self.tunnit: int = 0
+        self.tulot_senttia: int = 0
+
+    def paivita(self, varaus: dict, kerroin: int = 1) -> None:
+        """Lisää (kerroin 1) tai poistaa (kerroin -1) yhden varauksen koosteesta."""
+        self.lkm += kerroin
+        if varaus["vahvistettu"]:
+            self.vahvistetut += kerroin
+            self.tunnit += kerroin * varaus["kesto"]
+            self.tulot_senttia += kerroin * varaus["kesto"] * round(varaus["tuntihinta"] * 100)
+
+    def yhdista(self, toinen: "Kooste") -> None:
+        """Yhdistää toisen ryhmän koosteen tähän koosteeseen."""
+        self.lkm += toinen.lkm
+        self.vahvistetut += toinen.vahvistetut
+        self.tunnit += toinen.tunnit
+        self.tulot_senttia += toinen.tulot_senttia
+
+    @property
+    def tulot(self) -> float:
+        """Vahvistettujen varausten tulot euroina."""
+        return self.tulot_senttia / 100
+
+
+class Varauskoosteet:
+    """
+    Varausten koosteet kaikissa ULOTTUVUUDET-ulottuvuuksissa.
+
+    Parametrit:
+        kohteet, asiakkaat (Koodisto | None): Varauslistan koodistot. Kun ne annetaan,
+            varausten valmiit kohdekoodi- ja asiakaskoodi-kentät käytetään sellaisinaan;
+            muuten (esim. hajautetun koostamisen rivit) koodit annetaan omista koodistoista.
+
+    Attribuutit:
+        ryhmat (dict[str, dict]): Ulottuvuus -> ryhmäavain -> Kooste (ensiesiintymisjärjestyksessä).
+        kohteet (Koodisto): Kohdekoodi -> varauskohde.
+        asiakkaat (Koodisto): Asiakaskoodi -> sähköposti.
+        nimet (dict[int, str]): Asiakaskoodi -> asiakkaan ensimmäisenä nähty nimi.
+        ensimmainen (date | None): Aikaisin varauspäivä (käyttöasteen jakso).
+        viimeinen (date | None): Myöhäisin varauspäivä.
+    """
+
+    def __init__(self, kohteet: Koodisto | None = None, asiakkaat: Koodisto | None = None) -> None:
+        self.ryhmat: dict[str, dict] = {ulottuvuus: {} for ulottuvuus in ULOTTUVUUDET}
+        self._valmiit_koodit = kohteet is not None and asiakkaat is not None
+        self.kohteet: Koodisto = kohteet if self._valmiit_koodit else Koodisto()
+        self.asiakkaat: Koodisto = asiakkaat if self._valmiit_koodit else Koodisto()
+        self.nimet: dict[int, str] = {}
+        self.ensimmainen: date | None = None
+        self.viimeinen: date | None = None
+
+    def _avaimet(self, varaus: dict) -> tuple:
+        """Varauksen ryhmäavaimet ULOTTUVUUDET-järjestyksessä."""
+        if self._valmiit_koodit:
+            kohdekoodi, asiakaskoodi = varaus["kohdekoodi"], varaus["asiakaskoodi"]
+        else:
+            kohdekoodi = self.kohteet.koodaa(varaus["varauskohde"])
+            asiakaskoodi = self.asiakkaat.koodaa(varaus["sahkoposti"])
+        if asiakaskoodi not in self.nimet:
+            self.nimet[asiakaskoodi] = varaus["nimi"]
+        paiva = varaus["paivamaara"]
+        return kohdekoodi, asiakaskoodi, (paiva.year, paiva.month)
+
+    def paivita(self, varaus: dict, kerroin: int = 1) -> None:
+        """Lisää (tai kertoimella -1 poistaa) yhden varauksen kaikkiin ulottuvuuksiin."""
+        for ulottuvuus, avain in zip(ULOTTUVUUDET, self._avaimet(varaus)):
+            ryhmat = self.ryhmat[ulottuvuus]
+            kooste = ryhmat.get(avain)
+            if kooste is None:
+                kooste = ryhmat[avain] = Kooste()
+            kooste.paivita(varaus, kerroin)
+        paiva = varaus["paivamaara"]
+        if self.ensimmainen is None or paiva < self.ensimmainen:
+            self.ensimmainen = paiva
+        if self.viimeinen is None or paiva > self.viimeinen:
+            self.viimeinen = paiva
+
+    def lisaa(self, varaus: dict) -> None:
+        """
+        Inkrementaalinen polku: lisää uuden varauksen koosteisiin.
+
+        Varauslistan koosteisiin (koosta_varaukset(lista)) lisättävä varaus lisätään
+        ensin listaan (Varauslista.lisaa), joka antaa sille kohde- ja asiakaskoodin.
+        """
+        self.paivita(varaus)
+
+    def vahvista(self, varaus: dict) -> dict:
+        """
+        Inkrementaalinen polku: merkitsee jo koostetun varauksen vahvistetuksi.
+
+        Varaus poistetaan koosteista vahvistamattomana ja lisätään takaisin
+        vahvistettuna, joten vain sen omat ryhmät päivittyvät.
+
+        Palauttaa:
+            dict: Vahvistettu varaus (kopio; annettua sanakirjaa ei muuteta).
+                Jo vahvistettu varaus palautetaan sellaisenaan.
+        """
+        if varaus["vahvistettu"]:
+            return varaus
+        self.paivita(varaus, -1)
+        vahvistettu = {**varaus, "vahvistettu": True}
+        self.paivita(vahvistettu)
+        return vahvistettu
+
+    def yhdista(self, toinen: "Varauskoosteet") -> None:
+        """
+        Yhdistää toisen (esim. toisen tiedostopalan) osakoosteet tähän koosteeseen.
+
+        Toisen koosteen kohde- ja asiakaskoodit koodataan uudelleen tämän koosteen koodistoihin.
+        """
+        # Toisen koodi -> tämän koodi (listaindeksi)
+        koodit = {
+            "kohde": [self.kohteet.koodaa(arvo) for arvo in toinen.kohteet.arvot],
+            "asiakas": [self.asiakkaat.koodaa(arvo) for arvo in toinen.asiakkaat.arvot],
+        }
+        for koodi, nimi in toinen.nimet.items():
+            self.nimet.setdefault(koodit["asiakas"][koodi], nimi)
+        for ulottuvuus, toisen_ryhmat in toinen.ryhmat.items():
+            ryhmat = self.ryhmat[ulottuvuus]
+            uudet = koodit.get(ulottuvuus)
+            for avain, toinen_kooste in toisen_ryhmat.items():
+                if uudet is not None:
+                    avain = uudet[avain]
+                kooste = ryhmat.get(avain)
+                if kooste is None:
+                    kooste = ryhmat[avain] = Kooste()
+                kooste.yhdista(toinen_kooste)
+        if toinen.ensimmainen is not None:
+            if self.ensimmainen is None or toinen.ensimmainen < self.ensimmainen:
+                self.ensimmainen = toinen.ensimmainen
+            if self.viimeinen is None or toinen.viimeinen > self.viimeinen:
+                self.viimeinen = toinen.viimeinen
+
+    def viimeistele(self, ulottuvuus: str) -> list[tuple[object, Kooste, float | None]]:
+        """
+        Palauttaa ulottuvuuden ryhmät muodossa (avain, kooste, käyttöaste %);
+        kuukaudet aikajärjestyksessä, muut ensiesiintymisjärjestyksessä.
+
+        Käyttöaste:
+            - kohde: vahvistetut tunnit / (jakson päivät * AUKIOLOTUNNIT), jossa jakso
+              kattaa kokonaiset kuukaudet ensimmäisestä viimeiseen varauspäivään.
+            - kuukausi: vahvistetut tunnit / (kuukauden päivät * AUKIOLOTUNNIT * kohteiden lkm).
+            - asiakas: None (asiakkaalla ei ole omaa kapasiteettia).
+
+        Poikkeukset:
+            ValueError: jos ulottuvuus ei ole tuettu.
+        """
+        if ulottuvuus not in self.ryhmat:
+            raise ValueError(f"Tuntematon ulottuvuus: {ulottuvuus} (sallitut: {', '.join(ULOTTUVUUDET)})")
+        ryhmat = self.ryhmat[ulottuvuus]
+        if ulottuvuus == "kohde" and self.ensimmainen is not None:
+            alku = self.ensimmainen.replace(day=1)
+            loppu = self.viimeinen.replace(day=_kuukauden_paivat(self.viimeinen.year, self.viimeinen.month))
+            kapasiteetti = ((loppu - alku).days + 1) * AUKIOLOTUNNIT
+            return [(avain, kooste, 100 * kooste.tunnit / kapasiteetti) for avain, kooste in ryhmat.items()]
+        if ulottuvuus == "kuukausi":
+            kohteita = max(1, len(self.ryhmat["kohde"]))
+            return [
+                (avain, kooste, 100 * kooste.tunnit / (_kuukauden_paivat(*avain) * AUKIOLOTUNNIT * kohteita))
+                for avain, kooste in sorted(ryhmat.items())
+            ]
+        return [(avain, kooste, None) for avain, kooste in ryhmat.items()]
+
+
+def koosta_varaukset(varaukset: Iterable[dict]) -> Varauskoosteet:
+    """
+    Laskee varausten koosteet yhdellä läpikäynnillä.
+
+    Varauslistan (koodistot kohteet ja asiakkaat) valmiita koodeja käytetään ryhmäavaimina.
+    """
+    koosteet = Varauskoosteet(getattr(varaukset, "kohteet", None), getattr(varaukset, "asiakkaat", None))
+    for varaus in varaukset:
+        koosteet.paivita(varaus)
+    return koosteet
+
+
+def koosta_paloittain(palat: Iterable[Iterable[dict]]) -> Varauskoosteet:
+    """
+    Laskee jokaiselle palalle oman osakoosteen ja yhdistää ne.
+
+    Palat voivat olla esim. suuren tiedoston rivilohkoja; tulos on sama kuin
+    koosta_varaukset() kaikille riveille kerralla.
+    """
+    koosteet = Varauskoosteet()
+    for pala in palat:
+        koosteet.yhdista(koosta_varaukset(pala))
+    return koosteet
+
+
+def ryhman_nimi(koosteet: Varauskoosteet, ulottuvuus: str, avain) -> str:
+    """Purkaa ryhmäavaimen raportin nimeksi (kohde, "nimi <sähköposti>" tai kk/vvvv)."""
+    if ulottuvuus == "kohde":
+        return koosteet.kohteet[avain]
+    if ulottuvuus == "asiakas":
+        return f"{koosteet.nimet[avain]} <{koosteet.asiakkaat[avain]}>"
+    return f"{avain[1]:02d}/{avain[0]}"
+
+
+def koosterivit(koosteet: Varauskoosteet, ulottuvuus: str) -> Iterator[str]:
+    """
+    Tuottaa ulottuvuuden raporttirivit (ilman rivinvaihtoa) viimeistele()-järjestyksessä.
+    """
+    for avain, kooste, kayttoaste in koosteet.viimeistele(ulottuvuus):
+        rivi = f"- {ryhman_nimi(koosteet, ulottuvuus, avain)}: " + KOOSTERIVI(kooste.lkm, kooste.vahvistetut, kooste.tunnit, kooste.tulot)
+        if kayttoaste is not None:
+            rivi += KAYTTOASTE(kayttoaste)
+        yield rivi
@@ -0,0 +1,142 @@
+# Copyright (c) 2025 Jonna Kangas
+
+# Ohjelmoinnin perusteet -opintojakso
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# See <https://www.gnu.org/licenses/>.
+
+"""
+Hajautetun koostamisen (yhteiset.hajautus) vertailu peräkkäiseen polkuun.
+
+Synteettiset aineistot (yhteiset.synteettinen) koostetaan pienillä paloilla,
+jolloin palan rajat osuvat keskelle rivejä ja tiedostoja, ja tuloksen pitää
+olla sama kuin raporttien omalla peräkkäisellä lukupolulla sekä yhdellä
+että usealla prosessilla.
+
+Ajo:
+    python -m unittest discover -s tests
+
+Muistia suurempi aineisto (valinnainen suorituskykyvertailu):
+    HAJAUTUS_KOKO=6G [HAJAUTUS_HAKEMISTO=/iso/levy] python -m unittest tests.test_hajautus
+"""
+
+import importlib
+import os
+import sys
+import tempfile
+import unittest
+from time import perf_counter
+
+JUURI = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+# Raporttien moduulit tuovat omat apumoduulinsa omasta hakemistostaan
+for hakemisto in (JUURI, os.path.join(JUURI, "Viikko5", "B"), os.path.join(JUURI, "Viikko6"),
+                  os.path.join(JUURI, "Viikko7")):
+    if hakemisto not in sys.path:
+        sys.path.insert(0, hakemisto)
+
+from yhteiset import synteettinen
+from yhteiset.hajautus import koosta
+
+viikko5 = importlib.import_module("viikkojen41-43raportti")
+import lue_varaukset as viikko7
+import viikko6tehtava as viikko6
+from tilastot import Energiakooste
+from varauskoosteet import Varauskoosteet, koosta_varaukset, ryhman_nimi
+from viikkovertailu import Paivataulu
+
+# Pieni pala: kymmeniä paloja tiedostoa kohden
+PALAN_KOKO = 4096
+PROSESSIT = (1, 3)
+TIEDOSTON_KOKO = 150 * 1024
+
+
+def varauskoosteiden_tulos(koosteet: Varauskoosteet) -> dict:
+    """Vertailtava muoto: ulottuvuus -> [(nimi, lkm, vahvistetut, tunnit, sentit, käyttöaste)]."""
+    return {
+        ulottuvuus: [
+            (ryhman_nimi(koosteet, ulottuvuus, avain), kooste.lkm, kooste.vahvistetut, kooste.tunnit,
+             kooste.tulot_senttia, kayttoaste)
+            for avain, kooste, kayttoaste in koosteet.viimeistele(ulottuvuus)
+        ]
+        for ulottuvuus in koosteet.ryhmat
+    }
+
+
+class HajautettuKoostaminen(unittest.TestCase):
+    """Hajautettu koostaminen antaa saman tuloksen kuin peräkkäinen lukupolku."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._hakemisto = tempfile.TemporaryDirectory()
+        polku = cls._hakemisto.name
+        cls.energia = [os.path.join(polku, "energia.csv")]
+        cls.vaiheet = [os.path.join(polku, f"vaiheet{i}.csv") for i in (1, 2)]
+        cls.varaukset = [os.path.join(polku, "varaukset.txt")]
+        synteettinen.kirjoita("energia", cls.energia[0], TIEDOSTON_KOKO)
+        for siemen, tiedosto in enumerate(cls.vaiheet, 1):
+            synteettinen.kirjoita("vaiheet", tiedosto, TIEDOSTON_KOKO, siemen)
+        synteettinen.kirjoita("varaukset", cls.varaukset[0], TIEDOSTON_KOKO)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls._hakemisto.cleanup()
+
+    def test_energiakooste(self) -> None:
+        perakkain = Energiakooste()
+        for tiedosto in self.energia:
+            for rivi in viikko6.lue_data(tiedosto).rivit():
+                perakkain.paivita(rivi)
+        odotettu = perakkain.viimeistele()
+        for prosessit in PROSESSIT:
+            with self.subTest(prosessit=prosessit):
+                tulos = koosta(Energiakooste, viikko6.muunna_tiedot, ";", self.energia, prosessit, PALAN_KOKO)
+                self.assertEqual(tulos.viimeistele(), odotettu)
+
+    def test_paivataulu(self) -> None:
+        perakkain = Paivataulu()
+        for tiedosto in self.vaiheet:
+            perakkain.lisaa_matriisi(viikko5.lue_data(tiedosto))
+        for prosessit in PROSESSIT:
+            with self.subTest(prosessit=prosessit):
+                tulos = koosta(Paivataulu, viikko5.muunna_tiedot, ";", self.vaiheet, prosessit, PALAN_KOKO)
+                self.assertEqual(tulos.paivat, perakkain.paivat)
+                self.assertEqual(tulos.rivit, perakkain.rivit)
+                self.assertEqual(tulos.viikot(), perakkain.viikot())
+
+    def test_varauskoosteet(self) -> None:
+        odotettu = varauskoosteiden_tulos(koosta_varaukset(viikko7.hae_varaukset(self.varaukset[0])))
+        for prosessit in PROSESSIT:
+            with self.subTest(prosessit=prosessit):
+                tulos = koosta(Varauskoosteet, viikko7.muunna_varaustiedot, "|", self.varaukset, prosessit,
+                               PALAN_KOKO, otsikkorivit=0)
+                self.assertEqual(varauskoosteiden_tulos(tulos), odotettu)
+
+
+@unittest.skipUnless(os.environ.get("HAJAUTUS_KOKO"), "suorituskykyvertailu: aseta HAJAUTUS_KOKO (esim. 6G)")
+class MuistiaSuurempiAineisto(unittest.TestCase):
+    """Valinnainen suorituskykyvertailu muistia suuremmalla energia-aineistolla."""
+
+    def test_prosessien_maara_ei_muuta_tulosta(self) -> None:
+        import resource
+
+        koko = synteettinen.lue_koko(os.environ["HAJAUTUS_KOKO"])
+        prosessit = os.cpu_count() or 1
+        with tempfile.TemporaryDirectory(dir=os.environ.get("HAJAUTUS_HAKEMISTO")) as hakemisto:
+            tiedostot = [os.path.join(hakemisto, "energia.csv")]
+            synteettinen.kirjoita("energia", tiedostot[0], koko)
+            tulokset = []
+            for n in sorted({1, prosessit}):
+                alku = perf_counter()
+                tulokset.append(koosta(Energiakooste, viikko6.muunna_tiedot, ";", tiedostot, n).viimeistele())
+                print(f"\n{koko / 1024 ** 3:.1f} GiB, {n} prosessia: {perf_counter() - alku:.1f} s".replace(".", ","))
+        huippu = max(resource.getrusage(lahde).ru_maxrss for lahde in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN))
+        print(f"Muistihuippu {huippu / 1024:.0f} MB".replace(".", ","))
+        self.assertEqual(tulokset[0], tulokset[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+# Copyright (c) 2025 Jonna Kangas
+
+# Ohjelmoinnin perusteet -opintojakso
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# See <https://www.gnu.org/licenses/>.
+
+"""
+ISO-viikon tunnistus ja viikon maanantai vuodenvaihteen yli (yhteiset/isoviikot.py).
+
+Vuoden 2020 viikko 53 alkaa maanantaina 28.12.2020 ja päättyy sunnuntaina
+3.1.2021; 30.12.2024 on jo vuoden 2025 viikon 1 maanantai.
+
+Ajo:
+    python -m unittest discover -s tests
+"""
+
+import os
+import random
+import sys
+import unittest
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+
+JUURI = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+if JUURI not in sys.path:
+    sys.path.insert(0, JUURI)
+
+from yhteiset.isoviikot import Viikkotunnistin, maanantai
+
+
+def tunnista(aikaleimat) -> tuple[int, int]:
+    tunnistin = Viikkotunnistin()
+    for aika in aikaleimat:
+        tunnistin.paivita(aika)
+    return tunnistin.viikko()
+
+
+def tunnit(alku: datetime, loppu: datetime) -> list[datetime]:
+    """Tuntiaikaleimat alku ... loppu (molemmat mukana)."""
+    return [alku + timedelta(hours=tunti) for tunti in range(int((loppu - alku) / timedelta(hours=1)) + 1)]
+
+
+class Vuodenvaihde(unittest.TestCase):
+
+    def test_viikko_53(self) -> None:
+        self.assertEqual(tunnista([datetime(2020, 12, 31, 12)]), (2020, 53))
+        # Koko viikko ja seuraavan maanantain keskiyön rivi lopussa
+        viikko = tunnit(datetime(2020, 12, 28), datetime(2021, 1, 4))
+        self.assertEqual(tunnista(viikko), (2020, 53))
+        self.assertEqual(maanantai((2020, 53)), date(2020, 12, 28))
+        self.assertEqual(tunnista([datetime(2021, 1, 3, 23, 59)]), (2020, 53))
+        self.assertEqual(tunnista([datetime(2021, 1, 4)]), (2021, 1))
+
+    def test_viikko_1_alkaa_edellisena_vuonna(self) -> None:
+        self.assertEqual(tunnista(tunnit(datetime(2024, 12, 30), datetime(2025, 1, 5, 23))), (2025, 1))
+        self.assertEqual(maanantai((2025, 1)), date(2024, 12, 30))
+        self.assertEqual(tunnista([datetime(2024, 12, 29, 23)]), (2024, 52))
+
+    def test_aikavyohyketietoinen(self) -> None:
+        # Rajat lasketaan aikaleiman omassa aikavyöhykkeessä
+        vyohyke = timezone(timedelta(hours=2))
+        self.assertEqual(tunnista([datetime(2021, 1, 3, 23, tzinfo=vyohyke)]), (2020, 53))
+        self.assertEqual(tunnista([datetime(2021, 1, 3, 23, tzinfo=vyohyke),
+                                   datetime(2021, 1, 4, 0, tzinfo=vyohyke),
+                                   datetime(2021, 1, 4, 1, tzinfo=vyohyke)]), (2021, 1))
+
+    def test_vastaa_isocalendaria(self) -> None:
+        satunnainen = random.Random(8)
+        for alkuvuosi in (2015, 2020, 2026):
+            with self.subTest(vuosi=alkuvuosi):
+                alku = datetime(alkuvuosi, 12, 20)
+                aikaleimat = sorted(alku + timedelta(minutes=satunnainen.randrange(30 * 24 * 60))
+                                    for _ in range(2000))
+                tunnistin = Viikkotunnistin()
+                for aika in aikaleimat:
+                    tunnistin.paivita(aika)
+                tunnistin.viikko()
+                odotetut = Counter(aika.isocalendar()[:2] for aika in aikaleimat)
+                self.assertEqual(tunnistin.viikot, dict(odotetut))
+                for viikko in odotetut:
+                    self.assertEqual(maanantai(viikko).isocalendar()[:3], (*viikko, 1))
+
+    def test_tasatilanne_ja_tyhja(self) -> None:
+        # Yhtä monta riviä kummallekin viikolle: aikaisempi voittaa
+        self.assertEqual(tunnista([datetime(2021, 1, 3), datetime(2021, 1, 4)]), (2020, 53))
+        with self.assertRaises(ValueError):
+            Viikkotunnistin().viikko()
+
+
+if __name__ == "__main__":
+    unittest.main()
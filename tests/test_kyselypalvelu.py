@@ -0,0 +1,101 @@
+# Copyright (c) 2025 Jonna Kangas
+
+# Ohjelmoinnin perusteet -opintojakso
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# See <https://www.gnu.org/licenses/>.
+
+"""
+Kyselypalvelu (Palvelu/kyselypalvelu.py) paikallisella palvelimella.
+
+Palvelin käynnistetään osoitteeseen 127.0.0.1 käyttöjärjestelmän valitsemaan
+porttiin (0) omaan tapahtumasilmukkaansa, ja sille lähetetään HTTP-pyyntöjä.
+
+Ajo:
+    python -m unittest discover -s tests
+"""
+
+import asyncio
+import http.client
+import json
+import os
+import sys
+import threading
+import unittest
+
+JUURI = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+if os.path.join(JUURI, "Palvelu") not in sys.path:
+    sys.path.insert(0, os.path.join(JUURI, "Palvelu"))
+
+from kyselypalvelu import ENERGIATIEDOSTO, VARAUSTIEDOSTO, Kyselypalvelu, rakenna_aineisto
+from viikko6tehtava import lataa_tietokanta, luo_vuosiraportti
+from yhteiset.uudelleenlataus import Latausvahti
+
+
+class Palvelin(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        vahti = Latausvahti([ENERGIATIEDOSTO, VARAUSTIEDOSTO], rakenna_aineisto)
+        vahti.lataa()
+        cls.palvelu = Kyselypalvelu(vahti)
+        cls.silmukka = asyncio.new_event_loop()
+        cls.palvelin = cls.silmukka.run_until_complete(asyncio.start_server(cls.palvelu.yhteys, "127.0.0.1", 0))
+        cls.portti = cls.palvelin.sockets[0].getsockname()[1]
+        cls.saie = threading.Thread(target=cls.silmukka.run_forever, daemon=True)
+        cls.saie.start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.silmukka.call_soon_threadsafe(cls.silmukka.stop)
+        cls.saie.join()
+        cls.palvelin.close()
+        cls.silmukka.run_until_complete(cls.palvelin.wait_closed())
+        cls.silmukka.close()
+        cls.palvelu.allas.shutdown()
+
+    def hae(self, *kohteet: str) -> list[tuple[int, dict]]:
+        """Lähettää GET-pyynnöt samassa (pysyvässä) yhteydessä; palauttaa [(tila, JSON-runko)]."""
+        yhteys = http.client.HTTPConnection("127.0.0.1", self.portti, timeout=30)
+        try:
+            vastaukset = []
+            for kohde in kohteet:
+                yhteys.request("GET", kohde)
+                vastaus = yhteys.getresponse()
+                vastaukset.append((vastaus.status, json.loads(vastaus.read())))
+            return vastaukset
+        finally:
+            yhteys.close()
+
+    def test_vuosiraportti_vastaa_raporttiohjelmaa(self) -> None:
+        [(tila, runko)] = self.hae("/energia/vuosi")
+        self.assertEqual(tila, 200)
+        self.assertEqual(runko["raportti"], luo_vuosiraportti(lataa_tietokanta(ENERGIATIEDOSTO, None)))
+
+    def test_virheelliset_parametrit(self) -> None:
+        for kohde in ("/energia/aikavali?alku=01.03.2025", "/energia/kuukausi?kuukausi=13"):
+            with self.subTest(kohde=kohde):
+                [(tila, runko)] = self.hae(kohde)
+                self.assertEqual(tila, 400)
+                self.assertIn("virhe", runko)
+
+    def test_tuntematon_reitti(self) -> None:
+        [(tila, _)] = self.hae("/ei/ole")
+        self.assertEqual(tila, 404)
+
+    def test_toistettu_pyynto_on_valimuistiosuma(self) -> None:
+        # Aikaväliä ei lasketa valmiiksi, joten ensimmäinen pyyntö lasketaan ja toinen tulee välimuistista
+        kohde = "/energia/aikavali?alku=03.03.2025&loppu=09.03.2025"
+        (tila1, runko1), (tila2, runko2), (_, mittaukset) = self.hae(kohde, kohde, "/metrics")
+        self.assertEqual((tila1, tila2), (200, 200))
+        self.assertEqual(runko1, runko2)
+        reitti = mittaukset["reitit"]["/energia/aikavali"]
+        self.assertEqual((reitti["pyynnot"], reitti["valimuistiosumat"]), (2, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+# Copyright (c) 2025 Jonna Kangas
+
+# Ohjelmoinnin perusteet -opintojakso
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# See <https://www.gnu.org/licenses/>.
+
+"""
+Lämpötilariippuvuuden regressiosummat (Viikko6/lampotila.py).
+
+Sovitus tarkistetaan käsin lasketulla pienimmän neliösumman esimerkillä, ja
+osa-aineistojen yhdistämisen pitää antaa sama tulos kuin yhden läpikäynnin.
+
+Ajo:
+    python -m unittest discover -s tests
+"""
+
+import os
+import random
+import sys
+import unittest
+from datetime import datetime, timedelta
+from math import sqrt
+
+JUURI = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+for hakemisto in (JUURI, os.path.join(JUURI, "Viikko6")):
+    if hakemisto not in sys.path:
+        sys.path.insert(0, hakemisto)
+
+from yhteiset.aikasarja import Aikasarja
+
+from lampotila import Lampotilaanalyysi, Regressio
+
+SUMMAT = ("n", "sx", "sy", "sxy", "sxx", "syy")
+
+
+def tuntirivit(satunnainen: random.Random, paivia: int) -> list[tuple[datetime, float, float, float]]:
+    """Tuntirivit (aika, kulutus, tuotanto, lämpötila), joissa kulutus kasvaa pakkasella."""
+    alku = datetime(2025, 1, 20)
+    rivit = []
+    for tunti in range(24 * paivia):
+        lampotila = satunnainen.uniform(-25, 25)
+        kulutus = 0.4 + 0.05 * max(0.0, 17 - lampotila) + satunnainen.uniform(0, 0.3)
+        rivit.append((alku + timedelta(hours=tunti), kulutus, 0.0, lampotila))
+    return rivit
+
+
+class Sovitus(unittest.TestCase):
+
+    def assertSummatYhtasuuret(self, a: Regressio, b: Regressio) -> None:
+        for nimi in SUMMAT:
+            self.assertAlmostEqual(getattr(a, nimi), getattr(b, nimi), places=6, msg=nimi)
+
+    def test_kasin_laskettu_sovitus(self) -> None:
+        # x̄ = 1,5, ȳ = 5, Σ(x-x̄)² = 5, Σ(x-x̄)(y-ȳ) = 14, Σ(y-ȳ)² = 40
+        # => b = 14 / 5 = 2,8, a = 5 - 2,8 · 1,5 = 0,8, r = 14 / √(5 · 40)
+        # Jäännökset 0,2, -0,6, 0,6, -0,2: keskiarvo 0, keskihajonta √0,2
+        regressio = Regressio()
+        for x, y in ((0, 1), (1, 3), (2, 7), (3, 9)):
+            regressio.paivita(x, y)
+        a, b = regressio.sovitus()
+        self.assertAlmostEqual(a, 0.8)
+        self.assertAlmostEqual(b, 2.8)
+        self.assertAlmostEqual(regressio.korrelaatio(), 14 / sqrt(200))
+        keskiarvo, hajonta = regressio.jaannokset(a, b)
+        self.assertAlmostEqual(keskiarvo, 0.0)
+        self.assertAlmostEqual(hajonta, sqrt(0.2))
+
+    def test_vakio_x_ei_sovitusta(self) -> None:
+        regressio = Regressio()
+        regressio.lisaa([0.0, 0.0, 0.0], [1.0, 2.0, 3.0])
+        self.assertIsNone(regressio.sovitus())
+        self.assertIsNone(regressio.korrelaatio())
+
+    def test_osien_yhdistaminen_vastaa_yhta_lapikayntia(self) -> None:
+        satunnainen = random.Random(3)
+        pisteet = [(satunnainen.uniform(0, 40), satunnainen.uniform(0, 50)) for _ in range(300)]
+        kokonainen = Regressio()
+        for x, y in pisteet:
+            kokonainen.paivita(x, y)
+        alku, loppu = Regressio(), Regressio()
+        alku.lisaa([x for x, _ in pisteet[:120]], [y for _, y in pisteet[:120]])
+        for x, y in pisteet[120:]:
+            loppu.paivita(x, y)
+        alku.yhdista(loppu)
+        self.assertSummatYhtasuuret(alku, kokonainen)
+        for odotettu, saatu in zip(kokonainen.sovitus(), alku.sovitus()):
+            self.assertAlmostEqual(saatu, odotettu)
+
+    def test_analyysin_osien_yhdistaminen(self) -> None:
+        # 40 vuorokautta tammi-helmikuun vaihteen yli; osat jaetaan vuorokauden rajalta
+        rivit = tuntirivit(random.Random(5), 40)
+        kokonainen = Lampotilaanalyysi()
+        for rivi in rivit:
+            kokonainen.paivita(rivi)
+        osat = [Lampotilaanalyysi(), Lampotilaanalyysi()]
+        for i, rivi in enumerate(rivit):
+            osat[i >= 24 * 13].paivita(rivi)
+        osat[0].yhdista(osat[1])
+        sarjasta = Lampotilaanalyysi()
+        sarja = Aikasarja(("kulutus", "tuotanto", "lampotila"))
+        for rivi in rivit:
+            sarja.lisaa(rivi)
+        sarjasta.lisaa_sarja(sarja)
+
+        kokonais = kokonainen.kokonais()
+        self.assertEqual(kokonais.n, 40)
+        for analyysi in (osat[0], sarjasta):
+            self.assertEqual(analyysi.kuukaudet.keys(), kokonainen.kuukaudet.keys())
+            for avain, regressio in kokonainen.kuukaudet.items():
+                with self.subTest(kuukausi=avain):
+                    self.assertSummatYhtasuuret(analyysi.kuukaudet[avain], regressio)
+                    self.assertAlmostEqual(analyysi.lampotilat[avain], kokonainen.lampotilat[avain])
+            self.assertSummatYhtasuuret(analyysi.kokonais(), kokonais)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+# Copyright (c) 2025 Jonna Kangas
+
+# Ohjelmoinnin perusteet -opintojakso
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# See <https://www.gnu.org/licenses/>.
+
+"""
+Liukuvat summat (yhteiset/liukuvat.py) suoraviivaista O(n·w)-laskentaa vasten.
+
+Vertailu laskee jokaiselle riville ikkunan (aika - leveys, aika] summat
+käymällä koko sarjan läpi. Sarjassa on yksittäisiä puuttuvia tunteja ja
+ikkunaa pidempi aukko.
+
+Ajo:
+    python -m unittest discover -s tests
+"""
+
+import os
+import random
+import sys
+import unittest
+from datetime import datetime, timedelta
+
+JUURI = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+if JUURI not in sys.path:
+    sys.path.insert(0, JUURI)
+
+from yhteiset.liukuvat import Liukuvat, LiukuvaIkkuna
+
+TUNTEJA = 24 * 40
+IKKUNAT = {"24 h": timedelta(hours=24), "7 d": timedelta(days=7)}
+
+
+def aukollinen_sarja(satunnainen: random.Random) -> list[tuple[datetime, tuple[int, float]]]:
+    """Tuntisarja (Wh kokonaislukuna, °C liukulukuna), josta puuttuu tunteja ja yksi 30 h:n jakso."""
+    alku = datetime(2025, 3, 1)
+    sarja = []
+    for tunti in range(TUNTEJA):
+        if 200 <= tunti < 230 or satunnainen.random() < 0.1:
+            continue
+        sarja.append((alku + timedelta(hours=tunti), (satunnainen.randrange(5000), satunnainen.uniform(-20, 20))))
+    return sarja
+
+
+def suoraan(sarja: list, leveys: timedelta) -> list[tuple[list, int]]:
+    """Jokaiselle riville ikkunan summat sarakkeittain ja rivien lkm läpikäymällä koko sarja."""
+    tulos = []
+    for aika, _ in sarja:
+        ikkunassa = [arvot for t, arvot in sarja if aika - leveys < t <= aika]
+        tulos.append(([sum(sarake) for sarake in zip(*ikkunassa)], len(ikkunassa)))
+    return tulos
+
+
+class LiukuvatSummat(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.sarja = aukollinen_sarja(random.Random(7))
+
+    def test_ikkuna_vastaa_suoraa_laskentaa(self) -> None:
+        for nimi, leveys in IKKUNAT.items():
+            with self.subTest(ikkuna=nimi):
+                ikkuna = LiukuvaIkkuna(leveys, 2)
+                for (aika, arvot), (odotetut, lkm) in zip(self.sarja, suoraan(self.sarja, leveys)):
+                    ikkuna.paivita(aika, arvot)
+                    kulutus, lampotila = ikkuna.summat()
+                    self.assertEqual((kulutus, len(ikkuna)), (odotetut[0], lkm), aika)
+                    self.assertAlmostEqual(lampotila, odotetut[1], places=9, msg=aika)
+                    self.assertEqual(ikkuna.taysi, self.sarja[0][0] <= aika - leveys, aika)
+
+    def test_huiput_vastaavat_suoraa_laskentaa(self) -> None:
+        liukuvat = Liukuvat(IKKUNAT, 2).lue(self.sarja)
+        for nimi, leveys in IKKUNAT.items():
+            with self.subTest(ikkuna=nimi):
+                taydet = [
+                    (summat[0], aika, lkm)
+                    for (aika, _), (summat, lkm) in zip(self.sarja, suoraan(self.sarja, leveys))
+                    if self.sarja[0][0] <= aika - leveys
+                ]
+                # Ensimmäinen suurin (myöhempi yhtä suuri summa ei korvaa huippua)
+                odotettu = max(taydet, key=lambda huippu: (huippu[0], -huippu[1].timestamp()))
+                self.assertEqual(liukuvat.huiput[nimi][0], odotettu)
+
+    def test_aukon_jalkeen_ikkunassa_vain_uudet_rivit(self) -> None:
+        ikkuna = LiukuvaIkkuna(timedelta(hours=24))
+        ikkuna.paivita(datetime(2025, 3, 1, 0), (5,))
+        ikkuna.paivita(datetime(2025, 3, 1, 1), (7,))
+        ikkuna.paivita(datetime(2025, 3, 2, 1), (11,))  # (1.3. 01:00, 2.3. 01:00]: 1.3. 01:00 putoaa pois
+        self.assertEqual((ikkuna.summat(), len(ikkuna), ikkuna.taysi), ([11], 1, True))
+        self.assertEqual(ikkuna.keskiarvot(), [11.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
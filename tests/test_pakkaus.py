@@ -0,0 +1,134 @@
+# Copyright (c) 2025 Jonna Kangas
+
+# Ohjelmoinnin perusteet -opintojakso
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# See <https://www.gnu.org/licenses/>.
+
+"""
+Pakattujen tiedostojen taustapurku (yhteiset/pakkaus.py).
+
+close() pysäyttää purkusäikeen kesken tiedoston, ja virheellinen tai
+katkennut gzip-data nostaa lukijalle OSErrorin eikä jää odottamaan.
+Lukeminen ajetaan apusäikeessä aikarajalla, jotta jumittuminen näkyy
+testin epäonnistumisena.
+
+Ajo:
+    python -m unittest discover -s tests
+"""
+
+import gzip
+import io
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+JUURI = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+if JUURI not in sys.path:
+    sys.path.insert(0, JUURI)
+
+from yhteiset.pakkaus import Taustapurku, avaa_luettavaksi
+
+AIKARAJA = 10.0
+RIVIT = b"".join(b"2025-03-01T%02d:00:00;1,%03d;0,250;-2,5\n" % (i % 24, i % 1000) for i in range(200_000))
+
+
+def aikarajalla(funktio):
+    """Ajaa funktion apusäikeessä; palauttaa (valmis, tulos tai poikkeus)."""
+    tulos = []
+
+    def aja():
+        try:
+            tulos.append(funktio())
+        except BaseException as virhe:
+            tulos.append(virhe)
+
+    saie = threading.Thread(target=aja, daemon=True)
+    saie.start()
+    saie.join(AIKARAJA)
+    return not saie.is_alive(), tulos[0] if tulos else None
+
+
+class Taustasaie(unittest.TestCase):
+
+    def setUp(self) -> None:
+        hakemisto = tempfile.TemporaryDirectory()
+        self.addCleanup(hakemisto.cleanup)
+        self.hakemisto = hakemisto.name
+        self.data = gzip.compress(RIVIT)
+
+    def tiedosto(self, nimi: str, sisalto: bytes) -> str:
+        polku = os.path.join(self.hakemisto, nimi)
+        with open(polku, "wb") as f:
+            f.write(sisalto)
+        return polku
+
+    def uudet_saikeet(self, ennen: set) -> set:
+        return {saie for saie in threading.enumerate() if saie not in ennen and saie.name == "purku"}
+
+    def test_sulkeminen_lopettaa_saikeen(self) -> None:
+        polku = self.tiedosto("data.csv.gz", self.data)
+        ennen = set(threading.enumerate())
+        f = avaa_luettavaksi(polku)
+        self.assertEqual(f.readline(), RIVIT.split(b"\n", 1)[0].decode() + "\n")
+        saikeet = self.uudet_saikeet(ennen)
+        self.assertEqual(len(saikeet), 1)
+        valmis, _ = aikarajalla(f.close)
+        self.assertTrue(valmis)
+        for saie in saikeet:
+            self.assertFalse(saie.is_alive())
+
+    def test_taysi_jono_ei_esta_sulkemista(self) -> None:
+        # Pienet lohkot ja lyhyt jono: säie on jumissa täyden jonon put()-kutsussa
+        ennen = set(threading.enumerate())
+        purku = Taustapurku(gzip.open(self.tiedosto("data.gz", self.data), "rb"), lohkon_koko=64, jonon_pituus=2)
+        saikeet = self.uudet_saikeet(ennen)
+        self.assertEqual(purku.read(10), RIVIT[:10])
+        valmis, _ = aikarajalla(purku.close)
+        self.assertTrue(valmis)
+        self.assertTrue(purku.closed)
+        for saie in saikeet:
+            self.assertFalse(saie.is_alive())
+
+    def test_virheellinen_data_nostaa_oserrorin(self) -> None:
+        keski = len(self.data) // 2
+        virheet = {
+            # Deflate-virta rikki keskeltä: kelvolliset lohkot luetaan ennen virhettä
+            "sisalto": self.data[:keski] + bytes(tavu ^ 0x55 for tavu in self.data[keski:keski + 64])
+                       + self.data[keski + 64:],
+            "katkennut": self.data[:keski],
+            "tarkiste": self.data[:-8] + b"\0\0\0\0" + self.data[-4:],
+        }
+        for nimi, sisalto in virheet.items():
+            with self.subTest(virhe=nimi):
+                polku = self.tiedosto(nimi + ".csv.gz", sisalto)
+                ennen = set(threading.enumerate())
+
+                def lue():
+                    with avaa_luettavaksi(polku) as f:
+                        for _ in f:
+                            pass
+
+                valmis, tulos = aikarajalla(lue)
+                self.assertTrue(valmis, "lukija jäi odottamaan")
+                self.assertIsInstance(tulos, OSError)
+                # threading.enumerate() listaa vain elossa olevat säikeet
+                self.assertEqual(self.uudet_saikeet(ennen), set())
+
+    def test_pakkaamaton_ei_kaynnista_saietta(self) -> None:
+        polku = self.tiedosto("data.csv", RIVIT[:1000])
+        ennen = set(threading.enumerate())
+        with avaa_luettavaksi(polku, "rb") as f:
+            self.assertIsInstance(f, io.BufferedReader)
+            self.assertEqual(self.uudet_saikeet(ennen), set())
+            self.assertEqual(f.read(), RIVIT[:1000])
+
+
+if __name__ == "__main__":
+    unittest.main()
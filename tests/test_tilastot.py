@@ -0,0 +1,98 @@
+# Copyright (c) 2025 Jonna Kangas
+
+# Ohjelmoinnin perusteet -opintojakso
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# See <https://www.gnu.org/licenses/>.
+
+"""
+Sarjatilaston prosenttipisteet (Viikko6/tilastot.py).
+
+Lähimmän sijan menetelmä: p:s prosenttipiste on järjestetyn aineiston
+ceil(p/100 · n):s arvo. Histogrammista lasketun tuloksen pitää olla sama
+kuin järjestetystä listasta luetun, koska data on 0,001 kWh:n tarkkuudella.
+
+Ajo:
+    python -m unittest discover -s tests
+"""
+
+import os
+import random
+import sys
+import unittest
+from datetime import datetime, timedelta
+from math import ceil
+
+JUURI = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+for hakemisto in (JUURI, os.path.join(JUURI, "Viikko6")):
+    if hakemisto not in sys.path:
+        sys.path.insert(0, hakemisto)
+
+from tilastot import Sarjatilasto
+
+ALKU = datetime(2025, 1, 1)
+
+
+def tilasto(arvot: list[float]) -> Sarjatilasto:
+    tulos = Sarjatilasto()
+    for tunti, arvo in enumerate(arvot):
+        tulos.paivita(ALKU + timedelta(hours=tunti), arvo)
+    return tulos
+
+
+def lahin_sija(arvot: list[float], p: float) -> float:
+    """Vertailu: lähimmän sijan prosenttipiste järjestetystä listasta."""
+    jarjestetty = sorted(arvot)
+    return jarjestetty[max(1, ceil(len(arvot) * p / 100)) - 1]
+
+
+class Prosenttipisteet(unittest.TestCase):
+
+    def test_tasavali(self) -> None:
+        # 0,01 ... 1,00 kWh sekoitettuna: p:s prosenttipiste on p / 100 kWh
+        arvot = [k / 100 for k in range(1, 101)]
+        random.Random(2).shuffle(arvot)
+        sarja = tilasto(arvot)
+        for p, odotettu in ((0, 0.01), (50, 0.50), (95, 0.95), (99, 0.99), (100, 1.00)):
+            with self.subTest(p=p):
+                self.assertAlmostEqual(sarja.prosenttipiste(p), odotettu, places=9)
+
+    def test_vino_jakauma(self) -> None:
+        # 900 × 0,2, 90 × 1,5 ja 10 × 4,0 kWh: sijat 500, 950 ja 990 osuvat kahteen alimpaan ryhmään
+        arvot = [0.2] * 900 + [1.5] * 90 + [4.0] * 10
+        random.Random(4).shuffle(arvot)
+        sarja = tilasto(arvot)
+        self.assertAlmostEqual(sarja.prosenttipiste(50), 0.2, places=9)
+        self.assertAlmostEqual(sarja.prosenttipiste(90), 0.2, places=9)
+        self.assertAlmostEqual(sarja.prosenttipiste(95), 1.5, places=9)
+        self.assertAlmostEqual(sarja.prosenttipiste(99), 1.5, places=9)
+        self.assertAlmostEqual(sarja.prosenttipiste(99.5), 4.0, places=9)
+
+    def test_vastaa_jarjestettya_listaa(self) -> None:
+        satunnainen = random.Random(6)
+        arvot = [round(satunnainen.lognormvariate(-0.5, 0.8), 3) for _ in range(2001)]
+        sarja = tilasto(arvot)
+        # Sama tilasto kahdesta sarakeviipaleesta yhdistettynä
+        osat = Sarjatilasto()
+        aikaleimat = [ALKU + timedelta(hours=tunti) for tunti in range(len(arvot))]
+        osat.lisaa_sarake(aikaleimat[:700], arvot[:700])
+        osat.lisaa_sarake(aikaleimat[700:], arvot[700:])
+        for p in (50, 95, 99):
+            with self.subTest(p=p):
+                self.assertAlmostEqual(sarja.prosenttipiste(p), lahin_sija(arvot, p), places=9)
+                self.assertEqual(osat.prosenttipiste(p), sarja.prosenttipiste(p))
+
+    def test_virheellinen_kysely(self) -> None:
+        with self.assertRaises(ValueError):
+            Sarjatilasto().prosenttipiste(50)
+        for p in (-1, 100.5):
+            with self.subTest(p=p), self.assertRaises(ValueError):
+                tilasto([1.0]).prosenttipiste(p)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+# Copyright (c) 2025 Jonna Kangas
+
+# Ohjelmoinnin perusteet -opintojakso
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# See <https://www.gnu.org/licenses/>.
+
+"""
+Komentoriviohjelmien tuontibudjetti (python -X importtime).
+
+Budjetti on kirjattu moduuleina eikä millisekunteina, koska ajat vaihtelevat
+koneittain: ohjelman moduulin tuonti ei saa tuoda KIELLETYT-moduuleja eikä
+lippujen tai valikon takana olevia ominaisuusmoduuleja. Ne tuodaan niitä
+käyttävissä funktioissa (kuten sqlite3 kantaa avattaessa). Rikkomuksen
+viestissä on tuonnin kokonaisaika ja raskaimmat moduulit.
+
+Ajo:
+    python -m unittest discover -s tests
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+
+JUURI = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+# Standardikirjaston moduulit, joita mikään ohjelma ei saa tuoda moduulin tasolla
+KIELLETYT: frozenset[str] = frozenset({
+    "typing", "re", "string", "calendar", "locale", "pathlib", "argparse", "inspect", "json",
+    "sqlite3", "tracemalloc", "threading", "queue", "concurrent.futures", "multiprocessing",
+})
+
+# (hakemisto, moduuli, lippujen tai valikon takana olevat omat moduulit)
+OHJELMAT: tuple[tuple[str, str, frozenset[str]], ...] = (
+    ("Viikko5/A", "viikko42raportti", frozenset({"yhteiset.hajautus"})),
+    ("Viikko5/B", "viikkojen41-43raportti", frozenset({"yhteiset.hajautus"})),
+    ("Viikko6", "viikko6tehtava", frozenset({
+        "yhteiset.hajautus", "yhteiset.liukuvat", "yhteiset.raporttikohde", "lampotila",
+    })),
+    ("Viikko7", "lue_varaukset", frozenset({"yhteiset.hajautus", "yhteiset.raporttikohde", "saatavuus"})),
+)
+
+
+def tuonnit(hakemisto: str, moduuli: str) -> dict[str, int]:
+    """Tuo moduulin uudessa tulkissa; palauttaa site-moduulin jälkeiset tuonnit -> kumulatiivinen aika (µs)."""
+    tulos = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"__import__({moduuli!r})"],
+        cwd=os.path.join(JUURI, hakemisto), capture_output=True, text=True, check=True,
+    )
+    ajat: dict[str, int] = {}
+    site_ohitettu = False
+    for rivi in tulos.stderr.splitlines():
+        if not rivi.startswith("import time:") or "|" not in rivi:
+            continue
+        _, kumulatiivinen, nimi = rivi.split("|")
+        nimi = nimi.strip()
+        if not site_ohitettu:
+            site_ohitettu = nimi == "site"
+            continue
+        if kumulatiivinen.strip().isdigit():
+            ajat[nimi] = int(kumulatiivinen)
+    return ajat
+
+
+def kuvaus(ajat: dict[str, int], moduuli: str) -> str:
+    raskaimmat = sorted(ajat.items(), key=lambda alkio: -alkio[1])[1:6]
+    return (f"{moduuli}: {ajat.get(moduuli, 0) / 1000:.1f} ms; raskaimmat: "
+            + ", ".join(f"{nimi} {aika / 1000:.1f} ms" for nimi, aika in raskaimmat))
+
+
+class Tuontibudjetti(unittest.TestCase):
+
+    def test_raporttiohjelmat(self) -> None:
+        for hakemisto, moduuli, ominaisuudet in OHJELMAT:
+            with self.subTest(moduuli=moduuli):
+                ajat = tuonnit(hakemisto, moduuli)
+                self.assertIn(moduuli, ajat)
+                ylitys = sorted((KIELLETYT | ominaisuudet) & ajat.keys())
+                self.assertEqual(ylitys, [], kuvaus(ajat, moduuli))
+
+    def test_tulosta_sana(self) -> None:
+        # tulosta_sana_v4.py:n docstring: site-moduulin jälkeen vain __future__
+        ajat = tuonnit("Viikko1/versio4_virallinen", "tulosta_sana_v4")
+        self.assertEqual(sorted(ajat.keys() - {"tulosta_sana_v4"}), ["__future__"], kuvaus(ajat, "tulosta_sana_v4"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+# Copyright (c) 2025 Jonna Kangas
+
+# Ohjelmoinnin perusteet -opintojakso
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# See <https://www.gnu.org/licenses/>.
+
+"""
+Kyselypalvelun datan uudelleenlataus tilannekuvina (yhteiset/uudelleenlataus.py).
+
+Palvelun aineisto rakennetaan väliaikaisista kopioista lähdetiedostoista, joita
+testit muuttavat: onnistunut lataus julkaisee uuden sukupolven tyhjällä
+välimuistilla, epäonnistunut jättää vanhan tilannekuvan käyttöön, ja kesken
+rakentamisen muuttunut tiedosto ladataan uudelleen seuraavalla tarkistuksella.
+
+Ajo:
+    python -m unittest discover -s tests
+"""
+
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+JUURI = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+if os.path.join(JUURI, "Palvelu") not in sys.path:
+    sys.path.insert(0, os.path.join(JUURI, "Palvelu"))
+
+from kyselypalvelu import ENERGIATIEDOSTO, VARAUSTIEDOSTO, Kyselypalvelu, rakenna_aineisto
+from yhteiset.uudelleenlataus import Latausvahti
+
+# Pyyntö, jota ei lasketa valmiiksi välimuistiin
+AIKAVALI = ("/energia/aikavali", {"alku": ["03.03.2025"], "loppu": ["09.03.2025"]})
+UUSI_VARAUS = "901|Tuutikki Talvi|tuutikki@esimerkki.fi|0501234567|2025-12-03|10:00|2|20.00|True|Kukkahuone|2025-10-01 08:00:00\n"
+
+
+class Uudelleenlataus(unittest.TestCase):
+
+    def setUp(self) -> None:
+        hakemisto = tempfile.TemporaryDirectory()
+        self.addCleanup(hakemisto.cleanup)
+        self.energia = shutil.copy(ENERGIATIEDOSTO, hakemisto.name)
+        self.varaukset = os.path.join(hakemisto.name, "varaukset.txt")
+        with open(VARAUSTIEDOSTO, encoding="utf-8") as f:
+            self.alkuperainen = f.read().rstrip("\n") + "\n"
+        self.kirjoita(self.alkuperainen)
+        self.rakennukset = 0
+        self.kesken_rakennusta = None  # kutsutaan rakentamisen aikana (tiedoston muutos)
+        self.vahti = Latausvahti([self.energia, self.varaukset], self.rakenna)
+        self.palvelu = Kyselypalvelu(self.vahti)
+        self.addCleanup(self.palvelu.allas.shutdown)
+        self.assertEqual(self.vahti.lataa().sukupolvi, 1)
+
+    def rakenna(self):
+        self.rakennukset += 1
+        aineisto = rakenna_aineisto(self.energia, self.varaukset)
+        if self.kesken_rakennusta is not None:
+            self.kesken_rakennusta()
+            self.kesken_rakennusta = None
+        return aineisto
+
+    def kirjoita(self, teksti: str) -> None:
+        with open(self.varaukset, "w", encoding="utf-8") as f:
+            f.write(teksti)
+
+    def kysy(self) -> tuple[dict, bool]:
+        return asyncio.run(self.palvelu.vastaus(*AIKAVALI))
+
+    def test_onnistunut_lataus_vaihtaa_tilannekuvan(self) -> None:
+        vanha = self.vahti.nykyinen
+        vastaus, osuma = self.kysy()
+        self.assertFalse(osuma)
+        self.assertTrue(self.kysy()[1])
+        self.kirjoita(self.alkuperainen + UUSI_VARAUS)
+        uusi = self.vahti.tarkista()
+        self.assertIs(self.vahti.nykyinen, uusi)
+        self.assertEqual(uusi.sukupolvi, 2)
+        self.assertEqual(len(uusi.data.varaukset), len(vanha.data.varaukset) + 1)
+        # Uudessa tilannekuvassa on vain valmiiksi lasketut raportit
+        self.assertNotIn(("/energia/aikavali", "03.03.2025", "09.03.2025"), uusi.data.valimuisti)
+        self.assertEqual(self.kysy(), (vastaus, False))
+        # Vanha tilannekuva ei muutu julkaisun jälkeen
+        self.assertIn(("/energia/aikavali", "03.03.2025", "09.03.2025"), vanha.data.valimuisti)
+        self.assertIsNone(self.vahti.tarkista())
+
+    def test_epaonnistunut_lataus_sailyttaa_vanhan(self) -> None:
+        vanha = self.vahti.nykyinen
+        self.kirjoita(self.alkuperainen + "rikki|rivi\n")
+        with self.assertRaises((ValueError, IndexError)):
+            self.vahti.tarkista()
+        self.assertIs(self.vahti.nykyinen, vanha)
+        tiedot = self.vahti.tiedot()
+        self.assertEqual((tiedot["sukupolvi"], tiedot["epaonnistuneet_lataukset"]), (1, 1))
+        self.assertIsNotNone(tiedot["viimeisin_virhe"])
+        self.assertEqual(self.kysy()[0]["raportti"][:10], "----------")
+        # Samaa rikkinäistä tiedostoa ei yritetä uudelleen, korjattu ladataan
+        rakennukset = self.rakennukset
+        self.assertIsNone(self.vahti.tarkista())
+        self.assertEqual(self.rakennukset, rakennukset)
+        self.kirjoita(self.alkuperainen + UUSI_VARAUS)
+        self.assertEqual(self.vahti.tarkista().sukupolvi, 2)
+
+    def test_kesken_rakennusta_muuttunut_yritetaan_uudelleen(self) -> None:
+        vanha = self.vahti.nykyinen
+        self.kirjoita(self.alkuperainen + UUSI_VARAUS)
+        self.kesken_rakennusta = lambda: self.kirjoita(self.alkuperainen + UUSI_VARAUS + UUSI_VARAUS)
+        self.assertIsNone(self.vahti.tarkista())
+        self.assertIs(self.vahti.nykyinen, vanha)
+        uusi = self.vahti.tarkista()
+        self.assertEqual(uusi.sukupolvi, 2)
+        self.assertEqual(len(uusi.data.varaukset), len(vanha.data.varaukset) + 2)
+        self.assertEqual(self.rakennukset, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
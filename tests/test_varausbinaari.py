@@ -0,0 +1,87 @@
+# Copyright (c) 2025 Jonna Kangas
+
+# Ohjelmoinnin perusteet -opintojakso
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# See <https://www.gnu.org/licenses/>.
+
+"""
+Varausten binäärimuoto (Viikko7/lue_varaukset.py, --binaari).
+
+Tekstitiedostosta luetut varaukset kirjoitetaan binääriksi ja luetaan takaisin
+samoiksi sanakirjoiksi; katkennut tiedosto ja väärä otsake hylätään
+ValueErrorilla.
+
+Ajo:
+    python -m unittest discover -s tests
+"""
+
+import os
+import random
+import sys
+import tempfile
+import unittest
+from itertools import islice
+
+JUURI = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+for hakemisto in (JUURI, os.path.join(JUURI, "Viikko7")):
+    if hakemisto not in sys.path:
+        sys.path.insert(0, hakemisto)
+
+from yhteiset.synteettinen import varausrivit
+
+from lue_varaukset import (BINAARIOTSAKE, hae_varaukset, hae_varaukset_binaarista,
+                           kirjoita_varaukset_binaarina)
+
+VARAUKSIA = 500
+
+
+class Binaarimuoto(unittest.TestCase):
+
+    def setUp(self) -> None:
+        hakemisto = tempfile.TemporaryDirectory()
+        self.addCleanup(hakemisto.cleanup)
+        self.teksti = os.path.join(hakemisto.name, "varaukset.txt")
+        self.binaari = os.path.join(hakemisto.name, "varaukset.bin")
+        with open(os.path.join(JUURI, "Viikko7", "varaukset.txt"), encoding="utf-8") as f:
+            rivit = [rivi.rstrip("\n") + "\n" for rivi in f if rivi.strip()]
+        rivit += islice(varausrivit(random.Random(1), 0), VARAUKSIA)
+        with open(self.teksti, "w", encoding="utf-8") as f:
+            f.writelines(rivit)
+        self.varaukset = hae_varaukset(self.teksti)
+        kirjoita_varaukset_binaarina(self.varaukset, self.binaari)
+
+    def katkaise(self, pituus: int) -> None:
+        with open(self.binaari, "r+b") as f:
+            f.truncate(pituus)
+
+    def test_edestakainen_muunnos(self) -> None:
+        luetut = hae_varaukset_binaarista(self.binaari)
+        self.assertEqual(len(luetut), len(self.varaukset))
+        self.assertEqual(list(luetut), list(self.varaukset))
+        self.assertEqual(luetut.kohteet.arvot, self.varaukset.kohteet.arvot)
+
+    def test_katkennut_tiedosto(self) -> None:
+        koko = os.path.getsize(self.binaari)
+        for pituus in (koko - 1, BINAARIOTSAKE.size + 3, BINAARIOTSAKE.size - 1, 0):
+            with self.subTest(pituus=pituus):
+                self.katkaise(pituus)
+                with self.assertRaises(ValueError):
+                    hae_varaukset_binaarista(self.binaari)
+
+    def test_vaara_otsake(self) -> None:
+        with open(self.binaari, "r+b") as f:
+            f.write(b"XXXX")
+        with self.assertRaises(ValueError):
+            hae_varaukset_binaarista(self.binaari)
+        # Tekstitiedosto ei kelpaa binääriksi
+        with self.assertRaises(ValueError):
+            hae_varaukset_binaarista(self.teksti)
+
+
+if __name__ == "__main__":
+    unittest.main()
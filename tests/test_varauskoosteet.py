@@ -0,0 +1,99 @@
+# Copyright (c) 2025 Jonna Kangas
+
+# Ohjelmoinnin perusteet -opintojakso
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# See <https://www.gnu.org/licenses/>.
+
+"""
+Varauskoosteiden inkrementaalinen polku (Viikko7/varauskoosteet.py).
+
+Koosteiden päivitys varaus kerrallaan (lisaa) ja vahvistus (vahvista) antaa
+saman tuloksen kuin uusi koosta_varaukset() lopullisille varauksille.
+Varauslista koodaa kopiot eikä muuta sille annettuja sanakirjoja.
+
+Ajo:
+    python -m unittest discover -s tests
+"""
+
+import os
+import random
+import sys
+import unittest
+from itertools import islice
+
+JUURI = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+for hakemisto in (JUURI, os.path.join(JUURI, "Viikko7")):
+    if hakemisto not in sys.path:
+        sys.path.insert(0, hakemisto)
+
+from yhteiset.synteettinen import varausrivit
+
+from lue_varaukset import Varauslista, muunna_varaustiedot
+from varauskoosteet import Varauskoosteet, koosta_varaukset, ryhman_nimi
+
+VARAUKSIA = 500
+
+
+def tulos(koosteet: Varauskoosteet) -> dict:
+    """Vertailtava muoto: ulottuvuus -> [(nimi, lkm, vahvistetut, tunnit, sentit, käyttöaste)]."""
+    return {
+        ulottuvuus: [
+            (ryhman_nimi(koosteet, ulottuvuus, avain), kooste.lkm, kooste.vahvistetut, kooste.tunnit,
+             kooste.tulot_senttia, kayttoaste)
+            for avain, kooste, kayttoaste in koosteet.viimeistele(ulottuvuus)
+        ]
+        for ulottuvuus in koosteet.ryhmat
+    }
+
+
+class InkrementaalinenPolku(unittest.TestCase):
+
+    def setUp(self) -> None:
+        rivit = islice(varausrivit(random.Random(1), 0), VARAUKSIA)
+        self.varaukset = [muunna_varaustiedot(rivi.rstrip("\n").split("|")) for rivi in rivit]
+
+    def test_lisaa_ja_vahvista_vastaa_uutta_koostetta(self) -> None:
+        puolet = VARAUKSIA // 2
+        lista = Varauslista(self.varaukset[:puolet])
+        koosteet = koosta_varaukset(lista)
+        for varaus in self.varaukset[puolet:]:
+            lista.lisaa(varaus)
+            koosteet.lisaa(lista[-1])
+        for i, varaus in enumerate(lista):
+            if i % 3 == 0:
+                lista[i] = koosteet.vahvista(varaus)
+        self.assertEqual(tulos(koosteet), tulos(koosta_varaukset(lista)))
+
+    def test_varauslista_ei_muuta_annettua_varausta(self) -> None:
+        ennen = [dict(varaus) for varaus in self.varaukset]
+        lista = Varauslista(self.varaukset)
+        self.assertEqual(self.varaukset, ennen)
+        self.assertNotIn("kohdekoodi", self.varaukset[0])
+        self.assertEqual(lista[0], {**ennen[0], "kohdekoodi": 0, "asiakaskoodi": 0})
+
+    def test_vahvista_ei_muuta_annettua_varausta(self) -> None:
+        koosteet = koosta_varaukset(self.varaukset)
+        varaus = next(varaus for varaus in self.varaukset if not varaus["vahvistettu"])
+        ennen = dict(varaus)
+        vahvistettu = koosteet.vahvista(varaus)
+        self.assertEqual(varaus, ennen)
+        self.assertTrue(vahvistettu["vahvistettu"])
+        self.assertIs(koosteet.vahvista(vahvistettu), vahvistettu)
+
+    def test_inkrementaalinen_ilman_koodistoja(self) -> None:
+        # Koodittomat varaukset (esim. hajautettu koostaminen) koodataan koosteen omiin koodistoihin
+        koosteet = Varauskoosteet()
+        lopulliset = []
+        for i, varaus in enumerate(self.varaukset):
+            koosteet.lisaa(varaus)
+            lopulliset.append(koosteet.vahvista(varaus) if i % 2 else varaus)
+        self.assertEqual(tulos(koosteet), tulos(koosta_varaukset(lopulliset)))
+
+
+if __name__ == "__main__":
+    unittest.main()
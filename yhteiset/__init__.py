@@ -0,0 +1,6 @@
+"""
+Yhteiset apumoduulit viikkotehtävien energia- ja varausdatan käsittelyyn.
+
+Viikkokansioiden ohjelmat lisäävät repositorion juuren hakupolkuun, jolloin
+moduulit tuodaan muodossa ``from yhteiset.aikasarja import Aikasarja``.
+"""
@@ -0,0 +1,104 @@
+# Copyright (c) 2025 Jonna Kangas
+
+# Ohjelmoinnin perusteet -opintojakso
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# See <https://www.gnu.org/licenses/>.
+
+"""
+Sarakemuotoinen tuntisarja: aikaleimat + yhtä pitkät lukusarakkeet (array).
+
+Sarja on aikajärjestyksessä, joten aikavälin rivit löytyvät puolitushaulla ja
+summat lasketaan sarakeviipaleista ilman koko datan läpikäyntiä.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterator, Sequence
+from datetime import date, datetime
+
+
+class Aikasarja:
+    """
+    Tuntimittaukset sarakkeina.
+
+    Parametrit:
+        nimet (Sequence[str]): Lukusarakkeiden nimet Rivi-tuplen järjestyksessä (ilman aikaleimaa).
+        tyyppikoodi (str): array-moduulin tyyppikoodi, esim. "d" (float) tai "q" (int).
+
+    Huomio:
+        - Rivit oletetaan lisättävän aikajärjestyksessä. Jos näin ei ole, sarja
+          järjestetään kerran ennen ensimmäistä aikahakua.
+    """
+
+    def __init__(self, nimet: Sequence[str], tyyppikoodi: str = "d") -> None:
+        self.nimet: tuple[str, ...] = tuple(nimet)
+        self.tyyppikoodi: str = tyyppikoodi
+        self.aikaleimat: list[datetime] = []
+        self.sarakkeet: tuple[array, ...] = tuple(array(tyyppikoodi) for _ in self.nimet)
+        self._jarjestyksessa: bool = True
+        # Lisäyksessä havaitut rivit, jotka olivat aiempia kuin edellinen rivi
+        self.epajarjestyksessa: int = 0
+
+    def __len__(self) -> int:
+        return len(self.aikaleimat)
+
+    def lisaa(self, rivi: tuple) -> None:
+        """Lisää yhden Rivi-tuplen (aikaleima + sarakkeiden arvot) sarjan loppuun."""
+        aika = rivi[0]
+        if self.aikaleimat and aika < self.aikaleimat[-1]:
+            self._jarjestyksessa = False
+            self.epajarjestyksessa += 1
+        self.aikaleimat.append(aika)
+        for sarake, arvo in zip(self.sarakkeet, rivi[1:]):
+            sarake.append(arvo)
+
+    def tyhja_kopio(self) -> "Aikasarja":
+        """Palauttaa tyhjän samanlaisen sarjan (sama luokka, sarakkeet ja tyyppikoodi)."""
+        uusi = object.__new__(type(self))
+        Aikasarja.__init__(uusi, self.nimet, self.tyyppikoodi)
+        return uusi
+
+    def sarake(self, nimi: str) -> array:
+        """Palauttaa nimetyn sarakkeen."""
+        return self.sarakkeet[self.nimet.index(nimi)]
+
+    def rivit(self, a: int = 0, b: int | None = None) -> Iterator[tuple]:
+        """Palauttaa indeksivälin [a, b) rivit Rivi-tupleina."""
+        return zip(self.aikaleimat[a:b], *(sarake[a:b] for sarake in self.sarakkeet))
+
+    def jarjesta(self) -> None:
+        """Järjestää rivit aikaleiman mukaan (vakaa järjestys, duplikaatit säilyvät)."""
+        if self._jarjestyksessa:
+            return
+        jarjestys = sorted(range(len(self.aikaleimat)), key=self.aikaleimat.__getitem__)
+        self.aikaleimat = [self.aikaleimat[i] for i in jarjestys]
+        self.sarakkeet = tuple(
+            array(self.tyyppikoodi, (sarake[i] for i in jarjestys)) for sarake in self.sarakkeet
+        )
+        self._jarjestyksessa = True
+
+    def valin_rajat(self, alku: datetime, loppu: datetime) -> tuple[int, int]:
+        """Palauttaa indeksivälin [a, b), jonka aikaleimat ovat välillä alku <= t < loppu."""
+        self.jarjesta()
+        return bisect_left(self.aikaleimat, alku), bisect_left(self.aikaleimat, loppu)
+
+    def paivien_rajat(self, alku: date, loppu: date) -> tuple[int, int]:
+        """
+        Palauttaa indeksivälin [a, b) päiville alku–loppu (rajat mukaan luettuina).
+
+        Päivä katsotaan aikaleiman omasta (paikallisesta) päivämäärästä, joten
+        toimii myös aikavyöhyketietoisilla aikaleimoilla.
+        """
+        self.jarjesta()
+        a = bisect_left(self.aikaleimat, alku, key=datetime.date)
+        b = bisect_right(self.aikaleimat, loppu, lo=a, key=datetime.date)
+        return a, b
+
+    def summat(self, a: int = 0, b: int | None = None) -> list:
+        """Laskee jokaisen sarakkeen summan indeksiväliltä [a, b)."""
+        return [sum(sarake[a:b]) for sarake in self.sarakkeet]
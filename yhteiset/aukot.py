@@ -0,0 +1,216 @@
+# Copyright (c) 2025 Jonna Kangas
+
+# Ohjelmoinnin perusteet -opintojakso
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# See <https://www.gnu.org/licenses/>.
+
+"""
+Tuntisarjan aukkojen, kaksoiskappaleiden ja epäjärjestyksen tarkistus.
+
+Tarkistus käy aikaleimasarakkeen läpi kerran (O(n)) vertaamalla peräkkäisten
+aikaleimojen erotusta tunnin askeleeseen. Tulos on tiivis indeksi:
+aukot (kohta, puuttuvien tuntien lkm) ja kaksoiskappaleiden rivi-indeksit.
+Korjausfunktiot tekevät uuden sarjan jo luetuista sarakkeista, joten
+tiedostoa ei tarvitse jäsentää uudelleen.
+
+Huomio:
+    - Aikavyöhyketietoisten aikaleimojen erotus lasketaan UTC-ajassa, joten
+      kesäajan vaihdokset (+03:00 -> +02:00) eivät näy aukkoina tai kaksoiskappaleina.
+    - Naiiveissa aikaleimoissa syksyn kesäaikavaihdon toistuva tunti näkyy
+      kaksoiskappaleena; se on oikea mittaus, joten energialle sopii strategia "summa".
+"""
+
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+
+from yhteiset.aikasarja import Aikasarja
+from yhteiset.uudelleenotanta import KOOSTIMET
+
+TUNTI = timedelta(hours=1)
+
+# Kaksoiskappaleiden käsittely: ensimmäinen/viimeinen rivi tai jokin uudelleenotannan koostin
+YHDISTYSSTRATEGIAT: tuple[str, ...] = ("ensimmainen", "viimeinen", *KOOSTIMET)
+
+# Aukkojen täyttö: nolla-arvot, edellisen tunnin arvot tai lineaarinen interpolointi
+TAYTTOSTRATEGIAT: tuple[str, ...] = ("nolla", "edellinen", "interpoloi")
+
+
+class Aukkoindeksi:
+    """
+    Tiivis kuvaus sarjan poikkeamista.
+
+    Attribuutit:
+        aukot (list[tuple[int, int]]): (i, lkm): rivin i edeltä puuttuu lkm tuntia.
+        kaksoiskappaleet (list[int]): Rivit, joiden aikaleima on sama kuin edellisellä rivillä.
+        epajarjestyksessa (int): Rivit, joiden aikaleima on aiempi kuin edellisellä rivillä.
+        epasaannolliset (list[int]): Rivit, joiden etäisyys edelliseen ei ole tasatunteja.
+    """
+
+    def __init__(self) -> None:
+        self.aukot: list[tuple[int, int]] = []
+        self.kaksoiskappaleet: list[int] = []
+        self.epajarjestyksessa: int = 0
+        self.epasaannolliset: list[int] = []
+
+    def on_kunnossa(self) -> bool:
+        """Palauttaa True, jos sarjassa ei ole poikkeamia."""
+        return not (self.aukot or self.kaksoiskappaleet or self.epajarjestyksessa or self.epasaannolliset)
+
+    def puuttuvat_tunnit(self) -> int:
+        """Puuttuvien tuntien kokonaismäärä."""
+        return sum(lkm for _, lkm in self.aukot)
+
+    def yhteenveto(self) -> str:
+        """Palauttaa lyhyen tekstiyhteenvedon poikkeamista."""
+        return (
+            f"Aukkoja {len(self.aukot)} kpl ({self.puuttuvat_tunnit()} tuntia puuttuu), "
+            f"kaksoiskappaleita {len(self.kaksoiskappaleet)} kpl, "
+            f"epäjärjestyksessä {self.epajarjestyksessa} kpl, "
+            f"epäsäännöllisiä {len(self.epasaannolliset)} kpl"
+        )
+
+
+def tarkista_aikaleimat(aikaleimat: Sequence[datetime], askel: timedelta = TUNTI) -> Aukkoindeksi:
+    """
+    Tarkistaa aikaleimasarakkeen yhdellä läpikäynnillä.
+
+    Parametrit:
+        aikaleimat (Sequence[datetime]): Aikaleimat luetussa järjestyksessä.
+        askel (timedelta): Odotettu väli peräkkäisten rivien välillä (oletus 1 h).
+
+    Palauttaa:
+        Aukkoindeksi: Aukot, kaksoiskappaleet ja epäjärjestyksessä olevat rivit.
+        Jos sarja ei ole järjestyksessä, aukko- ja kaksoiskappaletiedot koskevat
+        luettua järjestystä; järjestä sarja ja tarkista uudelleen.
+    """
+    indeksi = Aukkoindeksi()
+    nolla = timedelta(0)
+    for i in range(1, len(aikaleimat)):
+        erotus = aikaleimat[i] - aikaleimat[i - 1]
+        if erotus == askel:
+            continue
+        if erotus == nolla:
+            indeksi.kaksoiskappaleet.append(i)
+        elif erotus < nolla:
+            indeksi.epajarjestyksessa += 1
+        elif erotus % askel:
+            indeksi.epasaannolliset.append(i)
+        else:
+            indeksi.aukot.append((i, erotus // askel - 1))
+    return indeksi
+
+
+def tarkista_sarja(sarja: Aikasarja, askel: timedelta = TUNTI) -> Aukkoindeksi:
+    """
+    Tarkistaa Aikasarjan. Epäjärjestyksessä luettu sarja järjestetään ensin,
+    jolloin aukot ja kaksoiskappaleet lasketaan järjestetystä sarakkeesta.
+
+    Palauttaa:
+        Aukkoindeksi: Järjestetyn sarjan poikkeamat; epajarjestyksessa kertoo
+        luetussa järjestyksessä havaittujen epäjärjestysten määrän.
+    """
+    epajarjestyksessa = sarja.epajarjestyksessa
+    sarja.jarjesta()
+    indeksi = tarkista_aikaleimat(sarja.aikaleimat, askel)
+    indeksi.epajarjestyksessa = epajarjestyksessa
+    return indeksi
+
+
+def poista_kaksoiskappaleet(sarja: Aikasarja, indeksi: Aukkoindeksi, strategia: str | Sequence[str] = "ensimmainen") -> Aikasarja:
+    """
+    Yhdistää saman aikaleiman rivit yhdeksi riviksi.
+
+    Parametrit:
+        sarja (Aikasarja): Järjestetty sarja (tarkistettu funktiolla tarkista_sarja()).
+        indeksi (Aukkoindeksi): Sarjan tarkistuksen tulos.
+        strategia (str | Sequence[str]): Jokin YHDISTYSSTRATEGIAT-arvoista, joko kaikille
+            sarakkeille tai erikseen jokaiselle sarakkeelle (esim. energia "summa", lämpötila "keskiarvo").
+
+    Palauttaa:
+        Aikasarja: Uusi sarja ilman kaksoiskappaleita (tai sama sarja, jos niitä ei ollut).
+
+    Poikkeukset:
+        ValueError: jos strategia ei ole tuettu.
+    """
+    if isinstance(strategia, str):
+        strategia = [strategia] * len(sarja.sarakkeet)
+    for s in strategia:
+        if s not in YHDISTYSSTRATEGIAT:
+            raise ValueError(f"Tuntematon strategia: {s} (sallitut: {', '.join(YHDISTYSSTRATEGIAT)})")
+    if not indeksi.kaksoiskappaleet:
+        return sarja
+
+    # Ryhmien alut: jokainen rivi, joka ei ole edellisen kaksoiskappale
+    kaksoiset = set(indeksi.kaksoiskappaleet)
+    alut = [i for i in range(len(sarja)) if i not in kaksoiset]
+    rajat = alut + [len(sarja)]
+
+    uusi = sarja.tyhja_kopio()
+    uusi.aikaleimat = [sarja.aikaleimat[a] for a in alut]
+    for sarake, uusi_sarake, s in zip(sarja.sarakkeet, uusi.sarakkeet, strategia):
+        if s == "ensimmainen":
+            uusi_sarake.extend(sarake[a] for a in alut)
+        elif s == "viimeinen":
+            uusi_sarake.extend(sarake[b - 1] for b in rajat[1:])
+        else:
+            koostin = KOOSTIMET[s]
+            arvot = (koostin(sarake[a:b]) for a, b in zip(rajat, rajat[1:]))
+            if uusi.tyyppikoodi in "bBhHiIlLqQ":
+                arvot = (round(arvo) for arvo in arvot)  # kokonaislukusarake (esim. Wh)
+            uusi_sarake.extend(arvot)
+    return uusi
+
+
+def tayta_aukot(sarja: Aikasarja, indeksi: Aukkoindeksi, strategia: str = "nolla", askel: timedelta = TUNTI) -> Aikasarja:
+    """
+    Lisää puuttuvat tunnit sarjaan.
+
+    Parametrit:
+        sarja (Aikasarja): Järjestetty sarja (tarkistettu funktiolla tarkista_sarja()).
+        indeksi (Aukkoindeksi): Sarjan tarkistuksen tulos.
+        strategia (str): "nolla", "edellinen" tai "interpoloi" (lineaarisesti naapuririvien välillä).
+        askel (timedelta): Sarjan aika-askel (oletus 1 h).
+
+    Palauttaa:
+        Aikasarja: Uusi sarja, jossa aukot on täytetty (tai sama sarja, jos aukkoja ei ollut).
+
+    Poikkeukset:
+        ValueError: jos strategia ei ole tuettu.
+    """
+    if strategia not in TAYTTOSTRATEGIAT:
+        raise ValueError(f"Tuntematon strategia: {strategia} (sallitut: {', '.join(TAYTTOSTRATEGIAT)})")
+    if not indeksi.aukot:
+        return sarja
+
+    kokonaisluku = sarja.tyyppikoodi in "bBhHiIlLqQ"
+    uusi = sarja.tyhja_kopio()
+    edellinen = 0
+    for i, lkm in indeksi.aukot:
+        # Kopioidaan aukkoa edeltävät rivit viipaleina
+        uusi.aikaleimat.extend(sarja.aikaleimat[edellinen:i])
+        for sarake, uusi_sarake in zip(sarja.sarakkeet, uusi.sarakkeet):
+            uusi_sarake.extend(sarake[edellinen:i])
+        # Täytetään puuttuvat tunnit
+        alku = sarja.aikaleimat[i - 1]
+        uusi.aikaleimat.extend(alku + askel * k for k in range(1, lkm + 1))
+        for sarake, uusi_sarake in zip(sarja.sarakkeet, uusi.sarakkeet):
+            if strategia == "nolla":
+                arvot = [0] * lkm
+            elif strategia == "edellinen":
+                arvot = [sarake[i - 1]] * lkm
+            else:
+                a, b = sarake[i - 1], sarake[i]
+                arvot = [a + (b - a) * k / (lkm + 1) for k in range(1, lkm + 1)]
+                if kokonaisluku:
+                    arvot = [round(arvo) for arvo in arvot]
+            uusi_sarake.extend(arvot)
+        edellinen = i
+    uusi.aikaleimat.extend(sarja.aikaleimat[edellinen:])
+    for sarake, uusi_sarake in zip(sarja.sarakkeet, uusi.sarakkeet):
+        uusi_sarake.extend(sarake[edellinen:])
+    return uusi
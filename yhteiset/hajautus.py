@@ -0,0 +1,170 @@
+# Copyright (c) 2025 Jonna Kangas
+
+# Ohjelmoinnin perusteet -opintojakso
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# See <https://www.gnu.org/licenses/>.
+
+"""
+Tekstitiedostojen koostaminen paloittain prosessipoolissa (map-reduce).
+
+Osatila:
+    Raportti määrittelee osatilaluokan (esim. Varauskoosteet), jolla on
+        - paivita(tietue): lisää yhden muunnetun rivin,
+        - yhdista(toinen): yhdistää toisen palan osatilan tähän,
+        - viimeistele(...): laskee lopputuloksen (kutsuja kutsuu itse).
+    Luokan pitää olla luotavissa ilman argumentteja ja sijaita moduulin
+    päätasolla, jotta prosessipooli voi siirtää sen (pickle).
+
+Palat:
+    - Tiedostot jaetaan tavualueiksi. Rivi kuuluu palaan, jossa sen ensimmäinen
+      tavu on, joten palan rajan ei tarvitse osua rivinvaihtoon eikä mikään
+      palanen lue koko tiedostoa. Muistissa on vain palojen osatilat.
+    - Pakattua tiedostoa (ks. yhteiset.pakkaus) ei voi jakaa tavualueisiin,
+      joten se puretaan virtana ja koostetaan yhtenä palana.
+    - Palat koostetaan toisistaan riippumatta ja yhdistetään palojen
+      järjestyksessä. Kun osatila kerää summat kokonaislukuina (Wh, sentit),
+      tulos on bitilleen sama kuin peräkkäisellä läpikäynnillä prosessien ja
+      palojen määrästä riippumatta.
+
+Käyttöönotto:
+    - Komentorivilippu --hajautettu[=<prosessit>] (oletus: prosessorien määrä).
+"""
+
+import os
+import sys
+from collections.abc import Callable, Iterable, Iterator
+from functools import partial
+
+from yhteiset.pakkaus import avaa_luettavaksi, tunnista
+
+KOMENTORIVILIPPU = "--hajautettu"
+
+# Palan oletuskoko tavuina
+PALAN_KOKO: int = 64 * 1024 * 1024
+
+# Pala: (tiedosto, alku, loppu); rivit, joiden ensimmäinen tavu on välillä [alku, loppu)
+Pala = tuple[str, int, int]
+
+
+def lue_prosessit() -> int | None:
+    """
+    Palauttaa prosessien määrän tai None, jos hajautettu tila ei ole päällä.
+
+    Komentorivilippu poistetaan sys.argv:sta. Pelkkä --hajautettu käyttää
+    prosessorien määrää.
+
+    Poikkeukset:
+        ValueError: jos prosessien määrä ei ole positiivinen kokonaisluku.
+    """
+    for arg in sys.argv[1:]:
+        if arg == KOMENTORIVILIPPU or arg.startswith(KOMENTORIVILIPPU + "="):
+            sys.argv.remove(arg)
+            arvo = arg.partition("=")[2]
+            if not arvo:
+                return os.cpu_count() or 1
+            prosessit = int(arvo)
+            if prosessit < 1:
+                raise ValueError(f"Prosessien määrän pitää olla positiivinen: {arvo}")
+            return prosessit
+    return None
+
+
+def palat(tiedostot: Iterable[str], palan_koko: int | None = PALAN_KOKO) -> list[Pala]:
+    """
+    Jakaa tiedostot enintään palan_koko tavun paloiksi (None: yksi pala tiedostoa kohden).
+
+    Tyhjästäkin tiedostosta tulee yksi pala, jotta jokainen tiedosto avataan
+    ja puuttuva tiedosto huomataan. Pakattu tiedosto on aina yksi pala.
+    """
+    tulos = []
+    for tiedosto in tiedostot:
+        if tunnista(tiedosto) is not None:
+            tulos.append((tiedosto, 0, sys.maxsize))
+            continue
+        koko = os.path.getsize(tiedosto)
+        askel = koko if not palan_koko else palan_koko
+        tulos.extend((tiedosto, alku, min(alku + askel, koko)) for alku in range(0, koko, askel or 1))
+        if koko == 0:
+            tulos.append((tiedosto, 0, 0))
+    return tulos
+
+
+def lue_pala(pala: Pala, otsikkorivit: int = 1) -> Iterator[str]:
+    """
+    Tuottaa palan rivit merkkijonoina (rivinvaihtoineen).
+
+    Ensimmäisen palan otsikkorivit ohitetaan. Muun palan alusta ohitetaan
+    edellisessä palassa alkanut rivi.
+    """
+    tiedosto, alku, loppu = pala
+    with avaa_luettavaksi(tiedosto, "rb") as f:
+        if alku == 0:
+            for _ in range(otsikkorivit):
+                alku += len(f.readline())
+        else:
+            # Jos edellinen tavu on rivinvaihto, readline() palauttaa vain sen
+            f.seek(alku - 1)
+            alku += len(f.readline()) - 1
+        while alku < loppu:
+            rivi = f.readline()
+            if not rivi:
+                break
+            alku += len(rivi)
+            yield rivi.decode("utf-8")
+
+
+def koosta_pala(tyyppi: type, muunna: Callable[[list[str]], object], erotin: str, pala: Pala,
+                otsikkorivit: int = 1) -> object:
+    """
+    Koostaa yhden palan uuteen osatilaan (ajetaan työprosessissa).
+
+    Rivit käsitellään kuten lukufunktioissa: tyhjät rivit ohitetaan, muut
+    pilkotaan erottimella ja muunnetaan muunna-funktiolla.
+    """
+    tila = tyyppi()
+    paivita = tila.paivita
+    for rivi in lue_pala(pala, otsikkorivit):
+        rivi = rivi.strip()
+        if rivi:
+            paivita(muunna(rivi.split(erotin)))
+    return tila
+
+
+def koosta(tyyppi: type, muunna: Callable[[list[str]], object], erotin: str, tiedostot: Iterable[str],
+           prosessit: int = 1, palan_koko: int | None = PALAN_KOKO, otsikkorivit: int = 1) -> object:
+    """
+    Koostaa tiedostot paloittain ja yhdistää osatilat palojen järjestyksessä.
+
+    Parametrit:
+        tyyppi (type): Osatilaluokka (paivita/yhdista).
+        muunna (Callable): Rivin kenttien muunnosfunktio (esim. muunna_tiedot).
+        erotin (str): Kenttien erotin (";" tai "|").
+        tiedostot (Iterable[str]): Luettavat tiedostot.
+        prosessit (int): Työprosessien määrä; 1 koostaa palat tässä prosessissa.
+        palan_koko (int | None): Palan enimmäiskoko tavuina (None: tiedosto kerrallaan).
+        otsikkorivit (int): Ohitettavat otsikkorivit tiedoston alussa.
+
+    Palauttaa:
+        object: Yhdistetty osatila (viimeistele() jää kutsujalle).
+    """
+    tehtava = partial(koosta_pala, tyyppi, muunna, erotin, otsikkorivit=otsikkorivit)
+    kaikki = palat(tiedostot, palan_koko)
+    tulos = tyyppi()
+    if prosessit <= 1 or len(kaikki) <= 1:
+        for pala in kaikki:
+            tulos.yhdista(tehtava(pala))
+        return tulos
+
+    # Prosessipooli tuodaan vasta tarvittaessa (käynnistysaika)
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=prosessit) as pooli:
+        # map() palauttaa tulokset palojen järjestyksessä
+        for osa in pooli.map(tehtava, kaikki):
+            tulos.yhdista(osa)
+    return tulos
@@ -0,0 +1,156 @@
+# Copyright (c) 2025 Jonna Kangas
+
+# Ohjelmoinnin perusteet -opintojakso
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# See <https://www.gnu.org/licenses/>.
+
+"""
+Sietoinen massalataus: virheelliset rivit ohitetaan ja kirjataan, lataus jatkuu.
+
+Toiminta:
+    - Kenttämäärä tarkistetaan halvalla str.count-kutsulla ennen pilkkomista ja
+      muunnosta, joten useimmat rikkinäiset rivit hylätään ilman poikkeusta.
+    - Muunnosvirheet (ValueError, IndexError) kirjataan riveittäin:
+      rivinumero, syy ja alkuperäinen teksti.
+    - Lopuksi hylätyt rivit kirjoitetaan sivutiedostoon <tiedosto>.hylatyt
+      (sarkaineroteltu) ja hylkäysosuutta verrataan rajaan; rajan ylitys
+      keskeyttää ajon poikkeuksella HylkaysrajaYlittyi. Ilman hylkäyksiä
+      aiemman ajon sivutiedosto poistetaan.
+
+Käyttöönotto:
+    - Komentorivilippu --sietoinen[=<raja>], jossa raja on suurin sallittu
+      hylättyjen rivien osuus (oletus 0.01 eli 1 %).
+    - Ilman lippua lukufunktiot toimivat kuten ennen ja nostavat poikkeuksen
+      ensimmäisestä virheellisestä rivistä.
+"""
+
+import os
+import sys
+from collections.abc import Callable, Iterable, Iterator
+
+from yhteiset.raportointi import Lukupohja
+
+KOMENTORIVILIPPU = "--sietoinen"
+OLETUSRAJA = 0.01
+SIVUTIEDOSTON_PAATE = ".hylatyt"
+
+# Tiedoston nimi (jossa voi olla pisteitä) liitetään erikseen
+YHTEENVETO = Lukupohja("hylättiin {}/{} riviä ({:.3f} %), hylätyt rivit: ")
+
+
+class HylkaysrajaYlittyi(ValueError):
+    """Hylättyjen rivien osuus ylitti sallitun rajan."""
+
+
+def lue_hylkaysraja() -> float | None:
+    """
+    Palauttaa komentoriviltä annetun hylkäysrajan tai None, jos sietoinen tila ei ole päällä.
+
+    Komentorivilippu poistetaan sys.argv:sta.
+
+    Poikkeukset:
+        ValueError: jos raja ei ole luku väliltä 0–1.
+    """
+    for arg in sys.argv[1:]:
+        if arg == KOMENTORIVILIPPU or arg.startswith(KOMENTORIVILIPPU + "="):
+            sys.argv.remove(arg)
+            raja = float(arg.partition("=")[2] or OLETUSRAJA)
+            if not (0 <= raja <= 1):
+                raise ValueError(f"Hylkäysrajan on oltava väliltä 0–1: {raja}")
+            return raja
+    return None
+
+
+def hylkaykset_tiedostolle(tiedosto: str, raja: float | None) -> "Hylkaykset | None":
+    """Palauttaa tiedoston kirjanpidon tai None, jos sietoinen tila ei ole päällä (raja None)."""
+    return Hylkaykset(tiedosto, raja) if raja is not None else None
+
+
+class Hylkaykset:
+    """
+    Yhden tiedoston sietoisen latauksen kirjanpito.
+
+    Parametrit:
+        tiedosto (str): Luettava tiedosto; sivutiedosto on tiedosto + SIVUTIEDOSTON_PAATE.
+        raja (float): Suurin sallittu hylättyjen rivien osuus (0–1).
+
+    Attribuutit:
+        rivit (int): Käsiteltyjen (ei-tyhjien) datarivien määrä.
+        hylatyt (list[tuple[int, str, str]]): (rivinumero, syy, alkuperäinen rivi).
+    """
+
+    def __init__(self, tiedosto: str, raja: float = OLETUSRAJA) -> None:
+        self.tiedosto: str = tiedosto
+        self.raja: float = raja
+        self.rivit: int = 0
+        self.hylatyt: list[tuple[int, str, str]] = []
+
+    def kasittele(self, rivit: Iterable[str], erotin: str, kenttia: int,
+                  muunnin: Callable[[list[str]], object], ensimmainen_rivinumero: int = 1) -> Iterator:
+        """
+        Muuntaa rivit ja ohittaa virheelliset.
+
+        Parametrit:
+            rivit (Iterable[str]): Tiedoston rivit (esim. avattu tiedosto otsikon jälkeen).
+            erotin (str): Kenttäerotin.
+            kenttia (int): Odotettu kenttien määrä.
+            muunnin (Callable): Rivin kentät muuntava funktio (esim. muunna_tiedot).
+            ensimmainen_rivinumero (int): Ensimmäisen rivin numero tiedostossa (otsikko huomioiden).
+
+        Palauttaa:
+            Iterator: Onnistuneesti muunnetut rivit.
+        """
+        erottimia = kenttia - 1
+        for rivinumero, raaka in enumerate(rivit, ensimmainen_rivinumero):
+            rivi = raaka.strip()
+            if not rivi:
+                continue
+            self.rivit += 1
+            if rivi.count(erotin) != erottimia:
+                self.hylatyt.append((rivinumero, f"odotettiin {kenttia} kenttää, saatiin {rivi.count(erotin) + 1}", rivi))
+                continue
+            try:
+                tulos = muunnin(rivi.split(erotin))
+            except (ValueError, IndexError) as e:
+                self.hylatyt.append((rivinumero, f"{type(e).__name__}: {e}", rivi))
+                continue
+            yield tulos
+
+    def osuus(self) -> float:
+        """Hylättyjen rivien osuus käsitellyistä riveistä."""
+        return len(self.hylatyt) / self.rivit if self.rivit else 0.0
+
+    def yhteenveto(self) -> str:
+        """Palauttaa lyhyen tekstiyhteenvedon hylkäyksistä (pilkku desimaalierottimena)."""
+        return YHTEENVETO(len(self.hylatyt), self.rivit, 100 * self.osuus()) + self.tiedosto + SIVUTIEDOSTON_PAATE
+
+    def viimeistele(self) -> None:
+        """
+        Kirjoittaa hylätyt rivit sivutiedostoon, tulostaa yhteenvedon ja tarkistaa rajan.
+
+        Jos hylättyjä rivejä ei ole, aiemman ajon sivutiedosto poistetaan, jotta
+        se ei näytä tämän ajon hylkäyksiltä.
+
+        Poikkeukset:
+            HylkaysrajaYlittyi: jos hylättyjen osuus on suurempi kuin raja.
+            OSError: jos sivutiedoston kirjoitus tai poisto epäonnistuu.
+        """
+        if not self.hylatyt:
+            try:
+                os.remove(self.tiedosto + SIVUTIEDOSTON_PAATE)
+            except FileNotFoundError:
+                pass
+            return
+        with open(self.tiedosto + SIVUTIEDOSTON_PAATE, "w", encoding="utf-8") as f:
+            f.write("rivi\tsyy\tteksti\n")
+            f.writelines(f"{rivinumero}\t{syy}\t{raaka}\n" for rivinumero, syy, raaka in self.hylatyt)
+        print(f"Huomio ({self.tiedosto}): {self.yhteenveto()}")
+        if self.osuus() > self.raja:
+            raise HylkaysrajaYlittyi(
+                f"{self.tiedosto}: hylättyjen rivien osuus {self.osuus():.2%} ylittää rajan {self.raja:.2%}"
+            )
@@ -0,0 +1,105 @@
+# Copyright (c) 2025 Jonna Kangas
+
+# Ohjelmoinnin perusteet -opintojakso
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# See <https://www.gnu.org/licenses/>.
+
+"""
+Tiedoston ISO-viikon tunnistus aikaleimoista jäsennyksen aikana.
+
+Toiminta:
+    - Lukufunktio antaa jokaisen jäsennetyn aikaleiman paivita()-metodille.
+      Aikaleimaa verrataan vain nykyisen viikon rajoihin; ISO-viikko lasketaan
+      (isocalendar) vasta, kun aikaleima osuu toiselle viikolle, joten tunnistus
+      ei vaadi erillistä läpikäyntiä.
+    - Tiedoston viikko on viikko, jolle osuu eniten rivejä. Näin esim. seuraavan
+      maanantain keskiyön rivi tiedoston lopussa ei muuta tulosta.
+"""
+
+import os
+from datetime import date, datetime, time, timedelta
+
+from yhteiset.pakkaus import PAKATUT_PAATTEET
+
+# ISO-viikko: (ISO-vuosi, viikon numero)
+Viikko = tuple[int, int]
+
+VIIKKO = timedelta(days=7)
+
+# Hakemistoista luettavat tiedostot: .csv ja sen pakatut muodot
+CSV_PAATTEET: tuple[str, ...] = (".csv",) + tuple(".csv" + paate for paate in PAKATUT_PAATTEET)
+
+
+class Viikkotunnistin:
+    """
+    Laskee tiedoston rivit ISO-viikoittain.
+
+    Attribuutit:
+        viikot (dict[Viikko, int]): ISO-viikko -> rivien määrä.
+    """
+
+    def __init__(self) -> None:
+        self.viikot: dict[Viikko, int] = {}
+        self._viikko: Viikko | None = None
+        self._alku: datetime | None = None  # nykyisen viikon maanantai klo 0
+        self._loppu: datetime | None = None  # seuraavan viikon maanantai klo 0
+        self._rivit: int = 0
+
+    def paivita(self, aika: datetime) -> None:
+        """Kirjaa yhden rivin aikaleiman."""
+        if self._alku is None or not (self._alku <= aika < self._loppu):
+            self._kirjaa()
+            vuosi, numero, viikonpaiva = aika.isocalendar()
+            self._viikko = (vuosi, numero)
+            self._alku = datetime.combine(aika.date() - timedelta(days=viikonpaiva - 1), time(), aika.tzinfo)
+            self._loppu = self._alku + VIIKKO
+        self._rivit += 1
+
+    def _kirjaa(self) -> None:
+        if self._viikko is not None:
+            self.viikot[self._viikko] = self.viikot.get(self._viikko, 0) + self._rivit
+        self._rivit = 0
+
+    def viikko(self) -> Viikko:
+        """
+        Palauttaa viikon, jolle osui eniten rivejä (tasatilanteessa aikaisin).
+
+        Poikkeukset:
+            ValueError: jos yhtään aikaleimaa ei ole kirjattu.
+        """
+        self._kirjaa()
+        if not self.viikot:
+            raise ValueError("Tiedostossa ei ole aikaleimoja, joten viikkoa ei voi tunnistaa")
+        return max(sorted(self.viikot), key=self.viikot.__getitem__)
+
+
+def maanantai(viikko: Viikko) -> date:
+    """ISO-viikon maanantai."""
+    return date.fromisocalendar(viikko[0], viikko[1], 1)
+
+
+def csv_tiedostot(polut: list[str], oletus: str = "viikko") -> list[str]:
+    """
+    Palauttaa luettavat CSV-tiedostot.
+
+    Hakemistoista otetaan .csv-tiedostot (myös pakatut, esim. .csv.gz), muut polut
+    sellaisinaan. Ilman polkuja käytetään nykyhakemiston tiedostoja, joiden nimi
+    alkaa oletus-etuliitteellä. Järjestyksellä ei ole väliä, koska tiedostot
+    järjestetään tunnistetun viikon mukaan.
+    """
+    if not polut:
+        return sorted(nimi for nimi in os.listdir(".") if nimi.startswith(oletus) and nimi.endswith(CSV_PAATTEET))
+    tiedostot = []
+    for polku in polut:
+        if os.path.isdir(polku):
+            tiedostot.extend(sorted(
+                os.path.join(polku, nimi) for nimi in os.listdir(polku) if nimi.endswith(CSV_PAATTEET)
+            ))
+        else:
+            tiedostot.append(polku)
+    return tiedostot
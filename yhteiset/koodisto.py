@@ -0,0 +1,49 @@
+# Copyright (c) 2025 Jonna Kangas
+
+# Ohjelmoinnin perusteet -opintojakso
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# See <https://www.gnu.org/licenses/>.
+
+"""
+Sanakirjakoodaus toistuville tekstikentille (esim. varauskohde, asiakas).
+
+Jokainen erillinen arvo saa latauskohtaisen pienen kokonaislukukoodin
+(0, 1, 2, ... ensiesiintymisjärjestyksessä), ja arvo talletetaan vain kerran.
+Rivit voivat viitata koodiin ja kanoniseen merkkijono-olioon, jolloin
+toistuvat arvot eivät vie muistia rivikohtaisesti ja ryhmittely voidaan
+tehdä kokonaislukuavaimilla (esim. listaindeksillä sanakirjan sijaan).
+"""
+
+
+class Koodisto:
+    """
+    Arvo <-> koodi -taulu.
+
+    Attribuutit:
+        koodit (dict[str, int]): Arvo -> koodi.
+        arvot (list[str]): Koodi -> arvo (kanoninen olio).
+    """
+
+    def __init__(self) -> None:
+        self.koodit: dict[str, int] = {}
+        self.arvot: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self.arvot)
+
+    def __getitem__(self, koodi: int) -> str:
+        """Palauttaa koodia vastaavan arvon."""
+        return self.arvot[koodi]
+
+    def koodaa(self, arvo: str) -> int:
+        """Palauttaa arvon koodin; uusi arvo saa seuraavan vapaan koodin."""
+        koodi = self.koodit.get(arvo)
+        if koodi is None:
+            koodi = self.koodit[arvo] = len(self.arvot)
+            self.arvot.append(arvo)
+        return koodi
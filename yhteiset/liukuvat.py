@@ -0,0 +1,161 @@
+# Copyright (c) 2025 Jonna Kangas
+
+# Ohjelmoinnin perusteet -opintojakso
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# See <https://www.gnu.org/licenses/>.
+
+"""
+Liukuvat summat ja keskiarvot aikaikkunoissa (esim. 24 h, 7 d, 30 d).
+
+Toiminta:
+    - Jokaisella ikkunalla on jono (deque) ikkunaan kuuluvista riveistä ja
+      juoksevat summat sarakkeittain. Uusi rivi lisätään summiin ja ikkunasta
+      poistuvat rivit vähennetään, joten jokainen rivi käsitellään kahdesti ja
+      koko sarjan läpikäynti on O(n) ikkunan leveydestä riippumatta.
+    - Ikkuna määritellään ajan eikä rivimäärän mukaan: (aika - leveys, aika].
+      Aukot eivät siis venytä ikkunaa, ja aikavyöhyketietoisilla aikaleimoilla
+      kesäajan vaihtokin lasketaan oikein.
+    - Rivit voi syöttää suoraan lukufunktiolta (syota()), jolloin tulokset
+      saadaan tiedoston lukemisen aikana ilman koko sarjaa muistissa.
+"""
+
+from collections import deque
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import datetime, timedelta
+
+# Oletusikkunat: nimi -> leveys
+IKKUNAT: dict[str, timedelta] = {
+    "24 h": timedelta(hours=24),
+    "7 d": timedelta(days=7),
+    "30 d": timedelta(days=30),
+}
+
+# Huippu: (summa, ikkunan loppuaika, ikkunan rivien lkm)
+Huippu = tuple[float, datetime, int]
+
+
+class LiukuvaIkkuna:
+    """
+    Yhden aikaikkunan liukuvat summat sarakkeittain.
+
+    Liukulukusummat pidetään kompensoituina (Neumaier), jotta jatkuvat
+    lisäykset ja vähennykset eivät kasaa pyöristysvirhettä pitkän sarjan
+    aikana. Kokonaisluvuilla (esim. Wh) summat ovat tarkkoja.
+
+    Parametrit:
+        leveys (timedelta): Ikkunan leveys.
+        sarakkeita (int): Rivin arvojen määrä.
+
+    Attribuutit:
+        aika (datetime | None): Viimeisimmän rivin aika eli ikkunan loppu.
+        taysi (bool): True, kun ikkunasta on jo poistunut rivejä, eli data kattaa
+            koko ikkunan leveyden.
+
+    Poikkeukset:
+        ValueError: jos leveys ei ole positiivinen.
+    """
+
+    def __init__(self, leveys: timedelta, sarakkeita: int = 1) -> None:
+        if leveys <= timedelta(0):
+            raise ValueError(f"Ikkunan leveyden pitää olla positiivinen: {leveys}")
+        self.leveys = leveys
+        self.aika: datetime | None = None
+        self.taysi: bool = False
+        self._jono: deque[tuple[datetime, Sequence]] = deque()
+        self._summat: list = [0] * sarakkeita
+        self._korjaukset: list = [0] * sarakkeita
+
+    def __len__(self) -> int:
+        return len(self._jono)
+
+    def paivita(self, aika: datetime, arvot: Sequence) -> None:
+        """
+        Lisää rivin ikkunaan ja poistaa rivit, jotka jäävät ikkunan ulkopuolelle.
+
+        Poikkeukset:
+            ValueError: jos aika on aiempi kuin edellisen rivin aika.
+        """
+        if self.aika is not None and aika < self.aika:
+            raise ValueError(f"Rivit eivät ole aikajärjestyksessä: {aika} ennen {self.aika}")
+        jono = self._jono
+        jono.append((aika, arvot))
+        self._lisaa(arvot, 1)
+        raja = aika - self.leveys
+        # Juuri lisätty rivi jää aina ikkunaan, joten jono ei tyhjene
+        while jono[0][0] <= raja:
+            self._lisaa(jono.popleft()[1], -1)
+            self.taysi = True
+        self.aika = aika
+
+    def _lisaa(self, arvot: Sequence, etumerkki: int) -> None:
+        summat, korjaukset = self._summat, self._korjaukset
+        for i, arvo in enumerate(arvot):
+            x = etumerkki * arvo
+            s = summat[i]
+            t = s + x
+            if abs(s) >= abs(x):
+                korjaukset[i] += (s - t) + x
+            else:
+                korjaukset[i] += (x - t) + s
+            summat[i] = t
+
+    def summat(self) -> list:
+        """Ikkunan summat sarakkeittain."""
+        return [s + k for s, k in zip(self._summat, self._korjaukset)]
+
+    def keskiarvot(self) -> list[float]:
+        """Ikkunan keskiarvot sarakkeittain (summa / ikkunan rivien lkm; aukot eivät ole mukana)."""
+        lkm = len(self._jono)
+        return [summa / lkm for summa in self.summat()] if lkm else [0.0] * len(self._summat)
+
+
+class Liukuvat:
+    """
+    Usean ikkunan liukuvat summat ja kunkin ikkunan suurin täysi summa.
+
+    Parametrit:
+        ikkunat (dict[str, timedelta]): Ikkunan nimi -> leveys (oletus: IKKUNAT).
+        sarakkeita (int): Rivin arvojen määrä.
+
+    Attribuutit:
+        ikkunat (dict[str, LiukuvaIkkuna]): Ikkunat nimen mukaan.
+        huiput (dict[str, list[Huippu | None]]): Ikkunan nimi -> suurin täyden
+            ikkunan summa sarakkeittain (None, jos data ei kata koko ikkunaa).
+    """
+
+    def __init__(self, ikkunat: dict[str, timedelta] = IKKUNAT, sarakkeita: int = 1) -> None:
+        self.ikkunat: dict[str, LiukuvaIkkuna] = {
+            nimi: LiukuvaIkkuna(leveys, sarakkeita) for nimi, leveys in ikkunat.items()
+        }
+        self.huiput: dict[str, list[Huippu | None]] = {nimi: [None] * sarakkeita for nimi in ikkunat}
+
+    def paivita(self, aika: datetime, arvot: Sequence) -> None:
+        """Lisää rivin kaikkiin ikkunoihin ja päivittää huiput."""
+        for nimi, ikkuna in self.ikkunat.items():
+            ikkuna.paivita(aika, arvot)
+            if ikkuna.taysi:
+                huiput = self.huiput[nimi]
+                for i, summa in enumerate(ikkuna.summat()):
+                    huippu = huiput[i]
+                    if huippu is None or summa > huippu[0]:
+                        huiput[i] = (summa, aika, len(ikkuna))
+
+    def syota(self, rivit: Iterable[tuple[datetime, Sequence]]) -> Iterator[datetime]:
+        """
+        Syöttää (aika, arvot)-rivit ikkunoihin ja tuottaa kunkin rivin ajan heti
+        päivityksen jälkeen, jolloin ikkunoiden arvot vastaavat kyseistä riviä.
+        """
+        for aika, arvot in rivit:
+            self.paivita(aika, arvot)
+            yield aika
+
+    def lue(self, rivit: Iterable[tuple[datetime, Sequence]]) -> "Liukuvat":
+        """Syöttää kaikki rivit ja palauttaa itsensä."""
+        for aika, arvot in rivit:
+            self.paivita(aika, arvot)
+        return self
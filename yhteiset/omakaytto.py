@@ -0,0 +1,132 @@
+# Copyright (c) 2025 Jonna Kangas
+
+# Ohjelmoinnin perusteet -opintojakso
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# See <https://www.gnu.org/licenses/>.
+
+"""
+Tuntikohtainen omakäyttö ja ylijäämä (tuntinetotus) kulutus- ja tuotantosarakkeista.
+
+Toiminta:
+    - Tunnin omakäyttö on min(kulutus, tuotanto) ja ylijäämä (verkkoon myyty)
+      max(0, tuotanto - kulutus). Omavaraisuus on omakäytön osuus kulutuksesta.
+    - Sarakeviipaleet käsitellään kokonaisina map-operaatioina. Ylijäämätunnit
+      merkitään tavujonoon (1 = ylijäämää), josta peräkkäiset ylijäämäjaksot
+      saadaan split()/find()/strip()-operaatioilla ilman rivikohtaista haarautumista.
+    - Jaksojen tilastot yhdistetään (päivä -> kuukausi -> vuosi) yhdista()-metodilla.
+      Jakson alkuun ja loppuun osuvat ylijäämäjaksot säilytetään, joten rajan
+      yli jatkuva jakso lasketaan yhdistetyssä tilastossa yhtenä.
+"""
+
+from collections.abc import Sequence
+from datetime import datetime
+from operator import gt
+
+YLIJAAMA = b"\x01"
+
+
+class Omakaytto:
+    """
+    Yhden jakson omakäyttö- ja ylijäämätilasto.
+
+    Attribuutit:
+        tunnit (int): Tuntien (rivien) määrä.
+        kulutus, tuotanto (float): Jakson summat.
+        omakaytto (float): Σ min(kulutus, tuotanto).
+        ylijaama (float): Σ max(0, tuotanto - kulutus).
+        ylijaamatunnit (int): Tunnit, joilla tuotanto > kulutus.
+        pisin (int): Pisimmän peräkkäisen ylijäämäjakson pituus (tuntia).
+        pisimman_alku (datetime | None): Pisimmän jakson ensimmäinen tunti
+            (tasatilanteessa aikaisin).
+    """
+
+    def __init__(self) -> None:
+        self.tunnit: int = 0
+        self.kulutus: float = 0
+        self.tuotanto: float = 0
+        self.omakaytto: float = 0
+        self.ylijaama: float = 0
+        self.ylijaamatunnit: int = 0
+        self.pisin: int = 0
+        self.pisimman_alku: datetime | None = None
+        # Yhdistämistä varten: jakson ensimmäinen tunti ja reunoilla olevat ylijäämäjaksot
+        self.ensimmainen: datetime | None = None
+        self.alkuputki: int = 0
+        self.loppuputki: int = 0
+        self.loppuputken_alku: datetime | None = None
+
+    @property
+    def omavaraisuus(self) -> float:
+        """Omakäytön osuus kulutuksesta (0–1; 0, jos kulutusta ei ole)."""
+        return self.omakaytto / self.kulutus if self.kulutus else 0.0
+
+    def lisaa_sarakkeet(self, aikaleimat: Sequence[datetime], kulutus: Sequence[float],
+                        tuotanto: Sequence[float]) -> None:
+        """
+        Lisää aikajärjestyksessä seuraavan sarakeviipaleen (esim. yhden päivän tunnit).
+        """
+        n = len(aikaleimat)
+        if n == 0:
+            return
+        osa = Omakaytto()
+        osa.tunnit = n
+        osa.ensimmainen = aikaleimat[0]
+        osa.kulutus = sum(kulutus)
+        osa.tuotanto = sum(tuotanto)
+        osa.omakaytto = sum(map(min, kulutus, tuotanto))
+        # max(0, t - k) = t - min(k, t)
+        osa.ylijaama = osa.tuotanto - osa.omakaytto
+        liput = bytes(map(gt, tuotanto, kulutus))
+        osa.ylijaamatunnit = liput.count(YLIJAAMA)
+        osa.pisin = max(map(len, liput.split(b"\x00")))
+        if osa.pisin:
+            osa.pisimman_alku = aikaleimat[liput.find(YLIJAAMA * osa.pisin)]
+        osa.alkuputki = n - len(liput.lstrip(YLIJAAMA))
+        osa.loppuputki = n - len(liput.rstrip(YLIJAAMA))
+        if osa.loppuputki:
+            osa.loppuputken_alku = aikaleimat[n - osa.loppuputki]
+        self.yhdista(osa)
+
+    def yhdista(self, toinen: "Omakaytto") -> None:
+        """
+        Yhdistää aikajärjestyksessä seuraavan jakson tilaston tähän tilastoon.
+        """
+        if toinen.tunnit == 0:
+            return
+        if self.tunnit == 0:
+            self.__dict__.update(toinen.__dict__)
+            return
+        # Rajan yli jatkuva ylijäämäjakso: tämän loppu + toisen alku
+        silta = self.loppuputki + toinen.alkuputki
+        if silta > self.pisin:
+            self.pisin = silta
+            self.pisimman_alku = self.loppuputken_alku if self.loppuputki else toinen.ensimmainen
+        if toinen.pisin > self.pisin:
+            self.pisin = toinen.pisin
+            self.pisimman_alku = toinen.pisimman_alku
+        if self.alkuputki == self.tunnit:
+            self.alkuputki += toinen.alkuputki
+        if toinen.loppuputki == toinen.tunnit:
+            if not self.loppuputki:
+                self.loppuputken_alku = toinen.ensimmainen
+            self.loppuputki += toinen.loppuputki
+        else:
+            self.loppuputki = toinen.loppuputki
+            self.loppuputken_alku = toinen.loppuputken_alku
+        self.tunnit += toinen.tunnit
+        self.kulutus += toinen.kulutus
+        self.tuotanto += toinen.tuotanto
+        self.omakaytto += toinen.omakaytto
+        self.ylijaama += toinen.ylijaama
+        self.ylijaamatunnit += toinen.ylijaamatunnit
+
+
+def summasarake(*sarakkeet: Sequence[float]) -> list[float]:
+    """Sarakkeiden alkioittainen summa (esim. vaiheet yhteensä tuntinetotusta varten)."""
+    return list(map(sum, zip(*sarakkeet)))
+
@@ -0,0 +1,255 @@
+# Copyright (c) 2025 Jonna Kangas
+
+# Ohjelmoinnin perusteet -opintojakso
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# See <https://www.gnu.org/licenses/>.
+
+"""
+Pakattujen syötetiedostojen läpinäkyvä lukeminen (gzip, bz2, xz/lzma, zstd).
+
+Toiminta:
+    - Pakkausmuoto tunnistetaan tiedoston alun tunnistetavuista, ei päätteestä,
+      joten avaa_luettavaksi() käy sellaisenaan kaikkiin lukufunktioihin.
+      Pakkaamaton tiedosto avataan tavallisella open()-kutsulla.
+    - Pakattu tiedosto puretaan virtana suurina lohkoina (LOHKON_KOKO) suoraan
+      jäsentimelle; purettua tiedostoa ei kirjoiteta levylle.
+    - Purku ajetaan taustasäikeessä, joka täyttää rajallista lohkojonoa sillä
+      aikaa, kun pääsäie jäsentää rivejä. zlib, bz2 ja lzma vapauttavat GIL:n
+      purun ajaksi, joten purku ja jäsennys limittyvät moniydinkoneella.
+    - zstd vaatii Python 3.14:n compression.zstd-moduulin tai zstandard-kirjaston;
+      ne tuodaan vasta, kun zstd-tiedosto avataan.
+
+Suorituskykyvertailu:
+    python -m yhteiset.pakkaus <tiedosto> [toistot]
+"""
+
+from __future__ import annotations
+
+import io
+import sys
+from collections.abc import Callable
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import IO
+
+# Tunnistetavut -> pakkausmuoto
+TUNNISTEET: dict[bytes, str] = {
+    b"\x1f\x8b": "gzip",
+    b"BZh": "bz2",
+    b"\xfd7zXZ\x00": "xz",
+    b"\x28\xb5\x2f\xfd": "zstd",
+}
+# Pakattujen tiedostojen päätteet (hakemistoja listattaessa)
+PAKATUT_PAATTEET: tuple[str, ...] = (".gz", ".bz2", ".xz", ".zst")
+
+# Purettavan lohkon koko ja taustasäikeen jonon pituus (lohkoina)
+LOHKON_KOKO: int = 1024 * 1024
+JONON_PITUUS: int = 8
+
+
+def tunnista(tiedosto: str) -> str | None:
+    """Palauttaa tiedoston pakkausmuodon tunnistetavujen perusteella (None: pakkaamaton)."""
+    with open(tiedosto, "rb") as f:
+        alku = f.read(6)
+    for tunniste, muoto in TUNNISTEET.items():
+        if alku.startswith(tunniste):
+            return muoto
+    return None
+
+
+def _avaa_zstd(tiedosto: str) -> IO[bytes]:
+    try:
+        from compression import zstd  # Python 3.14+
+        return zstd.open(tiedosto, "rb")
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError(f"{tiedosto}: zstd-purku vaatii Python 3.14:n tai zstandard-kirjaston") from None
+    return zstandard.ZstdDecompressor().stream_reader(open(tiedosto, "rb"), closefd=True)
+
+
+def _avaa_purkaja(tiedosto: str, muoto: str) -> IO[bytes]:
+    """Avaa pakkausmuodon purkavan binäärivirran (moduulit tuodaan tarvittaessa)."""
+    if muoto == "gzip":
+        import gzip
+        return gzip.open(tiedosto, "rb")
+    if muoto == "bz2":
+        import bz2
+        return bz2.open(tiedosto, "rb")
+    if muoto == "xz":
+        import lzma
+        return lzma.open(tiedosto, "rb")
+    return _avaa_zstd(tiedosto)
+
+
+class Taustapurku(io.RawIOBase):
+    """
+    Lukee purkavaa virtaa taustasäikeessä lohko kerrallaan rajalliseen jonoon.
+
+    Säikeen poikkeus nostetaan lukijalle, kun jono on luettu siihen asti.
+    Purkajien omat virheet virheellisestä datasta (esim. zlib.error,
+    lzma.LZMAError tai katkenneen tiedoston EOFError) nostetaan OSErrorina.
+    close() pysäyttää säikeen myös kesken tiedoston.
+    """
+
+    def __init__(self, lahde: IO[bytes], lohkon_koko: int = LOHKON_KOKO, jonon_pituus: int = JONON_PITUUS) -> None:
+        # Säikeet tuodaan vasta tarvittaessa (käynnistysaika)
+        from queue import Queue
+        from threading import Event, Thread
+
+        super().__init__()
+        self._lahde = lahde
+        self._jono: Queue = Queue(jonon_pituus)
+        self._lohko = memoryview(b"")
+        self._valmis = False
+        self._lopeta = Event()
+        self._saie = Thread(target=self._pura, args=(lohkon_koko,), name="purku", daemon=True)
+        self._saie.start()
+
+    def _pura(self, lohkon_koko: int) -> None:
+        try:
+            while not self._lopeta.is_set():
+                lohko = self._lahde.read(lohkon_koko)
+                self._jono.put(lohko)
+                if not lohko:
+                    return
+        except BaseException as virhe:  # välitetään lukijalle
+            self._jono.put(virhe)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, puskuri) -> int:
+        if not self._lohko:
+            if self._valmis:
+                return 0
+            alkio = self._jono.get()
+            if isinstance(alkio, BaseException):
+                self._valmis = True
+                if isinstance(alkio, Exception) and not isinstance(alkio, OSError):
+                    raise OSError(f"Virheellinen pakattu data: {alkio}") from alkio
+                raise alkio
+            if not alkio:
+                self._valmis = True
+                return 0
+            self._lohko = memoryview(alkio)
+        n = min(len(puskuri), len(self._lohko))
+        puskuri[:n] = self._lohko[:n]
+        self._lohko = self._lohko[n:]
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            self._lopeta.set()
+            # Tyhjennetään jonoa, jotta täyteen jonoon jumittunut säie pääsee loppuun
+            while self._saie.is_alive():
+                while not self._jono.empty():
+                    self._jono.get_nowait()
+                self._saie.join(0.01)
+            self._lahde.close()
+        super().close()
+
+
+def avaa_luettavaksi(tiedosto: str, tila: str = "r", encoding: str = "utf-8", taustasaie: bool = True) -> IO:
+    """
+    Avaa tiedoston luettavaksi ja purkaa sen tarvittaessa.
+
+    Parametrit:
+        tiedosto (str): Luettava tiedosto (pakattu tai pakkaamaton).
+        tila (str): "r" (teksti) tai "rb" (tavut).
+        encoding (str): Tekstitilan merkistö.
+        taustasaie (bool): Puretaanko taustasäikeessä (False: purku lukijan säikeessä,
+            jolloin virheellinen data nostaa purkajan oman poikkeuksen).
+
+    Palauttaa:
+        IO: Tiedosto-olio, jota käytetään kuten open()-kutsun palauttamaa.
+
+    Poikkeukset:
+        ValueError: jos tila ei ole lukutila tai zstd-purkua ei ole saatavilla.
+        OSError: jos tiedostoa ei voi avata tai pakattu data on virheellistä.
+    """
+    if tila not in ("r", "rb"):
+        raise ValueError(f"Pakatun tiedoston voi avata vain lukutilassa: {tila}")
+    muoto = tunnista(tiedosto)
+    if muoto is None:
+        return open(tiedosto, "rb") if tila == "rb" else open(tiedosto, "r", encoding=encoding)
+    virta = _avaa_purkaja(tiedosto, muoto)
+    if taustasaie:
+        virta = io.BufferedReader(Taustapurku(virta), LOHKON_KOKO)
+    return virta if tila == "rb" else io.TextIOWrapper(virta, encoding=encoding)
+
+
+def _pakkaajat() -> dict[str, Callable[[str], IO[bytes]]]:
+    """Käytettävissä olevat pakkaajat suorituskykyvertailua varten."""
+    import bz2
+    import gzip
+    import lzma
+
+    pakkaajat = {
+        "gzip": lambda polku: gzip.open(polku, "wb"),
+        "bz2": lambda polku: bz2.open(polku, "wb"),
+        "xz": lambda polku: lzma.open(polku, "wb", preset=1),
+    }
+    try:
+        from compression import zstd
+        pakkaajat["zstd"] = lambda polku: zstd.open(polku, "wb")
+    except ImportError:
+        try:
+            import zstandard
+            pakkaajat["zstd"] = lambda polku: zstandard.ZstdCompressor().stream_writer(open(polku, "wb"))
+        except ImportError:
+            pass
+    return pakkaajat
+
+
+def _jasenna(tiedosto: str, taustasaie: bool) -> tuple[float, int]:
+    """Lukee ja pilkkoo tiedoston rivit (jäsennyksen vastine); palauttaa (sekunnit, rivit)."""
+    from time import perf_counter
+
+    alku = perf_counter()
+    rivit = 0
+    with avaa_luettavaksi(tiedosto, taustasaie=taustasaie) as f:
+        for rivi in f:
+            rivi.strip().split(";")
+            rivit += 1
+    return perf_counter() - alku, rivit
+
+
+def main() -> None:
+    """Vertaa pakkaamattoman ja pakattujen tiedostojen lukunopeutta säikeen kanssa ja ilman."""
+    import os
+    import shutil
+    import tempfile
+
+    if len(sys.argv) not in (2, 3):
+        print("Käyttö: python -m yhteiset.pakkaus <tiedosto> [toistot]")
+        sys.exit(2)
+    lahde = sys.argv[1]
+    toistot = int(sys.argv[2]) if len(sys.argv) == 3 else 3
+    koko = os.path.getsize(lahde)
+    print(f"{'Muoto':<8}{'Koko [MB]':>10}{'Säie [s]':>10}{'Ilman [s]':>11}{'MB/s':>8}"
+          f"  (purettu {koko / 1e6:.1f} MB)".replace(".", ","))
+    with tempfile.TemporaryDirectory() as hakemisto:
+        tiedostot = {"teksti": lahde}
+        for muoto, pakkaaja in _pakkaajat().items():
+            kohde = os.path.join(hakemisto, "data." + muoto)
+            with open(lahde, "rb") as f, pakkaaja(kohde) as g:
+                shutil.copyfileobj(f, g, LOHKON_KOKO)
+            tiedostot[muoto] = kohde
+        for muoto, tiedosto in tiedostot.items():
+            saie = min(_jasenna(tiedosto, True)[0] for _ in range(toistot))
+            ilman = min(_jasenna(tiedosto, False)[0] for _ in range(toistot))
+            print(f"{muoto:<8}{os.path.getsize(tiedosto) / 1e6:>10.1f}{saie:>10.2f}{ilman:>11.2f}"
+                  f"{koko / 1e6 / saie:>8.0f}".replace(".", ","))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+# Copyright (c) 2025 Jonna Kangas
+
+# Ohjelmoinnin perusteet -opintojakso
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# See <https://www.gnu.org/licenses/>.
+
+"""
+Valinnainen profilointi: kutsumäärät, seinä- ja prosessoriaika, käsitellyt rivit
+sekä muistihuippu (tracemalloc) funktioittain ja vaiheittain.
+
+Käyttöönotto:
+    - Ympäristömuuttuja PROFILOINTI=<tiedosto> tai komentorivilippu
+      --profiloi[=<tiedosto>] (oletustiedosto profiili.json).
+    - Tiedostopääte .folded tai .txt tuottaa liekkikaavioille sopivan
+      "pino;pino;pino mikrosekunnit" -muodon (flamegraph.pl, speedscope),
+      muut päätteet JSON-yhteenvedon.
+    - Profiili kirjoitetaan ohjelman lopussa (atexit).
+
+Käsitellyt rivit:
+    - Rivimäärä kirjataan aina erikseen: @mittaa(rivit=...) kiinteänä lukuna
+      tai argumenteista laskevana funktiona, vaihe(nimi, rivit) tai funktion
+      sisältä kirjaa_rivit(n), kun määrä selviää vasta käsittelyn aikana.
+      Paluuarvosta rivimäärää ei päätellä.
+
+Säikeet:
+    - Mittauspino on säiekohtainen, joten rinnakkain ajettavat raportit
+      (esim. kyselypalvelun säiepooli) eivät sotke toistensa kehyksiä.
+      Rekisterin päivitykset tehdään lukon alla. Muistihuippu (tracemalloc)
+      on prosessin yhteinen, joten rinnakkaisilla kutsuilla se on likiarvo.
+
+Kun profilointi ei ole päällä, @mittaa palauttaa alkuperäisen funktion
+sellaisenaan ja vaihe() palauttaa tyhjän kontekstinhallinnan, joten
+mittauksesta ei aiheudu kustannusta. Raskaat moduulit (json, tracemalloc,
+inspect, threading) tuodaan vain, kun profilointi on päällä.
+"""
+
+import os
+import sys
+from collections.abc import Callable
+from contextlib import nullcontext
+from functools import wraps
+from time import perf_counter, process_time
+
+YMPARISTOMUUTTUJA = "PROFILOINTI"
+KOMENTORIVILIPPU = "--profiloi"
+OLETUSTIEDOSTO = "profiili.json"
+
+
+def _lue_kohde() -> str | None:
+    """
+    Palauttaa profiilin kohdetiedoston tai None, jos profilointi ei ole päällä.
+
+    Komentorivilippu poistetaan sys.argv:sta, jotta ohjelman oma argumenttien
+    käsittely ei kompastu siihen.
+    """
+    for arg in sys.argv[1:]:
+        if arg == KOMENTORIVILIPPU or arg.startswith(KOMENTORIVILIPPU + "="):
+            sys.argv.remove(arg)
+            return arg.partition("=")[2] or OLETUSTIEDOSTO
+    return os.environ.get(YMPARISTOMUUTTUJA) or None
+
+
+KOHDE: str | None = _lue_kohde()
+KAYTOSSA: bool = KOHDE is not None
+
+
+class Mittaus:
+    """Yhden mitatun funktion tai vaiheen kertyneet tiedot."""
+
+    def __init__(self) -> None:
+        self.kutsut: int = 0
+        self.seinaaika: float = 0.0
+        self.prosessoriaika: float = 0.0
+        self.rivit: int = 0
+        self.huippumuisti: int = 0  # suurin kutsunaikainen muistin kasvu tavuina
+
+    def sanakirjana(self) -> dict:
+        return {
+            "kutsut": self.kutsut,
+            "seinaaika_s": round(self.seinaaika, 6),
+            "prosessoriaika_s": round(self.prosessoriaika, 6),
+            "rivit": self.rivit,
+            "huippumuisti_tavua": self.huippumuisti,
+        }
+
+
+class _Kehys:
+    """Aktiivisen mittauksen pinokehys."""
+
+    __slots__ = ("nimi", "polku", "seina", "prosessori", "lapset", "rivit", "muisti_alussa", "muistihuippu")
+
+    def __init__(self, nimi: str, polku: str) -> None:
+        self.nimi = nimi
+        self.polku = polku
+        self.lapset = 0.0
+        self.rivit = 0
+        self.muisti_alussa = 0
+        self.muistihuippu = 0
+        self.seina = perf_counter()
+        self.prosessori = process_time()
+
+
+# Rekisteri: nimi -> Mittaus, sekä pinopolku -> oma aika (s) liekkikaaviota varten
+MITTAUKSET: dict[str, Mittaus] = {}
+PINOT: dict[str, float] = {}
+
+
+def _pino() -> list[_Kehys]:
+    """Nykyisen säikeen mittauspino."""
+    pino = getattr(_saikeet, "pino", None)
+    if pino is None:
+        pino = _saikeet.pino = []
+    return pino
+
+
+def _aloita(nimi: str) -> _Kehys:
+    pino = _pino()
+    kehys = _Kehys(nimi, f"{pino[-1].polku};{nimi}" if pino else nimi)
+    nykyinen, huippu = tracemalloc.get_traced_memory()
+    if pino:
+        # Talletetaan vanhemman huippu ennen nollausta, ettei se katoa
+        pino[-1].muistihuippu = max(pino[-1].muistihuippu, huippu)
+    tracemalloc.reset_peak()
+    kehys.muisti_alussa = nykyinen
+    kehys.muistihuippu = nykyinen
+    pino.append(kehys)
+    return kehys
+
+
+def _lopeta(kehys: _Kehys) -> None:
+    seinaaika = perf_counter() - kehys.seina
+    prosessoriaika = process_time() - kehys.prosessori
+    _, huippu = tracemalloc.get_traced_memory()
+    huippu = max(kehys.muistihuippu, huippu)
+    pino = _pino()
+    pino.pop()
+    if pino:
+        pino[-1].lapset += seinaaika
+        pino[-1].muistihuippu = max(pino[-1].muistihuippu, huippu)
+
+    with _lukko:
+        mittaus = MITTAUKSET.get(kehys.nimi)
+        if mittaus is None:
+            mittaus = MITTAUKSET[kehys.nimi] = Mittaus()
+        mittaus.kutsut += 1
+        mittaus.seinaaika += seinaaika
+        mittaus.prosessoriaika += prosessoriaika
+        mittaus.rivit += kehys.rivit
+        mittaus.huippumuisti = max(mittaus.huippumuisti, huippu - kehys.muisti_alussa)
+        PINOT[kehys.polku] = PINOT.get(kehys.polku, 0.0) + seinaaika - kehys.lapset
+
+
+def kirjaa_rivit(rivit: int | Callable[[], int]) -> None:
+    """
+    Lisää käsiteltyjä rivejä nykyisen säikeen sisimmälle mittaukselle.
+
+    Käytetään, kun rivimäärä selviää vasta funktion sisällä (esim. luettu
+    tiedosto tai raportin aikaväli). Jos määrän laskeminen maksaa (esim.
+    kantakysely), annetaan funktio, jota kutsutaan vain profiloitaessa.
+    Ei tee mitään, kun profilointi ei ole päällä.
+    """
+    if KAYTOSSA:
+        pino = _pino()
+        if pino:
+            pino[-1].rivit += rivit() if callable(rivit) else rivit
+
+
+def mittaa(nimi: str | None = None, rivit: int | Callable[..., int] | None = None) -> Callable:
+    """
+    Dekoraattori, joka rekisteröi funktion mittaukset nimellä (oletus: funktion nimi).
+
+    Parametrit:
+        nimi (str | None): Mittauksen nimi rekisterissä.
+        rivit (int | Callable | None): Käsitellyt rivit kutsua kohden: kiinteä
+            luku tai funktio, joka saa samat argumentit kuin mitattava funktio
+            ja palauttaa syöterivien määrän. None: vain funktion sisällä
+            kirjaa_rivit()-kutsuilla kirjatut rivit.
+
+    Rivikohtaisia funktioita (esim. rivinmuuntimet) ei koristella: kutsun
+    mittaus maksaa enemmän kuin muunnos. Niiden silmukka mitataan lataajassa
+    yhtenä vaihe()-lohkona.
+
+    Generaattorifunktioilla mitataan koko läpikäynti ensimmäisestä rivistä
+    viimeiseen.
+    """
+    def dekoraattori(funktio: Callable) -> Callable:
+        if not KAYTOSSA:
+            return funktio
+        from inspect import isgeneratorfunction
+
+        mittausnimi = nimi or funktio.__name__
+
+        def aloita(args: tuple, kwargs: dict) -> _Kehys:
+            kehys = _aloita(mittausnimi)
+            if rivit is not None:
+                kehys.rivit += rivit(*args, **kwargs) if callable(rivit) else rivit
+            return kehys
+
+        if isgeneratorfunction(funktio):
+            @wraps(funktio)
+            def generaattori(*args, **kwargs):
+                kehys = aloita(args, kwargs)
+                try:
+                    yield from funktio(*args, **kwargs)
+                finally:
+                    _lopeta(kehys)
+            return generaattori
+
+        @wraps(funktio)
+        def kaare(*args, **kwargs):
+            kehys = aloita(args, kwargs)
+            try:
+                return funktio(*args, **kwargs)
+            finally:
+                _lopeta(kehys)
+        return kaare
+    return dekoraattori
+
+
+class _Vaihe:
+    """Kontekstinhallinta nimetyn koodilohkon mittaamiseen."""
+
+    def __init__(self, nimi: str, rivit: int) -> None:
+        self.nimi = nimi
+        self.rivit = rivit
+
+    def __enter__(self) -> "_Vaihe":
+        self._kehys = _aloita(self.nimi)
+        self._kehys.rivit = self.rivit
+        return self
+
+    def __exit__(self, *_) -> None:
+        _lopeta(self._kehys)
+
+
+def vaihe(nimi: str, rivit: int = 0):
+    """
+    Mittaa with-lohkon nimellä nimi, esim. ``with vaihe("muotoilu"): ...``.
+
+    Palauttaa tyhjän kontekstinhallinnan, kun profilointi ei ole päällä.
+    """
+    if not KAYTOSSA:
+        return nullcontext()
+    return _Vaihe(nimi, rivit)
+
+
+def kirjoita_profiili(kohde: str) -> None:
+    """
+    Kirjoittaa kertyneet mittaukset tiedostoon.
+
+    Muoto valitaan päätteen mukaan: .folded/.txt -> liekkikaavion pinot
+    (oma aika mikrosekunteina), muuten JSON.
+    """
+    if kohde.endswith((".folded", ".txt")):
+        with _lukko, open(kohde, "w", encoding="utf-8") as f:
+            for polku, aika in sorted(PINOT.items()):
+                f.write(f"{polku} {max(0, round(aika * 1_000_000))}\n")
+        return
+
+    import json
+    with _lukko, open(kohde, "w", encoding="utf-8") as f:
+        json.dump({
+            "ohjelma": sys.argv[0],
+            "funktiot": {nimi: mittaus.sanakirjana() for nimi, mittaus in MITTAUKSET.items()},
+            "pinot_s": {polku: round(aika, 6) for polku, aika in PINOT.items()},
+        }, f, ensure_ascii=False, indent=2)
+
+
+if KAYTOSSA:
+    import atexit
+    import threading
+    import tracemalloc
+
+    _saikeet = threading.local()
+    _lukko = threading.Lock()
+
+    tracemalloc.start()
+    atexit.register(kirjoita_profiili, KOHDE)
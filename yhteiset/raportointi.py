@@ -0,0 +1,76 @@
+# Copyright (c) 2025 Jonna Kangas
+
+# Ohjelmoinnin perusteet -opintojakso
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# See <https://www.gnu.org/licenses/>.
+
+"""
+Valmiiksi käännetyt raporttipohjat desimaalipilkulla.
+
+Sen sijaan, että jokainen luku muotoillaan erikseen muodossa
+f"{x:.2f}".replace(".", ","), pohja muotoilee kaikki rivin (tai raportin)
+luvut yhdellä str.format-kutsulla ja vaihtaa pisteet pilkuiksi yhdellä
+str.translate-kutsulla. Pohjan muotoilumerkkijono kootaan vain kerran.
+"""
+
+from collections.abc import Sequence
+
+# Sama jäsennin kuin string.Formatter().parse(), mutta string-moduuli tuo mukanaan re-moduulin (~5 ms)
+from _string import formatter_parser
+
+# Desimaalipiste -> desimaalipilkku yhdellä translate-kutsulla
+PILKKU = str.maketrans(".", ",")
+
+
+class Lukupohja:
+    """
+    Muotoilupohja, jonka luvut tulostetaan desimaalipilkulla.
+
+    Parametrit:
+        pohja (str): str.format-pohja, esim. "- kokonaiskulutus: {:.2f} kWh\\n".
+
+    Poikkeukset:
+        ValueError: jos pohjan kiinteässä tekstissä on piste, koska translate
+            muuttaisi senkin pilkuksi. Pisteellisen tekstin (esim. päivämäärät)
+            voi liittää tulokseen erikseen.
+    """
+
+    def __init__(self, pohja: str) -> None:
+        for teksti, _, _, _ in formatter_parser(pohja):
+            if "." in teksti:
+                raise ValueError(f"Lukupohjan kiinteässä tekstissä ei saa olla pistettä: {teksti!r}")
+        self.pohja: str = pohja
+        self._muotoile = pohja.format
+
+    def __call__(self, *luvut, **nimetyt) -> str:
+        """Muotoilee luvut pohjaan ja vaihtaa desimaalipisteet pilkuiksi."""
+        return self._muotoile(*luvut, **nimetyt).translate(PILKKU)
+
+
+class Rivipohja:
+    """
+    Kiinteäleveyksinen taulukkorivi: ensin tekstisarakkeet, sitten lukusarakkeet.
+
+    Parametrit:
+        tekstileveydet (Sequence[int]): Vasemmalle tasattujen tekstisarakkeiden leveydet.
+        lukuleveydet (Sequence[int]): Vasemmalle tasattujen lukusarakkeiden leveydet.
+        desimaalit (int): Lukujen desimaalien määrä (oletus 2).
+
+    Esimerkki:
+        pohja = Rivipohja([13, 13], [8] * 6)
+        pohja.muotoile(["maanantai", "06.10.2025"], [9.85, 4.1, 2.74, 0.16, 0.36, 0.81])
+    """
+
+    def __init__(self, tekstileveydet: Sequence[int], lukuleveydet: Sequence[int], desimaalit: int = 2) -> None:
+        self._tekstit = "".join(f"{{:<{leveys}}}" for leveys in tekstileveydet).format
+        self._luvut = Lukupohja("".join(f"{{:<{leveys}.{desimaalit}f}}" for leveys in lukuleveydet))
+        self.leveys: int = sum(tekstileveydet) + sum(lukuleveydet)
+
+    def muotoile(self, tekstit: Sequence[str], luvut: Sequence[float]) -> str:
+        """Palauttaa valmiin rivin (ilman rivinvaihtoa)."""
+        return self._tekstit(*tekstit) + self._luvut(*luvut)
@@ -0,0 +1,234 @@
+# Copyright (c) 2025 Jonna Kangas
+
+# Ohjelmoinnin perusteet -opintojakso
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# See <https://www.gnu.org/licenses/>.
+
+"""
+Raporttien kirjoittaminen tiedostoihin atomisesti ja suurina kirjoituksina.
+
+Toiminta:
+    - Raportti kirjoitetaan ensin väliaikaiseen tiedostoon kohteen viereen ja
+      vaihdetaan kohteen tilalle os.replace()-kutsulla. Kesken kaatunut ajo ei
+      siis jätä puolikasta raporttia; kohteessa on joko vanha tai uusi versio.
+    - Tiedosto avataan suurella puskurilla (PUSKURIN_KOKO), joten raportin
+      rivit (esim. generaattorilta) päätyvät levylle harvoina suurina kirjoituksina.
+    - Raporttikohde kirjoittaa useita raportteja nimettyihin tiedostoihin.
+      Kirjoitussäikeen kanssa pääsäie muotoilee seuraavaa raporttia sillä aikaa,
+      kun edellinen kirjoitetaan; jono on rajallinen, joten muistissa on
+      kerrallaan enintään JONON_PITUUS lohkoa.
+
+Käyttöönotto:
+    - Komentorivilippu --raportit[=<hakemisto>] (oletus: raportit) ohjelmissa,
+      jotka kirjoittavat raporttisarjan omiin tiedostoihinsa.
+"""
+
+import os
+import sys
+from collections.abc import Iterable
+from itertools import count
+
+KOMENTORIVILIPPU = "--raportit"
+OLETUSHAKEMISTO = "raportit"
+
+PUSKURIN_KOKO: int = 1024 * 1024
+JONON_PITUUS: int = 16
+
+# Väliaikaisten tiedostojen yksilöivä laskuri (prosessin sisällä)
+_laskuri = count()
+
+
+def lue_raporttihakemisto() -> str | None:
+    """
+    Palauttaa raporttien kohdehakemiston tai None, jos lippua ei ole annettu.
+
+    Komentorivilippu poistetaan sys.argv:sta. Pelkkä --raportit käyttää oletushakemistoa.
+    """
+    for arg in sys.argv[1:]:
+        if arg == KOMENTORIVILIPPU or arg.startswith(KOMENTORIVILIPPU + "="):
+            sys.argv.remove(arg)
+            return arg.partition("=")[2] or OLETUSHAKEMISTO
+    return None
+
+
+def _valiaikainen(polku: str) -> str:
+    hakemisto, nimi = os.path.split(polku)
+    return os.path.join(hakemisto, f".{nimi}.{os.getpid()}.{next(_laskuri)}.tmp")
+
+
+def kirjoita_atomisesti(polku: str, osat: str | bytes | Iterable, binaari: bool = False,
+                        puskurin_koko: int = PUSKURIN_KOKO) -> None:
+    """
+    Kirjoittaa tiedoston kokonaan tai ei lainkaan.
+
+    Parametrit:
+        polku (str): Kohdetiedosto; olemassa oleva tiedosto korvataan.
+        osat (str | bytes | Iterable): Sisältö yhtenä tekstinä tai osina
+            (esim. raporttirivien generaattori).
+        binaari (bool): Kirjoitetaanko tavuja (True) vai UTF-8-tekstiä.
+        puskurin_koko (int): Kirjoituspuskurin koko tavuina.
+
+    Poikkeukset:
+        OSError: jos kirjoittaminen epäonnistuu; väliaikainen tiedosto poistetaan
+            ja kohde jää ennalleen. Myös osien tuottamisen poikkeus välitetään.
+    """
+    if isinstance(osat, (str, bytes)):
+        osat = (osat,)
+    valiaikainen = _valiaikainen(polku)
+    try:
+        # "x": uusi tiedosto oletusoikeuksin (umask), ei koskaan toisen ajon väliaikaistiedosto
+        if binaari:
+            with open(valiaikainen, "xb", buffering=puskurin_koko) as f:
+                f.writelines(osat)
+        else:
+            with open(valiaikainen, "x", encoding="utf-8", buffering=puskurin_koko) as f:
+                f.writelines(osat)
+        os.replace(valiaikainen, polku)
+    except BaseException:
+        try:
+            os.remove(valiaikainen)
+        except OSError:
+            pass
+        raise
+
+
+def _lohkot(osat: Iterable[str], koko: int) -> Iterable[str]:
+    """Yhdistää osat vähintään koko merkin lohkoiksi (viimeinen voi olla lyhyempi)."""
+    puskuri: list[str] = []
+    pituus = 0
+    for osa in osat:
+        puskuri.append(osa)
+        pituus += len(osa)
+        if pituus >= koko:
+            yield "".join(puskuri)
+            puskuri.clear()
+            pituus = 0
+    if puskuri:
+        yield "".join(puskuri)
+
+
+class Raporttikohde:
+    """
+    Kirjoittaa useita raportteja nimettyihin tiedostoihin hakemiston alle.
+
+    Jokainen raportti kirjoitetaan atomisesti (ks. kirjoita_atomisesti()).
+    Käytetään with-lauseessa tai suljetaan sulje()-kutsulla, joka odottaa
+    jonossa olevat kirjoitukset.
+
+    Parametrit:
+        hakemisto (str): Kohdehakemisto (luodaan tarvittaessa).
+        kirjoitussaie (bool): Kirjoitetaanko erillisessä säikeessä.
+        puskurin_koko (int): Kirjoituspuskurin ja jonon lohkon koko.
+
+    Attribuutit:
+        tiedostot (list[str]): Kirjoitettaviksi annetut tiedostot annetussa järjestyksessä.
+
+    Poikkeukset:
+        OSError: Kirjoitussäikeen virhe nostetaan seuraavassa kirjoita()- tai
+            sulje()-kutsussa; virheen jälkeen uusia raportteja ei kirjoiteta.
+    """
+
+    def __init__(self, hakemisto: str = ".", kirjoitussaie: bool = False,
+                 puskurin_koko: int = PUSKURIN_KOKO) -> None:
+        self.hakemisto = hakemisto
+        self.puskurin_koko = puskurin_koko
+        self.tiedostot: list[str] = []
+        self._hakemistot: set[str] = set()
+        self._virhe: BaseException | None = None
+        self._jono = None
+        self._saie = None
+        if kirjoitussaie:
+            # Säikeet tuodaan vasta tarvittaessa (käynnistysaika)
+            from queue import Queue
+            from threading import Thread
+
+            self._jono = Queue(JONON_PITUUS)
+            self._saie = Thread(target=self._kirjoittaja, name="raporttikohde", daemon=True)
+            self._saie.start()
+
+    def __enter__(self) -> "Raporttikohde":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.sulje()
+
+    def _polku(self, nimi: str) -> str:
+        polku = os.path.join(self.hakemisto, nimi)
+        hakemisto = os.path.dirname(polku)
+        if hakemisto not in self._hakemistot:
+            if hakemisto:
+                os.makedirs(hakemisto, exist_ok=True)
+            self._hakemistot.add(hakemisto)
+        return polku
+
+    def kirjoita(self, nimi: str, osat: str | Iterable[str]) -> None:
+        """
+        Kirjoittaa raportin tiedostoon nimi (suhteessa hakemistoon).
+
+        Osat (esim. generaattori) käydään läpi tässä säikeessä; kirjoitussäikeen
+        kanssa ne välitetään kirjoittajalle puskurin kokoisina lohkoina.
+        """
+        if self._virhe is not None:
+            raise self._virhe
+        polku = self._polku(nimi)
+        self.tiedostot.append(polku)
+        if self._jono is None:
+            kirjoita_atomisesti(polku, osat, puskurin_koko=self.puskurin_koko)
+            return
+        if isinstance(osat, str):
+            osat = (osat,)
+        try:
+            for lohko in _lohkot(osat, self.puskurin_koko):
+                self._jono.put((polku, lohko))
+        except BaseException:
+            self._jono.put((polku, False))  # keskeytetty raportti: väliaikainen tiedosto poistetaan
+            raise
+        self._jono.put((polku, None))
+
+    def _kirjoittaja(self) -> None:
+        """Kirjoitussäie: (polku, lohko) lisää, (polku, None) valmis, (polku, False) peru, None lopeta."""
+        polku = valiaikainen = f = None
+        while (viesti := self._jono.get()) is not None:
+            uusi_polku, lohko = viesti
+            if self._virhe is not None:
+                continue
+            try:
+                if f is None:
+                    polku, valiaikainen = uusi_polku, _valiaikainen(uusi_polku)
+                    f = open(valiaikainen, "x", encoding="utf-8", buffering=self.puskurin_koko)
+                if isinstance(lohko, str):
+                    f.write(lohko)
+                    continue
+                f.close()
+                f = None
+                if lohko is None:
+                    os.replace(valiaikainen, polku)
+                else:
+                    os.remove(valiaikainen)
+            except BaseException as virhe:
+                self._virhe = virhe
+                if f is not None:
+                    try:
+                        f.close()
+                    except OSError:
+                        pass
+                    f = None
+                try:
+                    os.remove(valiaikainen)
+                except OSError:
+                    pass
+
+    def sulje(self) -> None:
+        """Odottaa jonossa olevat kirjoitukset ja nostaa mahdollisen kirjoitusvirheen."""
+        if self._saie is not None:
+            self._jono.put(None)
+            self._saie.join()
+            self._saie = None
+            self._jono = None
+        if self._virhe is not None:
+            raise self._virhe
@@ -0,0 +1,315 @@
+# Copyright (c) 2025 Jonna Kangas
+
+# Ohjelmoinnin perusteet -opintojakso
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# See <https://www.gnu.org/licenses/>.
+
+"""
+Valinnainen SQLite-varasto tuntimittauksille ja varauksille.
+
+Toiminta:
+    - Tekstitiedostot (2025.csv, varaukset.txt) ovat edelleen tuontilähteitä:
+      ne jäsennetään olemassa olevilla lukufunktioilla ja tuodaan kantaan
+      yhdessä transaktiossa (executemany, WAL-tila).
+    - Lähdetiedoston koko ja muokkausaika talletetaan tauluun lahteet. Jos
+      tiedosto ei ole muuttunut, kanta on ajan tasalla eikä tiedostoa jäsennetä,
+      joten käynnistys ei riipu tiedoston koosta.
+    - Raporttien summat, lukumäärät, huiput ja histogrammit lasketaan
+      SQL-koosteina indeksoiduista tauluista.
+
+Käyttöönotto:
+    - Komentorivilippu --sqlite[=<tiedosto>] tai ympäristömuuttuja SQLITEKANTA=<tiedosto>.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from collections.abc import Iterable, Iterator, Sequence
+
+# sqlite3 (~5 ms) tuodaan vasta avaa()-kutsussa, jotta ohjelmat käynnistyvät
+# nopeasti silloin, kun kantaa ei käytetä. Tyyppitarkistimet tunnistavat
+# TYPE_CHECKING-nimen ilman typing-tuontia.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    import sqlite3
+
+YMPARISTOMUUTTUJA = "SQLITEKANTA"
+KOMENTORIVILIPPU = "--sqlite"
+
+KAAVA = """
+CREATE TABLE IF NOT EXISTS lahteet (
+    taulu TEXT PRIMARY KEY,
+    tiedosto TEXT NOT NULL,
+    koko INTEGER NOT NULL,
+    muokattu INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS tuntimittaukset (
+    aika TEXT NOT NULL,          -- ISO 8601, aikavyöhykkeen offset säilyy
+    paiva TEXT NOT NULL,         -- aikaleiman oma päivämäärä YYYY-MM-DD
+    kuukausi INTEGER NOT NULL,
+    kulutus REAL NOT NULL,       -- kWh
+    tuotanto REAL NOT NULL,      -- kWh
+    lampotila REAL NOT NULL      -- °C
+);
+CREATE INDEX IF NOT EXISTS tuntimittaukset_aika ON tuntimittaukset(aika);
+CREATE INDEX IF NOT EXISTS tuntimittaukset_paiva ON tuntimittaukset(paiva);
+CREATE INDEX IF NOT EXISTS tuntimittaukset_kuukausi ON tuntimittaukset(kuukausi);
+
+CREATE TABLE IF NOT EXISTS varaukset (
+    id INTEGER NOT NULL,
+    nimi TEXT NOT NULL,
+    sahkoposti TEXT NOT NULL,
+    puhelinnumero TEXT NOT NULL,
+    paivamaara TEXT NOT NULL,    -- YYYY-MM-DD
+    kellonaika TEXT NOT NULL,    -- HH:MM
+    kesto INTEGER NOT NULL,      -- tuntia
+    tuntihinta REAL NOT NULL,
+    vahvistettu INTEGER NOT NULL,
+    varauskohde TEXT NOT NULL,
+    luotu TEXT NOT NULL          -- YYYY-MM-DD HH:MM:SS
+);
+CREATE INDEX IF NOT EXISTS varaukset_paivamaara ON varaukset(paivamaara, kellonaika);
+CREATE INDEX IF NOT EXISTS varaukset_varauskohde ON varaukset(varauskohde);
+CREATE INDEX IF NOT EXISTS varaukset_vahvistettu ON varaukset(vahvistettu);
+"""
+
+# Taulujen sarakkeet tuontijärjestyksessä
+TUNTIMITTAUSTEN_SARAKKEET: tuple[str, ...] = ("aika", "paiva", "kuukausi", "kulutus", "tuotanto", "lampotila")
+VARAUSTEN_SARAKKEET: tuple[str, ...] = (
+    "id", "nimi", "sahkoposti", "puhelinnumero", "paivamaara", "kellonaika",
+    "kesto", "tuntihinta", "vahvistettu", "varauskohde", "luotu",
+)
+
+# Sallitut raporttisarakkeet (sarakenimiä ei voi välittää SQL-parametreina)
+LUKUSARAKKEET: tuple[str, ...] = ("kulutus", "tuotanto", "lampotila", "kesto", "tuntihinta")
+
+
+def lue_kantapolku(oletus: str) -> str | None:
+    """
+    Palauttaa kantatiedoston polun tai None, jos SQLite-varasto ei ole käytössä.
+
+    Komentorivilippu poistetaan sys.argv:sta, jotta ohjelman oma argumenttien
+    käsittely ei kompastu siihen. Pelkkä --sqlite käyttää oletustiedostoa.
+    """
+    for arg in sys.argv[1:]:
+        if arg == KOMENTORIVILIPPU or arg.startswith(KOMENTORIVILIPPU + "="):
+            sys.argv.remove(arg)
+            return arg.partition("=")[2] or oletus
+    return os.environ.get(YMPARISTOMUUTTUJA) or None
+
+
+def avaa(polku: str) -> sqlite3.Connection:
+    """
+    Avaa (tai luo) kannan WAL-tilassa ja varmistaa taulut ja indeksit.
+
+    WAL-tilassa lukijat eivät odota kirjoittajaa, ja synchronous=NORMAL riittää
+    kannalle, jonka sisällön voi aina tuoda uudelleen lähdetiedostosta.
+    """
+    import sqlite3
+
+    yhteys = sqlite3.connect(polku)
+    yhteys.execute("PRAGMA journal_mode=WAL")
+    yhteys.execute("PRAGMA synchronous=NORMAL")
+    yhteys.executescript(KAAVA)
+    return yhteys
+
+
+def _tiedoston_tunniste(tiedosto: str) -> tuple[int, int]:
+    tiedot = os.stat(tiedosto)
+    return tiedot.st_size, tiedot.st_mtime_ns
+
+
+def ajan_tasalla(yhteys: sqlite3.Connection, taulu: str, tiedosto: str) -> bool:
+    """
+    Palauttaa True, jos taulu on tuotu tiedostosta eikä tiedosto ole sen jälkeen muuttunut.
+
+    Vain tiedoston koko ja muokkausaika tarkistetaan (os.stat), sisältöä ei lueta.
+    """
+    rivi = yhteys.execute(
+        "SELECT tiedosto, koko, muokattu FROM lahteet WHERE taulu = ?", (taulu,)
+    ).fetchone()
+    return rivi is not None and rivi == (tiedosto, *_tiedoston_tunniste(tiedosto))
+
+
+def tuo(yhteys: sqlite3.Connection, taulu: str, tiedosto: str, sarakkeet: Sequence[str], rivit: Iterable[tuple]) -> int:
+    """
+    Korvaa taulun sisällön annetuilla riveillä yhdessä transaktiossa.
+
+    Parametrit:
+        yhteys (sqlite3.Connection): Funktiolla avaa() avattu kanta.
+        taulu (str): "tuntimittaukset" tai "varaukset".
+        tiedosto (str): Lähdetiedosto, jonka koko ja muokkausaika talletetaan.
+        sarakkeet (Sequence[str]): Rivien sarakkeet (TUNTIMITTAUSTEN_SARAKKEET tai VARAUSTEN_SARAKKEET).
+        rivit (Iterable[tuple]): Tuotavat rivit sarakkeiden järjestyksessä.
+
+    Palauttaa:
+        int: Tuotujen rivien määrä.
+
+    Poikkeukset:
+        ValueError: jos taulu ei ole tuettu.
+    """
+    if taulu not in ("tuntimittaukset", "varaukset"):
+        raise ValueError(f"Tuntematon taulu: {taulu}")
+    lisays = f"INSERT INTO {taulu} ({', '.join(sarakkeet)}) VALUES ({', '.join('?' * len(sarakkeet))})"
+    with yhteys:  # yksi transaktio: onnistuu kokonaan tai ei lainkaan
+        yhteys.execute(f"DELETE FROM {taulu}")
+        lkm = yhteys.executemany(lisays, rivit).rowcount
+        yhteys.execute(
+            "INSERT OR REPLACE INTO lahteet (taulu, tiedosto, koko, muokattu) VALUES (?, ?, ?, ?)",
+            (taulu, tiedosto, *_tiedoston_tunniste(tiedosto)),
+        )
+    return lkm
+
+
+def jakson_summat(yhteys: sqlite3.Connection, ehto: str = "1", parametrit: Sequence = ()) -> tuple[float, float, float, int]:
+    """
+    Laskee tuntimittausten summat ehdon rajaamalta jaksolta.
+
+    Parametrit:
+        ehto (str): Ohjelman kiinteä WHERE-ehto, esim. "paiva BETWEEN ? AND ?".
+            Käyttäjän syötteet välitetään aina parametreina.
+        parametrit (Sequence): Ehdon parametrit.
+
+    Palauttaa:
+        tuple: (kulutus kWh, tuotanto kWh, lämpötilojen summa, tuntien lkm).
+    """
+    kulutus, tuotanto, lampotila, lkm = yhteys.execute(
+        f"SELECT TOTAL(kulutus), TOTAL(tuotanto), TOTAL(lampotila), COUNT(*) FROM tuntimittaukset WHERE {ehto}",
+        parametrit,
+    ).fetchone()
+    return kulutus, tuotanto, lampotila, lkm
+
+
+def sarakkeen_tilasto(yhteys: sqlite3.Connection, sarake: str, lokeron_leveys: float,
+                      ehto: str = "1", parametrit: Sequence = ()) -> tuple[int, float | None, float | None, str | None, dict[int, int]]:
+    """
+    Laskee tuntimittaussarakkeen tilaston SQL-koosteina.
+
+    Palauttaa:
+        tuple: (lkm, pienin, suurin, suurimman arvon aika ISO-muodossa, histogrammi).
+        Histogrammi on harva sanakirja lokeron indeksi -> lukumäärä. Jos suurin arvo
+        esiintyy useasti, palautetaan ensimmäinen (rivit on tuotu aikajärjestyksessä).
+
+    Poikkeukset:
+        ValueError: jos sarake ei ole tuettu.
+    """
+    if sarake not in LUKUSARAKKEET:
+        raise ValueError(f"Tuntematon sarake: {sarake}")
+    lkm, pienin = yhteys.execute(
+        f"SELECT COUNT(*), MIN({sarake}) FROM tuntimittaukset WHERE {ehto}", parametrit
+    ).fetchone()
+    if lkm == 0:
+        return 0, None, None, None, {}
+    suurin, aika = yhteys.execute(
+        f"SELECT {sarake}, aika FROM tuntimittaukset WHERE {ehto} ORDER BY {sarake} DESC, rowid LIMIT 1",
+        parametrit,
+    ).fetchone()
+    lokerot = dict(yhteys.execute(
+        f"SELECT CAST(round({sarake} / ?) AS INTEGER) AS lokero, COUNT(*) "
+        f"FROM tuntimittaukset WHERE {ehto} GROUP BY lokero",
+        (lokeron_leveys, *parametrit),
+    ).fetchall())
+    return lkm, pienin, suurin, aika, lokerot
+
+
+def omakayton_koosteet(yhteys: sqlite3.Connection, ehto: str = "1", parametrit: Sequence = ()) -> tuple:
+    """
+    Laskee jakson tuntikohtaisen omakäytön ja ylijäämän SQL-koosteina.
+
+    Pisin ylijäämäjakso haetaan saarihakuna: peräkkäisillä ylijäämätunneilla
+    rowid - ROW_NUMBER() on sama, joten jaksot ovat GROUP BY -ryhmiä.
+
+    Palauttaa:
+        tuple: (tuntien lkm, kulutus, tuotanto, omakäyttö, ylijäämätunnit,
+        pisimmän ylijäämäjakson pituus, sen ensimmäinen tunti ISO-muodossa tai None).
+    """
+    lkm, kulutus, tuotanto, omakaytto, ylijaamatunnit = yhteys.execute(
+        f"SELECT COUNT(*), TOTAL(kulutus), TOTAL(tuotanto), TOTAL(MIN(kulutus, tuotanto)), "
+        f"COUNT(*) FILTER (WHERE tuotanto > kulutus) FROM tuntimittaukset WHERE {ehto}",
+        parametrit,
+    ).fetchone()
+    # Paljas sarake aika MIN(rowid)-koosteen kanssa on SQLitessä saman rivin arvo
+    pisin = yhteys.execute(
+        f"SELECT COUNT(*), aika, MIN(rowid) FROM ("
+        f"SELECT aika, rowid, rowid - ROW_NUMBER() OVER (ORDER BY rowid) AS saari "
+        f"FROM tuntimittaukset WHERE ({ehto}) AND tuotanto > kulutus) "
+        f"GROUP BY saari ORDER BY COUNT(*) DESC, MIN(rowid) LIMIT 1",
+        parametrit,
+    ).fetchone()
+    return (lkm, kulutus, tuotanto, omakaytto, ylijaamatunnit, *(pisin[:2] if pisin else (0, None)))
+
+
+def vuorokaudet(yhteys: sqlite3.Connection) -> list[tuple[str, float, float]]:
+    """
+    Palauttaa vuorokausikoosteet päivän mukaan järjestettynä.
+
+    Palauttaa:
+        list[tuple]: (päivä YYYY-MM-DD, kulutus kWh, keskilämpötila °C).
+    """
+    return yhteys.execute(
+        "SELECT paiva, TOTAL(kulutus), AVG(lampotila) FROM tuntimittaukset GROUP BY paiva ORDER BY paiva"
+    ).fetchall()
+
+
+def hae_tuntisarakkeet(yhteys: sqlite3.Connection, sarakkeet: Sequence[str]) -> Iterator[tuple]:
+    """
+    Hakee tuntimittausten aikaleimat ja annetut sarakkeet aikajärjestyksessä.
+
+    Rivit haetaan kursorilta yksi kerrallaan, joten esim. liukuvat summat voi
+    laskea lataamatta koko taulua muistiin.
+
+    Palauttaa:
+        Iterator[tuple]: (aika ISO-muodossa, sarakkeiden arvot...).
+
+    Poikkeukset:
+        ValueError: jos jokin sarake ei ole tuettu.
+    """
+    for sarake in sarakkeet:
+        if sarake not in LUKUSARAKKEET:
+            raise ValueError(f"Tuntematon sarake: {sarake}")
+    # Rivit on tuotu aikajärjestyksessä, joten rowid-järjestys on aikajärjestys
+    return yhteys.execute(f"SELECT aika, {', '.join(sarakkeet)} FROM tuntimittaukset ORDER BY rowid")
+
+
+def hae_varausrivit(yhteys: sqlite3.Connection, ehto: str = "1", parametrit: Sequence = ()) -> list[list[str]]:
+    """
+    Hakee ehdon rajaamat varaukset tekstikenttinä tiedoston kenttäjärjestyksessä.
+
+    Palauttaa:
+        list[list[str]]: Rivit samassa muodossa kuin varaukset.txt:n '|'-eroteltu rivi,
+        joten ne voi muuntaa samalla muunnosfunktiolla kuin tiedoston rivit.
+    """
+    valinta = ", ".join(
+        "CASE vahvistettu WHEN 1 THEN 'true' ELSE 'false' END" if sarake == "vahvistettu"
+        else f"CAST({sarake} AS TEXT)"
+        for sarake in VARAUSTEN_SARAKKEET
+    )
+    return [list(rivi) for rivi in yhteys.execute(f"SELECT {valinta} FROM varaukset WHERE {ehto} ORDER BY rowid", parametrit)]
+
+
+def varausten_koosteet(yhteys: sqlite3.Connection) -> tuple[int, int, float]:
+    """
+    Palauttaa (vahvistettujen lkm, ei-vahvistettujen lkm, vahvistettujen kokonaistulot €).
+    """
+    vahvistetut, ei_vahvistetut, tulot = yhteys.execute(
+        "SELECT COUNT(*) FILTER (WHERE vahvistettu), COUNT(*) FILTER (WHERE NOT vahvistettu), "
+        "TOTAL(kesto * tuntihinta) FILTER (WHERE vahvistettu) FROM varaukset"
+    ).fetchone()
+    return vahvistetut, ei_vahvistetut, tulot
+
+
+def varaukset_kohteittain(yhteys: sqlite3.Connection) -> list[tuple[str, int, int]]:
+    """
+    Palauttaa (varauskohde, varausten lkm, vahvistettujen lkm) kohteiden ensiesiintymisjärjestyksessä.
+    """
+    return yhteys.execute(
+        "SELECT varauskohde, COUNT(*), COUNT(*) FILTER (WHERE vahvistettu) "
+        "FROM varaukset GROUP BY varauskohde ORDER BY MIN(rowid)"
+    ).fetchall()
@@ -0,0 +1,162 @@
+# Copyright (c) 2025 Jonna Kangas
+
+# Ohjelmoinnin perusteet -opintojakso
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# See <https://www.gnu.org/licenses/>.
+
+"""
+Synteettiset testiaineistot (esim. muistia suuremmat tiedostot hajautetun koostamisen testaukseen).
+
+Käyttö:
+    python -m yhteiset.synteettinen <muoto> <tiedosto> <koko> [siemen]
+
+    muoto: energia (Viikko6), vaiheet (Viikko5) tai varaukset (Viikko7)
+    koko: tavuina, loppuliitteellä K, M tai G (esim. 6G)
+    siemen: satunnaislukujen siemen (oletus 1), joten sama komento tuottaa saman tiedoston
+
+Toiminta:
+    - Rivit kirjoitetaan erissä, joten muistissa on vain yksi erä kerrallaan.
+    - Aikasarjojen aikaleimat ovat kasvavia. Jos tunnin välein kirjoitettu sarja
+      ei mahtuisi datetime-alueelle, askelta lyhennetään (vähintään 1 s).
+"""
+
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterator
+
+ALKU = datetime(2025, 1, 1)
+# Aikasarjan on mahduttava ennen vuotta 9000
+AIKAVALI_SEKUNTEINA = int((datetime(9000, 1, 1) - ALKU).total_seconds())
+ERAN_RIVIT = 10_000
+YKSIKOT = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+OTSIKOT = {
+    "energia": "Aika;Kulutus (netotettu) kWh;Tuotanto (netotettu) kWh;Vuorokauden keskilämpötila\n",
+    "vaiheet": "Aika;Kulutus vaihe 1 Wh;Kulutus vaihe 2 Wh;Kulutus vaihe 3 Wh;"
+               "Tuotanto vaihe 1 Wh;Tuotanto vaihe 2 Wh;Tuotanto vaihe 3 Wh\n",
+    "varaukset": "",
+}
+# Rivin arvioitu pituus tavuina (aika-askeleen valintaa varten)
+RIVIN_PITUUS = {"energia": 45, "vaiheet": 38, "varaukset": 110}
+
+NIMET = ["Muumi Muumilaakso", "Niiskuneiti Muumilaakso", "Pikku Myy Myrsky", "Nuuskamuikkunen Vaeltaja",
+         "Haisuli Hämärä", "Hemuli Kasvio", "Tuutikki Talvi", "Vilijonkka Siisti"]
+KOHTEET = ["Metsätila 1", "Kukkahuone", "Punainen Huone", "Rantasauna", "Torni", "Kirjasto"]
+
+
+def lue_koko(teksti: str) -> int:
+    """
+    Muuntaa koon (esim. "500M" tai "6G") tavuiksi.
+
+    Poikkeukset:
+        ValueError: jos koko ei ole positiivinen.
+    """
+    kerroin = YKSIKOT.get(teksti[-1:].upper(), 1)
+    koko = int(teksti[:-1] if kerroin > 1 else teksti) * kerroin
+    if koko <= 0:
+        raise ValueError(f"Koon pitää olla positiivinen: {teksti}")
+    return koko
+
+
+def _aikaleimat(muoto: str, koko: int) -> Iterator[datetime]:
+    """Kasvavat aikaleimat tunnin (tai tarvittaessa lyhyemmin) välein."""
+    rivit = koko // RIVIN_PITUUS[muoto] + 1
+    askel = timedelta(seconds=max(1, min(3600, AIKAVALI_SEKUNTEINA // rivit)))
+    aika = ALKU
+    while True:
+        yield aika
+        aika += askel
+
+
+def energiarivit(satunnainen: random.Random, koko: int) -> Iterator[str]:
+    """Viikko6-muotoiset rivit: kulutus ja tuotanto kWh (3 desimaalia) ja vuorokauden keskilämpötila."""
+    vyohyke = timezone(timedelta(hours=2))
+    paiva = None
+    lampotila = ""
+    for aika in _aikaleimat("energia", koko):
+        if aika.date() != paiva:
+            paiva = aika.date()
+            lampotila = f"{satunnainen.uniform(-25, 25):.1f}".replace(".", ",")
+        tuotanto = satunnainen.uniform(0, 4) if 8 <= aika.hour < 18 else 0.0
+        arvot = f"{satunnainen.uniform(0.1, 3):.3f};{tuotanto:.3f};".replace(".", ",")
+        yield f"{aika.replace(tzinfo=vyohyke).isoformat(timespec='milliseconds')};{arvot}{lampotila}\n"
+
+
+def vaiherivit(satunnainen: random.Random, koko: int) -> Iterator[str]:
+    """Viikko5-muotoiset rivit: kulutus ja tuotanto vaiheittain (Wh)."""
+    arvo = satunnainen.randrange
+    for aika in _aikaleimat("vaiheet", koko):
+        paivalla = 8 <= aika.hour < 18
+        tuotanto = [arvo(1500) if paivalla else 0 for _ in range(3)]
+        yield ";".join([aika.isoformat(), str(arvo(1200)), str(arvo(800)), str(arvo(400)), *map(str, tuotanto)]) + "\n"
+
+
+def varausrivit(satunnainen: random.Random, koko: int) -> Iterator[str]:
+    """Viikko7-muotoiset varausrivit (|-eroteltu, ei otsikkoa)."""
+    tunniste = 1
+    while True:
+        nimi = satunnainen.choice(NIMET)
+        paiva = ALKU + timedelta(days=satunnainen.randrange(3650))
+        luotu = paiva - timedelta(seconds=satunnainen.randrange(1, 90 * 86400))
+        yield "|".join([
+            str(tunniste), nimi, f"{nimi.split()[0].lower()}@esimerkki.fi", f"050{satunnainen.randrange(10 ** 7):07d}",
+            paiva.strftime("%Y-%m-%d"), f"{satunnainen.randrange(8, 20):02d}:{satunnainen.choice(('00', '30'))}",
+            str(satunnainen.randrange(1, 6)), f"{satunnainen.randrange(500, 5000) / 100:.2f}",
+            satunnainen.choice(("True", "False")), satunnainen.choice(KOHTEET), luotu.strftime("%Y-%m-%d %H:%M:%S"),
+        ]) + "\n"
+        tunniste += 1
+
+
+MUODOT: dict[str, Callable[[random.Random, int], Iterator[str]]] = {
+    "energia": energiarivit,
+    "vaiheet": vaiherivit,
+    "varaukset": varausrivit,
+}
+
+
+def kirjoita(muoto: str, tiedoston_nimi: str, koko: int, siemen: int = 1) -> int:
+    """
+    Kirjoittaa vähintään koko tavun synteettisen tiedoston (viimeinen rivi kirjoitetaan kokonaan).
+
+    Palauttaa:
+        int: Kirjoitettujen datarivien määrä.
+
+    Poikkeukset:
+        KeyError: jos muotoa ei tunneta.
+    """
+    rivit = MUODOT[muoto](random.Random(siemen), koko)
+    otsikko = OTSIKOT[muoto]
+    kirjoitettu = len(otsikko.encode("utf-8"))
+    lkm = 0
+    with open(tiedoston_nimi, "w", encoding="utf-8", newline="\n") as f:
+        f.write(otsikko)
+        while kirjoitettu < koko:
+            era = [next(rivit) for _ in range(ERAN_RIVIT)]
+            # Viimeinen erä katkaistaan kokonaisiin riveihin kokorajan kohdalla
+            for i, rivi in enumerate(era):
+                kirjoitettu += len(rivi.encode("utf-8"))
+                if kirjoitettu >= koko:
+                    del era[i + 1:]
+                    break
+            f.write("".join(era))
+            lkm += len(era)
+    return lkm
+
+
+def main() -> None:
+    if len(sys.argv) not in (4, 5) or sys.argv[1] not in MUODOT:
+        print(f"Käyttö: python -m yhteiset.synteettinen {{{'|'.join(MUODOT)}}} <tiedosto> <koko> [siemen]")
+        sys.exit(2)
+    siemen = int(sys.argv[4]) if len(sys.argv) == 5 else 1
+    lkm = kirjoita(sys.argv[1], sys.argv[2], lue_koko(sys.argv[3]), siemen)
+    print(f"Kirjoitettu {sys.argv[2]}: {lkm} riviä")
+
+
+if __name__ == "__main__":
+    main()
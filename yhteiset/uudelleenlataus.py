@@ -0,0 +1,171 @@
+# Copyright (c) 2025 Jonna Kangas
+
+# Ohjelmoinnin perusteet -opintojakso
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# See <https://www.gnu.org/licenses/>.
+
+"""
+Pitkään käynnissä olevan ohjelman datan uudelleenlataus tiedostojen muuttuessa.
+
+Toiminta:
+    - Lähdetiedostojen koko ja muokkausaika (kuten sqlitevarasto.ajan_tasalla())
+      tarkistetaan taustasäikeessä määrävälein.
+    - Muutoksen jälkeen data rakennetaan kokonaan uudelleen taustalla, ja valmis
+      tilannekuva vaihdetaan käyttöön yhdellä viittauksen sijoituksella.
+      Kyselyt lukevat nykyisen tilannekuvan kerran alussa, joten kesken oleva
+      kysely näkee yhtenäisen datan loppuun asti ja uudet kyselyt tuoreen datan
+      ilman yhteistä taukoa. Tilannekuvaa ei muuteta julkaisun jälkeen.
+    - Jos tiedosto muuttuu kesken rakentamisen (esim. kirjoitus on kesken),
+      tulos hylätään ja lataus yritetään uudelleen seuraavalla tarkistuksella.
+      Epäonnistunut lataus jättää edellisen tilannekuvan käyttöön.
+"""
+
+import os
+import threading
+from time import perf_counter, time
+from typing import Callable, Sequence
+
+# Tiedoston allekirjoitus: (koko, muokkausaika ns) tai None, jos tiedostoa ei ole
+Allekirjoitus = tuple[int, int] | None
+
+
+def allekirjoitus(tiedosto: str) -> Allekirjoitus:
+    """Palauttaa tiedoston koon ja muokkausajan (ns) tai None, jos tiedostoa ei ole."""
+    try:
+        tila = os.stat(tiedosto)
+    except FileNotFoundError:
+        return None
+    return tila.st_size, tila.st_mtime_ns
+
+
+class Tilannekuva:
+    """
+    Yksi julkaistu, muuttumaton versio datasta.
+
+    Attribuutit:
+        sukupolvi (int): Juokseva numero (1 = ensimmäinen lataus).
+        data (object): rakenna()-funktion palauttama data.
+        allekirjoitukset (tuple): Lähdetiedostojen allekirjoitukset latauksen alussa.
+        ladattu (float): Julkaisuhetki (time.time()).
+        kesto (float): Rakentamisen kesto sekunteina.
+    """
+
+    def __init__(self, sukupolvi: int, data: object, allekirjoitukset: tuple, kesto: float) -> None:
+        self.sukupolvi = sukupolvi
+        self.data = data
+        self.allekirjoitukset = allekirjoitukset
+        self.ladattu = time()
+        self.kesto = kesto
+
+
+class Latausvahti:
+    """
+    Lähdetiedostojen vahti, joka rakentaa ja julkaisee tilannekuvat.
+
+    Parametrit:
+        tiedostot (Sequence[str]): Seurattavat lähdetiedostot.
+        rakenna (Callable[[], object]): Lukee tiedostot ja palauttaa uuden datan.
+            Kutsutaan taustasäikeessä; ei saa muuttaa julkaistua dataa.
+
+    Attribuutit:
+        nykyinen (Tilannekuva | None): Viimeisin julkaistu tilannekuva.
+        epaonnistuneet (int): Epäonnistuneiden latausten määrä.
+        viimeisin_virhe (str | None): Viimeisimmän epäonnistuneen latauksen virhe.
+    """
+
+    def __init__(self, tiedostot: Sequence[str], rakenna: Callable[[], object]) -> None:
+        self.tiedostot = tuple(tiedostot)
+        self.rakenna = rakenna
+        self.nykyinen: Tilannekuva | None = None
+        self.epaonnistuneet: int = 0
+        self.viimeisin_virhe: str | None = None
+        self._yritetty: tuple | None = None  # viimeksi (onnistuneesti tai ei) ladatut allekirjoitukset
+        self._lukko = threading.Lock()
+        self._pysayta = threading.Event()
+        self._saie: threading.Thread | None = None
+
+    def allekirjoitukset(self) -> tuple:
+        """Lähdetiedostojen nykyiset allekirjoitukset."""
+        return tuple(allekirjoitus(tiedosto) for tiedosto in self.tiedostot)
+
+    def muuttunut(self) -> bool:
+        """True, jos jokin lähdetiedosto on muuttunut viimeisimmän latausyrityksen jälkeen."""
+        return self.allekirjoitukset() != self._yritetty
+
+    def lataa(self) -> Tilannekuva | None:
+        """
+        Rakentaa datan ja julkaisee uuden tilannekuvan.
+
+        Palauttaa:
+            Tilannekuva | None: Julkaistu tilannekuva tai None, jos tiedosto muuttui
+            kesken rakentamisen (yritetään uudelleen seuraavalla tarkistuksella).
+
+        Poikkeukset:
+            Exception: rakenna()-funktion virhe; edellinen tilannekuva jää käyttöön.
+        """
+        with self._lukko:
+            ennen = self.allekirjoitukset()
+            alku = perf_counter()
+            try:
+                data = self.rakenna()
+            except Exception as e:
+                self._yritetty = ennen
+                self.epaonnistuneet += 1
+                self.viimeisin_virhe = f"{type(e).__name__}: {e}"
+                raise
+            kesto = perf_counter() - alku
+            if self.allekirjoitukset() != ennen:
+                return None
+            self._yritetty = ennen
+            sukupolvi = self.nykyinen.sukupolvi + 1 if self.nykyinen else 1
+            # Julkaisu on yksi sijoitus: lukijat näkevät joko vanhan tai uuden kuvan
+            self.nykyinen = Tilannekuva(sukupolvi, data, ennen, kesto)
+            return self.nykyinen
+
+    def tarkista(self) -> Tilannekuva | None:
+        """Lataa datan uudelleen, jos lähdetiedostot ovat muuttuneet; muuten palauttaa None."""
+        return self.lataa() if self.muuttunut() else None
+
+    def kaynnista(self, vali: float, ilmoita: Callable[[str], None] = print) -> None:
+        """
+        Käynnistää taustasäikeen, joka tarkistaa tiedostot vali sekunnin välein.
+
+        Parametrit:
+            vali (float): Tarkistusväli sekunteina.
+            ilmoita (Callable[[str], None]): Latausten ja virheiden ilmoituskanava.
+        """
+        def silmukka() -> None:
+            while not self._pysayta.wait(vali):
+                try:
+                    kuva = self.tarkista()
+                except Exception as e:
+                    ilmoita(f"Uudelleenlataus epäonnistui, sukupolvi {self.nykyinen.sukupolvi} jää käyttöön: "
+                            f"{type(e).__name__}: {e}")
+                    continue
+                if kuva is not None:
+                    ilmoita(f"Data ladattu uudelleen: sukupolvi {kuva.sukupolvi}, {1000 * kuva.kesto:.1f} ms")
+
+        self._saie = threading.Thread(target=silmukka, name="latausvahti", daemon=True)
+        self._saie.start()
+
+    def pysayta(self) -> None:
+        """Pysäyttää taustasäikeen (odottaa kesken olevan latauksen loppuun)."""
+        self._pysayta.set()
+        if self._saie is not None:
+            self._saie.join()
+
+    def tiedot(self) -> dict:
+        """Nykyisen tilannekuvan ja latausten tiedot (esim. /metrics-vastaukseen)."""
+        kuva = self.nykyinen
+        return {
+            "sukupolvi": kuva.sukupolvi if kuva else 0,
+            "latauksen_kesto_ms": round(1000 * kuva.kesto, 3) if kuva else None,
+            "ladattu": round(kuva.ladattu, 3) if kuva else None,
+            "epaonnistuneet_lataukset": self.epaonnistuneet,
+            "viimeisin_virhe": self.viimeisin_virhe,
+        }
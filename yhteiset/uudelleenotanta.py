@@ -0,0 +1,131 @@
+# Copyright (c) 2025 Jonna Kangas
+
+# Ohjelmoinnin perusteet -opintojakso
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# See <https://www.gnu.org/licenses/>.
+
+"""
+Tuntisarjan uudelleenotanta (resample) eri aikatarkkuuksille.
+
+Toiminta:
+    - Järjestetystä aikaleimasarakkeesta lasketaan kerran ryhmäavaimet ja
+      ryhmien alkuindeksit (numpy.reduceat-tyyliset rajat).
+    - Jokainen sarake kootaan segmenteittäin viipaleista [alku, loppu),
+      eli jokainen rivi käsitellään kerran eikä ryhmiä haeta uudelleen.
+"""
+
+from collections import namedtuple
+from collections.abc import Callable, Sequence
+from datetime import datetime
+
+from yhteiset.aikasarja import Aikasarja
+from yhteiset.profilointi import mittaa
+
+# Tarkkuus -> funktio, joka palauttaa aikaleiman ryhmäavaimen
+AVAIMET: dict[str, Callable[[datetime], object]] = {
+    "tunti": lambda t: t.replace(minute=0, second=0, microsecond=0),
+    "paiva": datetime.date,
+    "viikko": lambda t: tuple(t.isocalendar()[:2]),  # (ISO-vuosi, ISO-viikko)
+    "kuukausi": lambda t: (t.year, t.month),
+    "neljannes": lambda t: (t.year, (t.month - 1) // 3 + 1),
+    "vuosi": lambda t: t.year,
+}
+
+# Koostin -> funktio, joka laskee yhden segmentin arvon sarakeviipaleesta
+KOOSTIMET: dict[str, Callable[[Sequence], object]] = {
+    "summa": sum,
+    "keskiarvo": lambda osa: sum(osa) / len(osa),
+    "maksimi": max,
+}
+
+
+class Ryhma(namedtuple("Ryhma", ("avain", "alku", "loppu", "arvot"))):
+    """Yksi uudelleenotannan tulosryhmä: avain, rivien indeksiväli [alku, loppu) ja kootut arvot."""
+    # collections.namedtuple eikä typing.NamedTuple: typing ei kuulu tuontibudjettiin
+    __slots__ = ()
+
+    @property
+    def lkm(self) -> int:
+        """Ryhmän rivien lukumäärä."""
+        return self.loppu - self.alku
+
+
+def segmenttirajat(aikaleimat: Sequence[datetime], tarkkuus: str) -> tuple[list, list[int]]:
+    """
+    Laskee järjestetyn aikaleimasarakkeen ryhmäavaimet ja segmenttien rajat.
+
+    Palauttaa:
+        tuple[list, list[int]]: (avaimet, rajat), jossa ryhmä i kattaa indeksit
+        rajat[i] <= j < rajat[i + 1]. Rajoja on yksi enemmän kuin avaimia.
+
+    Poikkeukset:
+        ValueError: jos tarkkuus ei ole tuettu.
+    """
+    try:
+        avainfunktio = AVAIMET[tarkkuus]
+    except KeyError:
+        raise ValueError(f"Tuntematon tarkkuus: {tarkkuus} (sallitut: {', '.join(AVAIMET)})") from None
+
+    avaimet: list = []
+    rajat: list[int] = []
+    edellinen = object()
+    for i, avain in enumerate(map(avainfunktio, aikaleimat)):
+        if avain != edellinen:
+            avaimet.append(avain)
+            rajat.append(i)
+            edellinen = avain
+    rajat.append(len(aikaleimat))
+    return avaimet, rajat
+
+
+def _rivimaara(sarja: Aikasarja, tarkkuus: str, koostin: str | Sequence[str] = "summa",
+               a: int = 0, b: int | None = None) -> int:
+    """Uudelleenotettavan indeksivälin rivien määrä (profiloinnin käsitellyt rivit)."""
+    return len(range(len(sarja))[a:b])
+
+
+@mittaa(rivit=_rivimaara)
+def uudelleenota(sarja: Aikasarja, tarkkuus: str, koostin: str | Sequence[str] = "summa",
+                 a: int = 0, b: int | None = None) -> list[Ryhma]:
+    """
+    Koostaa sarjan (tai sen indeksivälin [a, b)) annettuun aikatarkkuuteen.
+
+    Parametrit:
+        sarja (Aikasarja): Tuntisarja (järjestetään tarvittaessa).
+        tarkkuus (str): "tunti", "paiva", "viikko", "kuukausi", "neljannes" tai "vuosi".
+        koostin (str | Sequence[str]): "summa", "keskiarvo" tai "maksimi", joko kaikille
+            sarakkeille tai erikseen jokaiselle sarakkeelle.
+        a, b (int): Koostettava indeksiväli järjestetyssä sarjassa (esim.
+            Aikasarja.paivien_rajat()); oletuksena koko sarja. Vain välin rivit
+            käydään läpi.
+
+    Palauttaa:
+        list[Ryhma]: Ryhmät aikajärjestyksessä; Ryhma.arvot on sarakkeiden järjestyksessä.
+            Ryhma.alku ja Ryhma.loppu ovat koko sarjan indeksejä.
+
+    Poikkeukset:
+        ValueError: jos tarkkuus tai koostin ei ole tuettu.
+    """
+    sarja.jarjesta()
+    if isinstance(koostin, str):
+        koostin = [koostin] * len(sarja.sarakkeet)
+    try:
+        funktiot = [KOOSTIMET[k] for k in koostin]
+    except KeyError as e:
+        raise ValueError(f"Tuntematon koostin: {e.args[0]} (sallitut: {', '.join(KOOSTIMET)})") from None
+
+    a, b, _ = slice(a, b).indices(len(sarja))
+    # Koko sarjaa ei kopioida; välin rajat siirretään koko sarjan indekseiksi
+    aikaleimat = sarja.aikaleimat if (a, b) == (0, len(sarja)) else sarja.aikaleimat[a:b]
+    avaimet, rajat = segmenttirajat(aikaleimat, tarkkuus)
+    if a:
+        rajat = [a + raja for raja in rajat]
+    return [
+        Ryhma(avain, alku, loppu, tuple(f(sarake[alku:loppu]) for f, sarake in zip(funktiot, sarja.sarakkeet)))
+        for avain, alku, loppu in zip(avaimet, rajat, rajat[1:])
+    ]